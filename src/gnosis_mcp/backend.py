@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import AsyncIterator
 from typing import Any, Protocol, runtime_checkable
 
 __all__ = ["DocBackend", "create_backend"]
@@ -41,8 +42,14 @@ class DocBackend(Protocol):
         category: str | None = None,
         limit: int = 5,
         query_embedding: list[float] | None = None,
+        content_chars: int | None = None,
     ) -> list[dict[str, Any]]:
-        """Search documents. Returns list of {file_path, title, content, category, score, highlight}."""
+        """Search documents. Returns list of {file_path, title, content, category, score, highlight}.
+
+        With `content_chars`, `content` may be cut to at most that many characters
+        by the database. Pass it only when the caller needs a preview, never when
+        the full text feeds rerank, MMR or content filtering.
+        """
         ...
 
     async def get_doc(self, path: str) -> list[dict[str, Any]]:
@@ -52,6 +59,14 @@ class DocBackend(Protocol):
         """
         ...
 
+    async def get_doc_content(self, path: str) -> dict[str, Any] | None:
+        """Get a document with its chunks joined by blank lines, or None if absent.
+
+        Returns {title, content, category, audience, tags, chunks}; metadata comes
+        from the first chunk.
+        """
+        ...
+
     async def get_related(
         self,
         path: str,
@@ -128,7 +143,15 @@ class DocBackend(Protocol):
     async def export_docs(self, category: str | None = None) -> list[dict[str, Any]]:
         """Export documents reassembled from chunks.
 
-        Returns list of {file_path, title, category, content}.
+        Returns list of {file_path, title, category, content, chunks}.
+        """
+        ...
+
+    def iter_export_docs(self, category: str | None = None) -> AsyncIterator[dict[str, Any]]:
+        """Yield the same documents as export_docs(), one at a time.
+
+        Rows are read incrementally, so memory holds one document rather than
+        the whole corpus.
         """
         ...
 
@@ -239,6 +262,21 @@ class DocBackend(Protocol):
         ...
 
 
+def _finish_export_doc(d: dict[str, Any]) -> dict[str, Any]:
+    """Join a streamed export document's chunk contents.
+
+    Trailing whitespace can only come from the last non-blank chunk, so that
+    chunk is trimmed before the join rather than copying the joined document.
+    """
+    parts = d["content"]
+    while parts and not parts[-1].rstrip():
+        parts.pop()
+    if parts:
+        parts[-1] = parts[-1].rstrip()
+    d["content"] = "\n\n".join(parts)
+    return d
+
+
 def create_backend(config) -> DocBackend:
     """Create the appropriate backend based on config.
 
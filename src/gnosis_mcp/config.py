@@ -4,23 +4,29 @@ from __future__ import annotations
 
 import os
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import final
 
 # Valid SQL identifier: letters, digits, underscores. Qualified names allow dots.
 __all__ = ["GnosisMcpConfig"]
 
-_IDENT_RE = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*(\.[a-zA-Z_][a-zA-Z0-9_]*)*$")
+_IDENT_RE = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*(?:\.[a-zA-Z_][a-zA-Z0-9_]*)*")
 
 _VALID_LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
 _VALID_TRANSPORTS = ("stdio", "sse", "streamable-http")
+_TRUTHY = ("1", "true", "yes")
 _VALID_EMBED_PROVIDERS = ("openai", "ollama", "custom", "local")
 _VALID_BACKENDS = ("auto", "sqlite", "postgres")
 
+# asyncpg pool ceiling: (cores * 2) + 1, the usual sizing for an I/O-bound DB client.
+_DEFAULT_POOL_MAX = (os.cpu_count() or 2) * 2 + 1
+
 
 def _validate_identifier(value: str, name: str) -> str:
     """Validate a SQL identifier to prevent injection via config values."""
-    if not _IDENT_RE.match(value):
+    # fullmatch, not match with ^...$: "$" also matches before a trailing newline.
+    if not _IDENT_RE.fullmatch(value):
         raise ValueError(
             f"Invalid SQL identifier for {name}: {value!r}. "
             "Only letters, digits, underscores, and dots (for qualified names) are allowed."
@@ -38,7 +44,8 @@ def _resolve_sqlite_path() -> str:
     return str(base / "gnosis-mcp" / "docs.db")
 
 
-@dataclass(frozen=True)
+@final
+@dataclass(frozen=True, slots=True)
 class GnosisMcpConfig:
     """Immutable server configuration loaded from environment variables.
 
@@ -73,9 +80,19 @@ class GnosisMcpConfig:
     col_target_path: str = "target_path"
     col_relation_type: str = "relation_type"
 
-    # Pool settings (PostgreSQL only)
-    pool_min: int = 1
-    pool_max: int = 3
+    # Pool settings (PostgreSQL only). Two warm connections avoid paying the
+    # connect on the first concurrent tool call; `command_timeout` (seconds)
+    # stops a hung query from pinning a pool slot indefinitely (None: untimed,
+    # as one-shot CLI commands run).
+    # `statement_cache_size` is asyncpg's per-connection prepared-statement
+    # cache; 0 disables it (PgBouncer transaction pooling, generic-plan trouble).
+    # `server_settings` sends jit=off and application_name in each connection's
+    # startup packet; PgBouncer rejects startup parameters it does not know.
+    pool_min: int = 2
+    pool_max: int = _DEFAULT_POOL_MAX
+    command_timeout: int | None = 30
+    statement_cache_size: int = 100
+    server_settings: bool = True
 
     # Schema settings — PostgreSQL `vector(N)` column width (pgvector). Match this to your
     # embedding provider's output dimension. Distinct from `embed_dim` which controls
@@ -104,6 +121,7 @@ class GnosisMcpConfig:
     max_query_chars: int = 10_000
     webhook_allow_private: bool = False  # allow POST to private/loopback addresses
     crawl_extract_timeout_s: int = 30  # per-page trafilatura extract timeout
+    crawl_extract_processes: bool = False  # trafilatura in worker processes
 
     # Hybrid search tuning
     # RRF fusion constant (Cormack et al. 2009). 60 is the canonical default;
@@ -158,6 +176,14 @@ class GnosisMcpConfig:
     port: int = 8000
     log_level: str = "INFO"
 
+    # Derived table names, resolved once in __post_init__ so the qualified_*
+    # properties don't rebuild f-strings on every query.
+    _chunks_tables: tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    _qualified_chunks_tables: tuple[str, ...] = field(
+        default=(), init=False, repr=False, compare=False
+    )
+    _qualified_links_table: str = field(default="", init=False, repr=False, compare=False)
+
     def __post_init__(self) -> None:
         """Validate all SQL identifiers and tuning parameters after construction."""
         # Resolve backend from "auto"
@@ -194,31 +220,37 @@ class GnosisMcpConfig:
             object.__setattr__(self, "embed_model", "MongoDB/mdbr-leaf-ir")
 
         # Validate identifiers (relevant for both backends, harmless for SQLite)
-        for table_name in self.chunks_tables:
+        chunks_tables = tuple(t.strip() for t in self.chunks_table.split(",") if t.strip())
+        for table_name in chunks_tables:
             _validate_identifier(table_name, "chunks_table")
 
-        identifiers = {
-            "schema": self.schema,
-            "links_table": self.links_table,
-            "col_file_path": self.col_file_path,
-            "col_title": self.col_title,
-            "col_content": self.col_content,
-            "col_chunk_index": self.col_chunk_index,
-            "col_category": self.col_category,
-            "col_audience": self.col_audience,
-            "col_tags": self.col_tags,
-            "col_embedding": self.col_embedding,
-            "col_tsv": self.col_tsv,
-            "col_source_path": self.col_source_path,
-            "col_target_path": self.col_target_path,
-            "col_relation_type": self.col_relation_type,
-        }
-        for name, value in identifiers.items():
+        for name, value in (
+            ("schema", self.schema),
+            ("links_table", self.links_table),
+            ("col_file_path", self.col_file_path),
+            ("col_title", self.col_title),
+            ("col_content", self.col_content),
+            ("col_chunk_index", self.col_chunk_index),
+            ("col_category", self.col_category),
+            ("col_audience", self.col_audience),
+            ("col_tags", self.col_tags),
+            ("col_embedding", self.col_embedding),
+            ("col_tsv", self.col_tsv),
+            ("col_source_path", self.col_source_path),
+            ("col_target_path", self.col_target_path),
+            ("col_relation_type", self.col_relation_type),
+        ):
             _validate_identifier(value, name)
 
         if self.search_function is not None:
             _validate_identifier(self.search_function, "search_function")
 
+        object.__setattr__(self, "_chunks_tables", chunks_tables)
+        object.__setattr__(
+            self, "_qualified_chunks_tables", tuple(f"{self.schema}.{t}" for t in chunks_tables)
+        )
+        object.__setattr__(self, "_qualified_links_table", f"{self.schema}.{self.links_table}")
+
         # Validate tuning knobs
         if self.content_preview_chars < 50:
             raise ValueError(
@@ -230,6 +262,16 @@ class GnosisMcpConfig:
             raise ValueError(
                 f"GNOSIS_MCP_SEARCH_LIMIT_MAX must be >= 1, got {self.search_limit_max}"
             )
+        if self.pool_max < 1:
+            raise ValueError(f"GNOSIS_MCP_POOL_MAX must be >= 1, got {self.pool_max}")
+        if self.command_timeout is not None and self.command_timeout < 1:
+            raise ValueError(
+                f"GNOSIS_MCP_COMMAND_TIMEOUT must be >= 1, got {self.command_timeout}"
+            )
+        if self.statement_cache_size < 0:
+            raise ValueError(
+                f"GNOSIS_MCP_STATEMENT_CACHE_SIZE must be >= 0, got {self.statement_cache_size}"
+            )
         if self.webhook_timeout < 1:
             raise ValueError(
                 f"GNOSIS_MCP_WEBHOOK_TIMEOUT must be >= 1, got {self.webhook_timeout}"
@@ -265,26 +307,47 @@ class GnosisMcpConfig:
     @property
     def chunks_tables(self) -> list[str]:
         """Split comma-separated chunks_table into a list."""
-        return [t.strip() for t in self.chunks_table.split(",") if t.strip()]
+        return list(self._chunks_tables)
 
     @property
     def qualified_chunks_table(self) -> str:
         """Primary chunks table (first in the list)."""
-        return f"{self.schema}.{self.chunks_tables[0]}"
+        return self._qualified_chunks_tables[0]
 
     @property
     def qualified_chunks_tables(self) -> list[str]:
         """All qualified chunks table names."""
-        return [f"{self.schema}.{t}" for t in self.chunks_tables]
+        return list(self._qualified_chunks_tables)
 
     @property
     def multi_table(self) -> bool:
         """True if configured with multiple chunks tables."""
-        return len(self.chunks_tables) > 1
+        return len(self._chunks_tables) > 1
 
     @property
     def qualified_links_table(self) -> str:
-        return f"{self.schema}.{self.links_table}"
+        return self._qualified_links_table
+
+    @classmethod
+    def cached(cls) -> GnosisMcpConfig:
+        """Return a process-wide config built from the environment on first use.
+
+        `from_env()` always re-reads the environment; the CLI commands and the
+        FastMCP lifespan use this instead, so `serve --ingest` (ingest, then the
+        server) and repeated startups — e.g. a test suite spinning the lifespan
+        up many times — parse and validate the env once. Call `invalidate()`
+        after changing GNOSIS_MCP_* vars.
+        """
+        global _cached
+        if _cached is None:
+            _cached = cls.from_env()
+        return _cached
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drop the config cached by `cached()`; the next call re-reads the env."""
+        global _cached
+        _cached = None
 
     @classmethod
     def from_env(cls) -> GnosisMcpConfig:
@@ -296,11 +359,16 @@ class GnosisMcpConfig:
         database_url = os.environ.get("GNOSIS_MCP_DATABASE_URL") or os.environ.get("DATABASE_URL")
         # database_url can be None — that means SQLite default
 
+        # One pass over the environment instead of ~50 os.environ lookups, each
+        # of which re-encodes the key and decodes the value.
+        prefix = "GNOSIS_MCP_"
+        gnosis_env = {k[len(prefix) :]: v for k, v in os.environ.items() if k.startswith(prefix)}
+
         def env(key: str, default: str | None = None) -> str | None:
-            return os.environ.get(f"GNOSIS_MCP_{key}", default)
+            return gnosis_env.get(key, default)
 
         def env_int(key: str, default: int) -> int:
-            val = os.environ.get(f"GNOSIS_MCP_{key}")
+            val = gnosis_env.get(key)
             if not val:
                 return default
             try:
@@ -309,7 +377,7 @@ class GnosisMcpConfig:
                 raise ValueError(f"GNOSIS_MCP_{key} must be an integer, got: {val!r}") from None
 
         def env_float(key: str, default: float) -> float:
-            val = os.environ.get(f"GNOSIS_MCP_{key}")
+            val = gnosis_env.get(key)
             if not val:
                 return default
             try:
@@ -317,6 +385,12 @@ class GnosisMcpConfig:
             except ValueError:
                 raise ValueError(f"GNOSIS_MCP_{key} must be a float, got: {val!r}") from None
 
+        def env_bool(key: str, default: bool = False) -> bool:
+            val = gnosis_env.get(key)
+            if val is None:
+                return default
+            return val.lower() in _TRUTHY
+
         backend_raw = env("BACKEND", "auto")
 
         return cls(
@@ -338,10 +412,13 @@ class GnosisMcpConfig:
             col_source_path=env("COL_SOURCE_PATH", "source_path"),
             col_target_path=env("COL_TARGET_PATH", "target_path"),
             col_relation_type=env("COL_RELATION_TYPE", "relation_type"),
-            pool_min=env_int("POOL_MIN", 1),
-            pool_max=env_int("POOL_MAX", 3),
+            pool_min=env_int("POOL_MIN", 2),
+            pool_max=env_int("POOL_MAX", _DEFAULT_POOL_MAX),
+            command_timeout=env_int("COMMAND_TIMEOUT", 30),
+            statement_cache_size=env_int("STATEMENT_CACHE_SIZE", 100),
+            server_settings=env_bool("SERVER_SETTINGS", True),
             embedding_dim=env_int("EMBEDDING_DIM", 1536),
-            writable=env("WRITABLE", "").lower() in ("1", "true", "yes"),
+            writable=env_bool("WRITABLE"),
             webhook_url=env("WEBHOOK_URL"),
             content_preview_chars=env_int("CONTENT_PREVIEW_CHARS", 200),
             chunk_size=env_int("CHUNK_SIZE", 2000),
@@ -349,13 +426,14 @@ class GnosisMcpConfig:
             webhook_timeout=env_int("WEBHOOK_TIMEOUT", 5),
             max_doc_bytes=env_int("MAX_DOC_BYTES", 50_000_000),
             max_query_chars=env_int("MAX_QUERY_CHARS", 10_000),
-            webhook_allow_private=env("WEBHOOK_ALLOW_PRIVATE", "").lower() in ("1", "true", "yes"),
+            webhook_allow_private=env_bool("WEBHOOK_ALLOW_PRIVATE"),
             crawl_extract_timeout_s=env_int("CRAWL_EXTRACT_TIMEOUT_S", 30),
+            crawl_extract_processes=env_bool("CRAWL_EXTRACT_PROCESSES", False),
             rrf_k=env_int("RRF_K", 60),
-            rerank_enabled=env("RERANK_ENABLED", "").lower() in ("1", "true", "yes"),
+            rerank_enabled=env_bool("RERANK_ENABLED"),
             rerank_model=env("RERANK_MODEL", "onnx-community/ms-marco-MiniLM-L6-v2-ONNX"),
             rerank_pool=env_int("RERANK_POOL", 20),
-            collapse_by_doc=env("COLLAPSE_BY_DOC", "").lower() in ("1", "true", "yes"),
+            collapse_by_doc=env_bool("COLLAPSE_BY_DOC"),
             fts5_title_weight=env_float("FTS5_TITLE_WEIGHT", 10.0),
             fts5_content_weight=env_float("FTS5_CONTENT_WEIGHT", 1.0),
             mmr_lambda=env_float("MMR_LAMBDA", 1.0),
@@ -365,8 +443,8 @@ class GnosisMcpConfig:
             embed_api_key=env("EMBED_API_KEY"),
             embed_url=env("EMBED_URL"),
             embed_batch_size=env_int("EMBED_BATCH_SIZE", 50),
-            rest=env("REST", "").lower() in ("1", "true", "yes"),
-            access_log=env("ACCESS_LOG", "true").lower() in ("1", "true", "yes"),
+            rest=env_bool("REST"),
+            access_log=env_bool("ACCESS_LOG", True),
             cors_origins=env("CORS_ORIGINS"),
             api_key=env("API_KEY"),
             transport=env("TRANSPORT", "stdio"),
@@ -374,3 +452,6 @@ class GnosisMcpConfig:
             port=env_int("PORT", 8000),
             log_level=env("LOG_LEVEL", "INFO").upper(),
         )
+
+
+_cached: GnosisMcpConfig | None = None
@@ -9,22 +9,28 @@ Requires the [web] extra: pip install gnosis-mcp[web]
 from __future__ import annotations
 
 import asyncio
+import functools
+import importlib.util
 import ipaddress
 import json
 import logging
+import multiprocessing
 import os
 import re
+import sqlite3
 import tempfile
 import time
 import xml.etree.ElementTree as ET
 from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
 from enum import StrEnum
-from fnmatch import fnmatch
+from fnmatch import translate
+from html import unescape
 from pathlib import Path
 from typing import TYPE_CHECKING
-from urllib.parse import urljoin, urlparse, urlunparse
-from urllib.robotparser import RobotFileParser
+from urllib.parse import quote, unquote, urljoin, urlparse, urlsplit, urlunsplit
 
 from gnosis_mcp import __version__
 from gnosis_mcp.ingest import chunk_by_headings, content_hash
@@ -45,7 +51,6 @@ __all__ = [
     "extract_links",
     "url_matches_pattern",
     "load_cache",
-    "save_cache",
     "crawl_url",
 ]
 
@@ -54,6 +59,7 @@ log = logging.getLogger("gnosis_mcp")
 _CACHE_DIR = Path.home() / ".local" / "share" / "gnosis-mcp"
 _CACHE_FILE = _CACHE_DIR / "crawl-cache.json"
 _MAX_XML_SIZE = 10 * 1024 * 1024  # 10 MB — reject oversized sitemaps
+_SITEMAP_FEED_CHARS = 64 * 1024  # parse_sitemap feeds the pull parser this much at a time
 _MAX_RESPONSE_SIZE = 50 * 1024 * 1024  # 50 MB — reject oversized HTML responses
 _MAX_DEPTH = 10  # Hard cap on BFS crawl depth
 
@@ -101,6 +107,7 @@ class CrawlConfig:
     embed: bool = False
     max_urls: int = 5000
     extract_timeout_s: float = 30.0
+    extract_processes: bool = False  # trafilatura in worker processes, not threads
 
     def __post_init__(self) -> None:
         if self.depth > _MAX_DEPTH:
@@ -142,81 +149,198 @@ def _is_private_host(hostname: str) -> bool:
 
 def normalize_url(url: str) -> str:
     """Canonical form: lowercase scheme+host, strip fragment, strip trailing slash on path."""
-    parsed = urlparse(url)
+    return _normalized_parts(url)[2]
+
+
+@functools.lru_cache(maxsize=8192)
+def _normalized_parts(url: str) -> tuple[str, str, str]:
+    """Return ``(scheme, host, normalized_url)``, lowercased, parsing the URL once.
+
+    Cached: every page of a site links to the same navigation, so a crawl
+    normalizes the same few hundred URLs over and over.
+    """
+    parsed = urlsplit(url)
     scheme = parsed.scheme.lower()
     host = parsed.netloc.lower()
     path = parsed.path.rstrip("/") if parsed.path != "/" else "/"
     # Rebuild without fragment, keep query
-    return urlunparse((scheme, host, path, parsed.params, parsed.query, ""))
+    return scheme, host, urlunsplit((scheme, host, path, parsed.query, ""))
 
 
 def parse_sitemap(xml_text: str) -> list[str]:
-    """Extract <loc> URLs from sitemap XML (handles namespace)."""
+    """Extract <loc> URLs from sitemap XML (handles namespace).
+
+    Streams the document through a pull parser and drops each ``<url>`` /
+    ``<sitemap>`` entry once its ``<loc>`` is read, so memory stays flat
+    however many entries the sitemap holds.
+    """
     if len(xml_text) > _MAX_XML_SIZE:
         log.warning("Sitemap exceeds %d bytes, skipping", _MAX_XML_SIZE)
         return []
 
     urls: list[str] = []
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root: ET.Element | None = None
+    # Local names of the open elements, so namespaced and bare sitemaps match alike
+    path: list[str] = []
     try:
-        root = ET.fromstring(xml_text)
+        for start in range(0, len(xml_text) or 1, _SITEMAP_FEED_CHARS):
+            parser.feed(xml_text[start : start + _SITEMAP_FEED_CHARS])
+            for event, elem in parser.read_events():
+                name = elem.tag.rpartition("}")[2]
+                if event == "start":
+                    if root is None:
+                        root = elem
+                    path.append(name)
+                    continue
+                path.pop()
+                if name == "loc" and path and path[-1] in ("url", "sitemap"):
+                    if elem.text:
+                        urls.append(elem.text.strip())
+                elif name in ("url", "sitemap") and root is not None:
+                    root.clear()
+        parser.close()
     except ET.ParseError:
-        return urls
-
-    # Handle namespace: {http://www.sitemaps.org/schemas/sitemap/0.9}
-    ns = ""
-    if root.tag.startswith("{"):
-        ns = root.tag.split("}")[0] + "}"
-
-    # Sitemap index: <sitemap><loc>...</loc></sitemap>
-    for sitemap_el in root.findall(f".//{ns}sitemap"):
-        loc = sitemap_el.find(f"{ns}loc")
-        if loc is not None and loc.text:
-            urls.append(loc.text.strip())
-
-    # Regular sitemap: <url><loc>...</loc></url>
-    for url_el in root.findall(f".//{ns}url"):
-        loc = url_el.find(f"{ns}loc")
-        if loc is not None and loc.text:
-            urls.append(loc.text.strip())
+        return []
 
     return urls
 
 
 def check_robots(robots_txt: str, url: str, user_agent: str) -> bool:
     """Return True if the URL is allowed by robots.txt."""
-    rp = RobotFileParser()
-    rp.parse(robots_txt.splitlines())
-    return rp.can_fetch(user_agent, url)
+    return _CompiledRobots(robots_txt, user_agent).can_fetch(url)
+
+
+def _robots_path(path: str) -> str:
+    """Normalize percent-encoding so rule paths and URL paths compare alike."""
+    return quote(unquote(path), safe="/*$?=&;:@+,!~'()")
 
 
-def _parse_robots(robots_txt: str) -> RobotFileParser:
-    """Parse robots.txt once into a reusable RobotFileParser."""
-    rp = RobotFileParser()
-    rp.parse(robots_txt.splitlines())
-    return rp
+def _robots_alternation(paths: list[str]) -> tuple[re.Pattern[str] | None, list[int]]:
+    """Compile rule paths into one anchored alternation, most specific first.
+
+    Returns the pattern and the octet length of each alternative, indexed by
+    ``match.lastindex - 1`` (every alternative is its own capture group).
+    """
+    if not paths:
+        return None, []
+    ordered = sorted(set(paths), key=len, reverse=True)
+    parts = []
+    for path in ordered:
+        anchored = path.endswith("$")
+        body = re.escape(path[:-1] if anchored else path).replace(r"\*", ".*")
+        parts.append(f"({body}{'$' if anchored else ''})")
+    return re.compile("|".join(parts)), [len(p) for p in ordered]
+
+
+class _CompiledRobots:
+    """robots.txt rules for one user agent, compiled once for the whole crawl.
+
+    Follows RFC 9309: the groups naming this agent (else the ``*`` groups)
+    apply, the longest matching path wins and Allow wins a tie. Each verdict
+    is one regex alternation, so ``can_fetch`` costs two matches however long
+    the file is.
+    """
+
+    __slots__ = ("_allow", "_allow_len", "_disallow", "_disallow_len")
+
+    def __init__(self, robots_txt: str, user_agent: str) -> None:
+        agent = user_agent.split("/")[0].lower()
+        specific: list[tuple[str, str]] = []
+        fallback: list[tuple[str, str]] = []
+        names: list[str] = []
+        rules: list[tuple[str, str]] = []
+        in_rules = False
+
+        def _close_group() -> None:
+            if any(n not in ("", "*") and n in agent for n in names):
+                specific.extend(rules)
+            elif "*" in names:
+                fallback.extend(rules)
+
+        for raw in robots_txt.splitlines():
+            key, sep, value = raw.split("#", 1)[0].partition(":")
+            if not sep:
+                continue
+            key = key.strip().lower()
+            value = value.strip()
+            if key == "user-agent":
+                if in_rules:
+                    _close_group()
+                    names, rules, in_rules = [], [], False
+                names.append(value.split("/")[0].lower())
+            elif key in ("allow", "disallow"):
+                in_rules = True
+                if value:
+                    rules.append((key, _robots_path(value)))
+        _close_group()
+
+        chosen = specific or fallback
+        self._allow, self._allow_len = _robots_alternation(
+            [path for verdict, path in chosen if verdict == "allow"]
+        )
+        self._disallow, self._disallow_len = _robots_alternation(
+            [path for verdict, path in chosen if verdict == "disallow"]
+        )
+
+    def can_fetch(self, url: str) -> bool:
+        """Return True if the URL's path (and query) is allowed."""
+        if self._disallow is None:
+            return True
+        parsed = urlparse(url)
+        path = _robots_path(parsed.path or "/")
+        if parsed.query:
+            path = f"{path}?{parsed.query}"
+        denied = self._disallow.match(path)
+        if denied is None:
+            return True
+        allowed = self._allow.match(path) if self._allow is not None else None
+        if allowed is None:
+            return False
+        return self._allow_len[allowed.lastindex - 1] >= self._disallow_len[denied.lastindex - 1]
 
 
 _HREF_RE = re.compile(r'<a\s[^>]*href=["\']([^"\']+)["\']', re.IGNORECASE)
 
 
+def _hrefs(html: str) -> list[str]:
+    """Return the href of every <a> in the page.
+
+    Uses lxml's C parser when it is installed (trafilatura, from the [web]
+    extra, depends on it), which also decodes entities and copes with unquoted
+    or multi-line attributes. Falls back to a regex scan otherwise, or when
+    lxml refuses the document (empty, or a str with an XML encoding declaration).
+    """
+    try:
+        import lxml.etree
+        import lxml.html
+    except ImportError:
+        pass
+    else:
+        try:
+            return [str(h) for h in lxml.html.fromstring(html).xpath("//a/@href")]
+        except (ValueError, lxml.etree.LxmlError):
+            pass
+    return [unescape(m) for m in _HREF_RE.findall(html)]
+
+
 def extract_links(html: str, base_url: str, same_host_only: bool = True) -> list[str]:
     """Extract unique internal links from HTML."""
-    parsed_base = urlparse(base_url)
-    base_host = parsed_base.netloc.lower()
+    base_host = urlsplit(base_url).netloc.lower()
     seen: set[str] = set()
     result: list[str] = []
 
-    for match in _HREF_RE.finditer(html):
-        href = match.group(1).strip()
+    for href in _hrefs(html):
+        href = href.strip()
         if not href or href.startswith(("#", "javascript:", "mailto:", "tel:")):
             continue
-        absolute = urljoin(base_url, href)
-        parsed = urlparse(absolute)
-        if parsed.scheme not in ("http", "https"):
+        # Absolute links (most of a typical nav) need no resolving against the base
+        absolute = href if href.startswith(("https://", "http://")) else urljoin(base_url, href)
+        scheme, host, normalized = _normalized_parts(absolute)
+        if scheme not in ("http", "https"):
             continue
-        if same_host_only and parsed.netloc.lower() != base_host:
+        if same_host_only and host != base_host:
             continue
-        normalized = normalize_url(absolute)
         if normalized not in seen:
             seen.add(normalized)
             result.append(normalized)
@@ -226,8 +350,13 @@ def extract_links(html: str, base_url: str, same_host_only: bool = True) -> list
 
 def url_matches_pattern(url: str, pattern: str) -> bool:
     """Match URL path against a glob pattern using fnmatch."""
-    path = urlparse(url).path
-    return fnmatch(path, pattern)
+    return _glob_regex(pattern).match(urlsplit(url).path) is not None
+
+
+@functools.lru_cache(maxsize=64)
+def _glob_regex(pattern: str) -> re.Pattern[str]:
+    """Compile an fnmatch glob (case-sensitive) once per pattern."""
+    return re.compile(translate(pattern))
 
 
 def load_cache(path: Path | None = None) -> dict:
@@ -235,22 +364,37 @@ def load_cache(path: Path | None = None) -> dict:
     cache_path = path or _CACHE_FILE
     if cache_path.exists():
         try:
-            return json.loads(cache_path.read_text())
-        except (json.JSONDecodeError, OSError):
+            raw = cache_path.read_bytes()
+            try:
+                import orjson
+            except ImportError:  # [fast] extra not installed
+                return json.loads(raw)
+            return orjson.loads(raw)
+        except (ValueError, OSError):  # both JSONDecodeErrors are ValueErrors
             return {}
     return {}
 
 
 def save_cache(data: dict, path: Path | None = None) -> None:
-    """Save crawl cache atomically to JSON file with restricted permissions."""
+    """Save crawl cache atomically to JSON file with restricted permissions.
+
+    Written compact (no indentation): the cache holds one entry per crawled
+    URL and is rewritten at the end of every crawl.
+    """
+    try:
+        import orjson
+
+        payload = orjson.dumps(data)
+    except ImportError:  # [fast] extra not installed
+        payload = json.dumps(data, separators=(",", ":")).encode()
     cache_path = path or _CACHE_FILE
     cache_path.parent.mkdir(parents=True, exist_ok=True)
-    # Atomic write: temp file + os.replace prevents corruption on crash
+    # Atomic write: temp file + os.replace prevents corruption on crash.
+    # mkstemp creates the file 0o600 already.
     fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
     try:
-        with os.fdopen(fd, "w") as f:
-            json.dump(data, f, indent=2)
-        os.chmod(tmp_path, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
         os.replace(tmp_path, cache_path)
     except BaseException:
         try:
@@ -260,6 +404,103 @@ def save_cache(data: dict, path: Path | None = None) -> None:
         raise
 
 
+_CACHE_UPSERT = (
+    "INSERT OR REPLACE INTO cache (url, etag, last_modified, hash, timestamp, links)"
+    " VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+def _cache_row(url: str, entry: dict) -> tuple:
+    """One ``cache`` table row for a dict-style entry (links stored as JSON)."""
+    links = entry.get("links")
+    return (
+        url,
+        entry.get("etag"),
+        entry.get("last_modified"),
+        entry.get("hash"),
+        entry.get("timestamp"),
+        None if links is None else json.dumps(links, separators=(",", ":")),
+    )
+
+
+class _CrawlCache:
+    """Per-URL crawl cache (ETag, Last-Modified, content hash, links) in SQLite.
+
+    Each entry is committed as soon as its URL is crawled, so an interrupted
+    crawl keeps what it already did and nothing is re-serialized at the end.
+    WAL with ``synchronous=NORMAL`` makes those single-row commits cheap (no
+    fsync until checkpoint). Dict-style ``get`` / ``in`` / item assignment,
+    so ``fetch_page`` and ``_crawl_single`` accept a plain dict as well.
+
+    The database sits next to ``path`` with a ``.db`` suffix; a JSON cache
+    left at ``path`` by an earlier version is imported once and removed.
+    ``links`` (the page's same-host links) lets BFS discovery answer a 304
+    from the cache; a database from before it gains the column on open.
+    """
+
+    __slots__ = ("_conn",)
+
+    def __init__(self, path: Path) -> None:
+        db_path = path.with_suffix(".db")
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Create the file 0o600 before SQLite opens it (the -wal / -shm files
+        # take their mode from it); chmod covers a cache from an older version.
+        os.close(os.open(db_path, os.O_RDWR | os.O_CREAT, 0o600))
+        os.chmod(db_path, 0o600)
+        self._conn = sqlite3.connect(db_path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, hash TEXT, timestamp REAL,"
+            " links TEXT)"
+        )
+        for suffix in ("-wal", "-shm"):
+            sidecar = db_path.with_name(db_path.name + suffix)
+            if sidecar.exists():
+                os.chmod(sidecar, 0o600)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cache)")}
+        if "links" not in columns:
+            self._conn.execute("ALTER TABLE cache ADD COLUMN links TEXT")
+        if path != db_path and path.exists():
+            legacy = load_cache(path)
+            with self._conn:
+                self._conn.executemany(
+                    _CACHE_UPSERT,
+                    [
+                        _cache_row(url, entry)
+                        for url, entry in legacy.items()
+                        if isinstance(entry, dict)
+                    ],
+                )
+            path.unlink(missing_ok=True)
+
+    def get(self, url: str) -> dict | None:
+        row = self._conn.execute(
+            "SELECT etag, last_modified, hash, timestamp, links FROM cache WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "etag": row[0],
+            "last_modified": row[1],
+            "hash": row[2],
+            "timestamp": row[3],
+            "links": None if row[4] is None else json.loads(row[4]),
+        }
+
+    def __contains__(self, url: object) -> bool:
+        return (
+            self._conn.execute("SELECT 1 FROM cache WHERE url = ?", (url,)).fetchone() is not None
+        )
+
+    def __setitem__(self, url: str, entry: dict) -> None:
+        self._conn.execute(_CACHE_UPSERT, _cache_row(url, entry))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
 # ---------------------------------------------------------------------------
 # Async functions
 # ---------------------------------------------------------------------------
@@ -289,23 +530,22 @@ def _require_trafilatura():
         ) from None
 
 
-async def fetch_page(
-    client: httpx.AsyncClient,
-    url: str,
-    cache: dict,
-    force: bool = False,
-) -> _FetchResult | None:
-    """GET a URL with conditional requests. Returns None on 304 Not Modified."""
-    headers: dict[str, str] = {}
-    cached = cache.get(url)
-    if cached and not force:
-        if cached.get("etag"):
-            headers["If-None-Match"] = cached["etag"]
-        if cached.get("last_modified"):
-            headers["If-Modified-Since"] = cached["last_modified"]
+async def _read_capped(response: httpx.Response, limit: int) -> str | None:
+    """Read a streamed body, giving up (None) once it passes ``limit`` bytes.
+
+    The cap holds for responses without a Content-Length, and for compressed
+    ones, since it counts the decoded bytes as they arrive.
+    """
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        body.extend(chunk)
+        if len(body) > limit:
+            return None
+    return body.decode(response.encoding or "utf-8", errors="replace")
 
-    response = await client.get(url, headers=headers, follow_redirects=True)
 
+async def _read_page(response: httpx.Response, url: str) -> _FetchResult | None:
+    """Check a streamed page response's headers, then read its body."""
     if response.status_code == 304:
         return None
     response.raise_for_status()
@@ -337,45 +577,138 @@ async def fetch_page(
     if not (is_html or is_plain):
         return None
 
+    text = await _read_capped(response, _MAX_RESPONSE_SIZE)
+    if text is None:
+        log.warning("Response exceeded %d bytes: %s", _MAX_RESPONSE_SIZE, url)
+        return None
+
     return _FetchResult(
         url=str(response.url),
-        html=response.text,
+        html=text,
         etag=response.headers.get("etag"),
         last_modified=response.headers.get("last-modified"),
         is_plain_text=is_plain,
     )
 
 
-async def extract_content(html: str, url: str, timeout_s: float | None = None) -> str | None:
+def _conditional_headers(cached: dict | None) -> dict[str, str]:
+    """If-None-Match / If-Modified-Since for a cache entry (none without one)."""
+    headers: dict[str, str] = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    return headers
+
+
+async def fetch_page(
+    client: httpx.AsyncClient,
+    url: str,
+    cache: dict | _CrawlCache,
+    force: bool = False,
+) -> _FetchResult | None:
+    """GET a URL with conditional requests. Returns None on 304 Not Modified."""
+    headers = {} if force else _conditional_headers(cache.get(url))
+    async with client.stream("GET", url, headers=headers, follow_redirects=True) as response:
+        return await _read_page(response, url)
+
+
+def _extract_sync(html: str, url: str) -> str | None:
+    """Run trafilatura on one page (module-level, so a process pool can pickle it)."""
+    return _require_trafilatura().extract(
+        html,
+        url=url,
+        output_format="markdown",
+        include_links=True,
+        include_tables=True,
+        include_images=False,
+        favor_precision=True,
+    )
+
+
+class _ExtractPool(Executor):
+    """Worker processes for trafilatura, one per concurrent fetch up to the core count.
+
+    Started with forkserver (spawn where that is unavailable, e.g. Windows):
+    forking the crawler itself would copy its event loop and HTTP threads.
+
+    A timed-out extraction is only abandoned by ``asyncio.wait_for``: its
+    worker would keep going, hold a pool slot, and make shutdown wait for it.
+    ``restart`` swaps in fresh processes and kills the old ones; extractions
+    still running there fail with ``BrokenProcessPool`` and ``extract_content``
+    runs them again on the new processes.
+    """
+
+    def __init__(self, concurrency: int) -> None:
+        method = (
+            "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        self._context = multiprocessing.get_context(method)
+        self._max_workers = max(1, min(os.cpu_count() or 1, concurrency))
+        self.current = self._start()
+
+    def _start(self) -> Executor:
+        return ProcessPoolExecutor(max_workers=self._max_workers, mp_context=self._context)
+
+    def submit(self, fn, /, *args, **kwargs):
+        return self.current.submit(fn, *args, **kwargs)
+
+    def restart(self, stuck: Executor) -> None:
+        """Replace ``stuck`` (a past ``current``) with fresh processes, killing its workers."""
+        if stuck is not self.current:
+            return  # another timeout already replaced it
+        self.current = self._start()
+        # ProcessPoolExecutor has no public way to stop a busy worker before
+        # 3.14; without the private process map, shutdown only drops queued work.
+        if hasattr(stuck, "_processes"):
+            for proc in list((stuck._processes or {}).values()):
+                proc.kill()
+        stuck.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self.current.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+async def extract_content(
+    html: str,
+    url: str,
+    timeout_s: float | None = None,
+    executor: Executor | None = None,
+) -> str | None:
     """Extract main content from HTML as markdown using trafilatura.
 
-    Runs in a thread pool because trafilatura.extract() is CPU-bound
-    (HTML parsing + content extraction) and would block the event loop.
-    A pathological page can hang the thread — enforce a timeout.
+    Runs in ``executor`` (the loop's default thread pool if None) because
+    trafilatura.extract() is CPU-bound (HTML parsing + content extraction)
+    and would block the event loop. ``crawl_url`` passes a process pool, since
+    threads would serialize on the GIL.
+    A pathological page can hang the worker — enforce a timeout. With an
+    ``_ExtractPool`` the hung worker is then killed rather than left running.
     """
-    trafilatura = _require_trafilatura()
+    if executor is None:
+        _require_trafilatura()
     loop = asyncio.get_running_loop()
-    call = loop.run_in_executor(
-        None,
-        lambda: trafilatura.extract(
-            html,
-            url=url,
-            output_format="markdown",
-            include_links=True,
-            include_tables=True,
-            include_images=False,
-            favor_precision=True,
-        ),
-    )
-    try:
-        if timeout_s is not None and timeout_s > 0:
-            result = await asyncio.wait_for(call, timeout=timeout_s)
-        else:
-            result = await call
-    except asyncio.TimeoutError:
-        log.warning("trafilatura extract timed out after %ss for %s", timeout_s, url)
-        return None
-    return result if result and len(result.strip()) >= 50 else None
+    retried = False
+    while True:
+        target = executor.current if isinstance(executor, _ExtractPool) else executor
+        call = loop.run_in_executor(target, _extract_sync, html, url)
+        try:
+            if timeout_s is not None and timeout_s > 0:
+                result = await asyncio.wait_for(call, timeout=timeout_s)
+            else:
+                result = await call
+        except asyncio.TimeoutError:
+            log.warning("trafilatura extract timed out after %ss for %s", timeout_s, url)
+            if isinstance(executor, _ExtractPool):
+                executor.restart(target)
+            return None
+        except BrokenProcessPool:
+            # Killed along with another page's hung worker: run it once more
+            if retried or not isinstance(executor, _ExtractPool):
+                raise
+            retried = True
+            continue
+        return result if result and len(result.strip()) >= 50 else None
 
 
 async def discover_urls(
@@ -383,37 +716,59 @@ async def discover_urls(
     base_url: str,
     config: CrawlConfig,
     robots_txt: str | None = None,
+    page_links: dict[str, list[str]] | None = None,
+    cache: dict | _CrawlCache | None = None,
 ) -> list[str]:
-    """Discover URLs via sitemap.xml or BFS link crawl."""
+    """Discover URLs via sitemap.xml or BFS link crawl.
+
+    If ``page_links`` is given, the BFS crawl records there the links it
+    extracted from each page it fetched, so the ingest pass can reuse them.
+    With a crawl ``cache``, BFS requests pages whose links it holds
+    conditionally, so an unchanged page costs a 304 instead of its body.
+    """
     parsed = urlparse(base_url)
     base_host = parsed.netloc.lower()
-    robots = _parse_robots(robots_txt) if robots_txt else None
+    robots = _CompiledRobots(robots_txt, config.user_agent) if robots_txt else None
 
     if config.sitemap:
-        return await _discover_sitemap(client, base_url, base_host, robots, config)
+        return await _discover_sitemap(
+            client, base_url, base_host, robots, config, page_links, cache
+        )
+
+    return await _discover_bfs(client, base_url, config, robots, page_links, cache)
+
 
-    return await _discover_bfs(client, base_url, config, robots)
+async def _fetch_sitemap(client: httpx.AsyncClient, sitemap_url: str) -> str:
+    """Download a sitemap, stopping at _MAX_XML_SIZE (an oversized one reads as empty)."""
+    async with client.stream("GET", sitemap_url, follow_redirects=True) as resp:
+        resp.raise_for_status()
+        xml_text = await _read_capped(resp, _MAX_XML_SIZE)
+    if xml_text is None:
+        log.warning("Sitemap exceeds %d bytes, skipping: %s", _MAX_XML_SIZE, sitemap_url)
+        return ""
+    return xml_text
 
 
 async def _discover_sitemap(
     client: httpx.AsyncClient,
     base_url: str,
     base_host: str,
-    robots: RobotFileParser | None,
+    robots: _CompiledRobots | None,
     config: CrawlConfig,
+    page_links: dict[str, list[str]] | None = None,
+    cache: dict | _CrawlCache | None = None,
 ) -> list[str]:
     """Discover URLs from sitemap.xml (handles sitemap index)."""
     parsed = urlparse(base_url)
     sitemap_url = f"{parsed.scheme}://{parsed.netloc}/sitemap.xml"
 
     try:
-        resp = await client.get(sitemap_url, follow_redirects=True)
-        resp.raise_for_status()
+        xml_text = await _fetch_sitemap(client, sitemap_url)
     except Exception:
         log.warning("Could not fetch sitemap at %s, falling back to BFS", sitemap_url)
-        return await _discover_bfs(client, base_url, config, robots)
+        return await _discover_bfs(client, base_url, config, robots, page_links, cache)
 
-    urls = parse_sitemap(resp.text)
+    urls = parse_sitemap(xml_text)
 
     # Handle sitemap index — resolve nested sitemaps in parallel
     nested_sitemaps = [u for u in urls if u.endswith(".xml") or "sitemap" in u.lower()]
@@ -421,58 +776,96 @@ async def _discover_sitemap(
 
         async def _fetch_nested(sm_url: str) -> list[str]:
             try:
-                sm_resp = await client.get(sm_url, follow_redirects=True)
-                sm_resp.raise_for_status()
-                return parse_sitemap(sm_resp.text)
+                return parse_sitemap(await _fetch_sitemap(client, sm_url))
             except Exception:
                 log.warning("Could not fetch nested sitemap: %s", sm_url)
                 return []
 
-        nested_results = await asyncio.gather(*[_fetch_nested(sm) for sm in nested_sitemaps])
+        # An index may list a sitemap twice: fetch each one once
+        nested_results = await asyncio.gather(
+            *[_fetch_nested(sm) for sm in dict.fromkeys(nested_sitemaps)]
+        )
         urls = [u for batch in nested_results for u in batch]
 
-    # Filter to same host and normalize
-    result = []
+    # Filter to same host and normalize. A page listed in several sitemaps (or
+    # as both /page and /page/) is kept once, so it is fetched and ingested once.
+    result: dict[str, None] = {}
     for u in urls:
-        parsed_u = urlparse(u)
-        if parsed_u.netloc.lower() == base_host:
-            result.append(normalize_url(u))
-    return result
+        _, host, normalized = _normalized_parts(u)
+        if host == base_host:
+            result[normalized] = None
+    return list(result)
 
 
 async def _discover_bfs(
     client: httpx.AsyncClient,
     base_url: str,
     config: CrawlConfig,
-    robots: RobotFileParser | None,
+    robots: _CompiledRobots | None,
+    page_links: dict[str, list[str]] | None = None,
+    cache: dict | _CrawlCache | None = None,
 ) -> list[str]:
-    """BFS link crawl with depth limit."""
+    """BFS link crawl with depth limit (records each page's links in ``page_links``).
+
+    Pages at the depth limit, and any popped once max_urls URLs are
+    already known, are listed without being fetched: only their links would
+    be read, and those could not be followed.
+    """
     base_normalized = normalize_url(base_url)
-    visited: set[str] = set()
+    if robots is not None and not robots.can_fetch(base_normalized):
+        return []
+    # Every URL ever considered, so each is queued once: the same navigation
+    # links on every page would otherwise fill the queue with repeats and
+    # crowd out links not seen yet.
+    seen: set[str] = {base_normalized}
+    # Only robots-allowed URLs are queued, and every queued URL ends up in
+    # ``result``, so the two together never exceed max_urls.
     queue: deque[tuple[str, int]] = deque([(base_normalized, 0)])
     result: list[str] = []
 
     while queue and len(result) < config.max_urls:
         url, depth = queue.popleft()
-        if url in visited:
-            continue
-        visited.add(url)
-
-        if robots is not None and not robots.can_fetch(config.user_agent, url):
-            continue
-
         result.append(url)
 
-        if depth >= config.depth:
+        # At the depth limit, or with max_urls already spoken for, the page's
+        # links could not be queued: don't fetch it for them.
+        if depth >= config.depth or len(result) + len(queue) >= config.max_urls:
             continue
 
+        # Ask conditionally only when the cache holds the page's links: a 304
+        # then means those links are current, without the body being sent.
+        cached = cache.get(url) if cache is not None and not config.force else None
+        if cached is not None and cached.get("links") is None:
+            cached = None
+
         try:
-            resp = await client.get(url, follow_redirects=True)
-            ct = resp.headers.get("content-type", "")
-            if resp.status_code == 200 and "text/html" in ct:
-                links = extract_links(resp.text, url, same_host_only=True)
+            # Streamed like fetch_page: a non-HTML body is never read, and an
+            # HTML one stops at the same size cap.
+            links: list[str] | None = None
+            html: str | None = None
+            async with client.stream(
+                "GET", url, headers=_conditional_headers(cached), follow_redirects=True
+            ) as resp:
+                if resp.status_code == 304 and cached is not None:
+                    links = cached["links"]
+                elif resp.status_code == 200 and "text/html" in resp.headers.get(
+                    "content-type", ""
+                ):
+                    html = await _read_capped(resp, _MAX_RESPONSE_SIZE)
+                    if html is None:
+                        log.warning("Response exceeded %d bytes: %s", _MAX_RESPONSE_SIZE, url)
+            if html is not None:
+                links = extract_links(html, url, same_host_only=True)
+            if links is not None:
+                if page_links is not None:
+                    page_links[url] = links
                 for link in links:
-                    if link not in visited and len(queue) < config.max_urls:
+                    if len(result) + len(queue) >= config.max_urls:
+                        break
+                    if link in seen:
+                        continue
+                    seen.add(link)
+                    if robots is None or robots.can_fetch(link):
                         queue.append((link, depth + 1))
         except Exception as exc:
             # Transient fetch errors during discovery shouldn't abort the whole
@@ -528,21 +921,27 @@ async def crawl_url(
             )
         ]
 
-    # 1. Load crawl cache
-    cache = load_cache(cache_path)
-
     results: list[CrawlResult] = []
     parsed = urlparse(url)
     category = parsed.netloc.lower()
 
+    # One host, `concurrency` requests in flight: size the keep-alive pool for
+    # that instead of httpx's many-host defaults, and multiplex over HTTP/2
+    # when h2 is installed (it comes with the [web] extra).
     async with httpx.AsyncClient(
-        timeout=crawl_config.timeout,
+        http2=importlib.util.find_spec("h2") is not None,
+        timeout=httpx.Timeout(crawl_config.timeout, connect=min(crawl_config.timeout, 10.0)),
+        limits=httpx.Limits(
+            max_connections=crawl_config.concurrency * 2,
+            max_keepalive_connections=crawl_config.concurrency,
+            keepalive_expiry=300,
+        ),
         headers={"User-Agent": crawl_config.user_agent},
     ) as client:
         # 2. Fetch robots.txt (parse once, reuse for all URLs)
         robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
         robots_txt: str | None = None
-        robots: RobotFileParser | None = None
+        robots: _CompiledRobots | None = None
         try:
             robots_resp = await client.get(robots_url, follow_redirects=True)
             if robots_resp.status_code == 200:
@@ -556,21 +955,36 @@ async def crawl_url(
                     )
                 else:
                     robots_txt = robots_resp.text
-                    robots = _parse_robots(robots_txt)
+                    robots = _CompiledRobots(robots_txt, crawl_config.user_agent)
         except Exception:
             log.debug("Could not fetch robots.txt from %s", robots_url)
 
-        # 3. Discover URLs
-        discovered = await discover_urls(client, url, crawl_config, robots_txt)
+        # 3. Discover URLs (BFS keeps each page's links so ingest needn't re-parse it,
+        # and asks the crawl cache's pages conditionally). Dry runs leave the cache alone.
+        page_links: dict[str, list[str]] = {}
+        known = None if crawl_config.dry_run else _CrawlCache(cache_path or _CACHE_FILE)
+        try:
+            discovered = await discover_urls(
+                client, url, crawl_config, robots_txt, page_links, known
+            )
+        finally:
+            if known is not None:
+                known.close()
         log.info("Discovered %d URL(s) from %s", len(discovered), url)
 
-        # 4. Apply include/exclude filters
-        if crawl_config.include:
-            discovered = [u for u in discovered if url_matches_pattern(u, crawl_config.include)]
-        if crawl_config.exclude:
-            discovered = [
-                u for u in discovered if not url_matches_pattern(u, crawl_config.exclude)
-            ]
+        # 4. Apply include/exclude filters (one path parse per URL for both)
+        if crawl_config.include or crawl_config.exclude:
+            include = _glob_regex(crawl_config.include) if crawl_config.include else None
+            exclude = _glob_regex(crawl_config.exclude) if crawl_config.exclude else None
+            kept = []
+            for u in discovered:
+                path = urlsplit(u).path
+                if include is not None and not include.match(path):
+                    continue
+                if exclude is not None and exclude.match(path):
+                    continue
+                kept.append(u)
+            discovered = kept
 
         # 4b. Cap URL count to prevent runaway memory usage
         if len(discovered) > crawl_config.max_urls:
@@ -592,8 +1006,13 @@ async def crawl_url(
 
         backend = create_backend(gnosis_config)
         await backend.startup()
+        cache: _CrawlCache | None = None
+        extract_pool: _ExtractPool | None = None
 
         try:
+            # Crawl cache: each URL's entry is committed as soon as it finishes
+            cache = _CrawlCache(cache_path or _CACHE_FILE)
+
             # Auto-init schema
             table_name = gnosis_config.chunks_tables[0]
             table_exists = await backend.has_column(table_name, "file_path")
@@ -603,40 +1022,38 @@ async def crawl_url(
             has_hash = await backend.has_column(table_name, "content_hash")
             has_tags = await backend.has_column(table_name, "tags")
 
-            # 7. Crawl with concurrency control
-            sem = asyncio.Semaphore(crawl_config.concurrency)
-
-            async def _process_url(target_url: str) -> CrawlResult:
-                async with sem:
-                    return await _crawl_single(
-                        client=client,
-                        backend=backend,
-                        url=target_url,
-                        cache=cache,
-                        config=crawl_config,
-                        category=category,
-                        has_hash=has_hash,
-                        has_tags=has_tags,
-                        robots=robots,
-                    )
+            # 7. Crawl with concurrency control: `concurrency` workers take the
+            # URLs in order, so at most that many pages (HTML, markdown, chunks)
+            # are in flight, without a task per discovered URL.
+            if crawl_config.extract_processes:
+                extract_pool = _ExtractPool(crawl_config.concurrency)
+            slots: list[CrawlResult | None] = [None] * len(discovered)
+            pending = enumerate(discovered)
 
-            tasks = [_process_url(u) for u in discovered]
-            raw_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Convert exceptions to error results
-            results = []
-            for i, r in enumerate(raw_results):
-                if isinstance(r, BaseException):
-                    results.append(
-                        CrawlResult(
-                            url=discovered[i],
-                            chunks=0,
-                            action=CrawlAction.ERROR,
-                            detail=str(r),
+            async def _worker() -> None:
+                for i, target_url in pending:
+                    try:
+                        slots[i] = await _crawl_single(
+                            client=client,
+                            backend=backend,
+                            url=target_url,
+                            cache=cache,
+                            config=crawl_config,
+                            category=category,
+                            has_hash=has_hash,
+                            has_tags=has_tags,
+                            robots=robots,
+                            discovered_links=page_links.get(target_url),
+                            extract_pool=extract_pool,
+                        )
+                    except Exception as e:
+                        slots[i] = CrawlResult(
+                            url=target_url, chunks=0, action=CrawlAction.ERROR, detail=str(e)
                         )
-                    )
-                else:
-                    results.append(r)
+
+            workers = min(crawl_config.concurrency, len(discovered))
+            await asyncio.gather(*(_worker() for _ in range(workers)))
+            results = [r for r in slots if r is not None]
 
             # 8. Embed if requested
             if crawl_config.embed:
@@ -677,8 +1094,12 @@ async def crawl_url(
                         log.warning("Skipping --embed: embedding dependencies not installed")
 
         finally:
-            # Always save cache, even on error/cancellation
-            save_cache(cache, cache_path)
+            if extract_pool is not None:
+                # Timed-out workers were already killed; don't block the loop
+                # waiting for the rest to exit.
+                extract_pool.shutdown(wait=False, cancel_futures=True)
+            if cache is not None:
+                cache.close()
             await backend.shutdown()
 
     return results
@@ -689,16 +1110,23 @@ async def _crawl_single(
     client: httpx.AsyncClient,
     backend: DocBackend,
     url: str,
-    cache: dict,
+    cache: dict | _CrawlCache,
     config: CrawlConfig,
     category: str,
     has_hash: bool,
     has_tags: bool,
-    robots: RobotFileParser | None,
+    robots: _CompiledRobots | None,
+    discovered_links: list[str] | None = None,
+    extract_pool: Executor | None = None,
 ) -> CrawlResult:
-    """Crawl a single URL: fetch, extract, chunk, ingest."""
-    # Check robots.txt (uses pre-parsed RobotFileParser — parsed once, not per URL)
-    if robots is not None and not robots.can_fetch(config.user_agent, url):
+    """Crawl a single URL: fetch, extract, chunk, ingest.
+
+    ``discovered_links`` are the page's links as BFS discovery already
+    extracted them; when absent the fetched HTML is parsed for links here.
+    ``extract_pool`` runs trafilatura (default: the loop's thread pool).
+    """
+    # Check robots.txt (rules compiled once per crawl, not per URL)
+    if robots is not None and not robots.can_fetch(url):
         return CrawlResult(url=url, chunks=0, action=CrawlAction.BLOCKED, detail="robots.txt")
 
     try:
@@ -724,7 +1152,7 @@ async def _crawl_single(
             markdown = fetch_result.html.strip() or None
         else:
             markdown = await extract_content(
-                fetch_result.html, url, timeout_s=config.extract_timeout_s
+                fetch_result.html, url, timeout_s=config.extract_timeout_s, executor=extract_pool
             )
         if markdown is None:
             return CrawlResult(
@@ -739,12 +1167,18 @@ async def _crawl_single(
         if has_hash and not config.force:
             existing = await backend.get_content_hash(url)
             if existing == digest:
-                # Update cache entry even if content unchanged
+                # Update cache entry even if content unchanged. Without links
+                # from discovery (sitemap, depth-limit leaf), keep the cached ones.
+                links = discovered_links
+                if links is None:
+                    previous = cache.get(url)
+                    links = previous.get("links") if previous else None
                 cache[url] = {
                     "etag": fetch_result.etag,
                     "last_modified": fetch_result.last_modified,
                     "hash": digest,
                     "timestamp": time.time(),
+                    "links": links,
                 }
                 return CrawlResult(
                     url=url,
@@ -771,8 +1205,13 @@ async def _crawl_single(
             has_hash_col=has_hash,
         )
 
-        # Extract and insert internal links for the doc graph
-        links = extract_links(fetch_result.html, url, same_host_only=True)
+        # Extract and insert internal links for the doc graph (off the loop:
+        # a large page takes long enough to stall the other concurrent fetches)
+        links = discovered_links
+        if links is None:
+            links = await asyncio.to_thread(
+                extract_links, fetch_result.html, url, same_host_only=True
+            )
         if links:
             try:
                 await backend.insert_links(url, links[:50], relation_type="links_to")
@@ -785,6 +1224,7 @@ async def _crawl_single(
             "last_modified": fetch_result.last_modified,
             "hash": digest,
             "timestamp": time.time(),
+            "links": links,
         }
 
         # Rate limiting
@@ -4,18 +4,20 @@ from __future__ import annotations
 
 import logging
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import AsyncIterator
+from typing import AsyncIterator, final
 
 from gnosis_mcp.backend import DocBackend, create_backend
 from gnosis_mcp.config import GnosisMcpConfig
 
-__all__ = ["AppContext", "app_lifespan"]
+__all__ = ["AppContext", "app_lifespan", "current_app_context"]
 
 log = logging.getLogger("gnosis_mcp")
 
 
-@dataclass
+@final
+@dataclass(slots=True)
 class AppContext:
     """Shared application state for FastMCP tools."""
 
@@ -23,15 +25,25 @@ class AppContext:
     config: GnosisMcpConfig
 
 
+# Set by app_lifespan so tools can fetch the AppContext with one lookup
+# instead of walking mcp.get_context().request_context.lifespan_context.
+current_app_context: ContextVar[AppContext | None] = ContextVar(
+    "gnosis_mcp_app_context", default=None
+)
+
+
 @asynccontextmanager
 async def app_lifespan(server) -> AsyncIterator[AppContext]:
     """FastMCP lifespan: create backend on startup, close on shutdown."""
-    config = GnosisMcpConfig.from_env()
+    config = GnosisMcpConfig.cached()
     backend = create_backend(config)
 
     await backend.startup()
 
+    ctx = AppContext(backend=backend, config=config)
+    token = current_app_context.set(ctx)
     try:
-        yield AppContext(backend=backend, config=config)
+        yield ctx
     finally:
+        current_app_context.reset(token)
         await backend.shutdown()
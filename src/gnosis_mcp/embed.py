@@ -6,6 +6,7 @@ Remote providers use stdlib (urllib.request). Local provider uses onnxruntime.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import urllib.request
@@ -143,6 +144,7 @@ async def embed_pending(
     batch_size: int = 50,
     dry_run: bool = False,
     dim: int | None = None,
+    concurrency: int = 1,
 ) -> EmbedResult:
     """Find chunks with NULL embeddings and backfill them.
 
@@ -154,6 +156,7 @@ async def embed_pending(
         url: Custom endpoint URL.
         batch_size: Number of chunks to embed per batch.
         dry_run: If True, count NULL embeddings without embedding them.
+        concurrency: Number of batches sent to the provider at once.
 
     Returns:
         EmbedResult with counts of embedded, total null, and errors.
@@ -175,26 +178,42 @@ async def embed_pending(
         errors = 0
 
         while True:
-            rows = await backend.get_pending_embeddings(batch_size)
+            rows = await backend.get_pending_embeddings(batch_size * concurrency)
             if not rows:
                 break
 
-            ids = [r["id"] for r in rows]
+            # Provider calls block (HTTP or ONNX), so each batch runs in a
+            # worker thread and up to `concurrency` of them are in flight.
+            batches = [rows[i : i + batch_size] for i in range(0, len(rows), batch_size)]
             texts = [
-                contextual_header(r["file_path"], r.get("title")) + r["content"] for r in rows
+                [contextual_header(r["file_path"], r.get("title")) + r["content"] for r in b]
+                for b in batches
             ]
-
-            try:
-                vectors = embed_texts(texts, provider, model, api_key, url, dim=dim)
-            except Exception:
-                log.exception("Embedding batch failed (ids %d-%d)", ids[0], ids[-1])
-                errors += len(ids)
+            outcomes = await asyncio.gather(
+                *(
+                    asyncio.to_thread(embed_texts, t, provider, model, api_key, url, dim=dim)
+                    for t in texts
+                ),
+                return_exceptions=True,
+            )
+
+            failed = False
+            for batch, vectors in zip(batches, outcomes, strict=True):
+                ids = [r["id"] for r in batch]
+                if isinstance(vectors, BaseException):
+                    log.error(
+                        "Embedding batch failed (ids %d-%d)", ids[0], ids[-1], exc_info=vectors
+                    )
+                    errors += len(ids)
+                    failed = True
+                    continue
+                for row_id, vector in zip(ids, vectors):
+                    await backend.set_embedding(row_id, vector)
+                    embedded += 1
+            # Failed rows are still NULL; stop rather than refetch them forever.
+            if failed:
                 break
 
-            for row_id, vector in zip(ids, vectors):
-                await backend.set_embedding(row_id, vector)
-                embedded += 1
-
         return EmbedResult(embedded=embedded, total_null=total_null, errors=errors)
     finally:
         await backend.shutdown()
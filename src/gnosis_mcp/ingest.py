@@ -15,6 +15,7 @@ Optional format extras:
 
 from __future__ import annotations
 
+import asyncio
 import csv
 import hashlib
 import io
@@ -22,6 +23,7 @@ import json
 import logging
 import re
 import tomllib
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -36,6 +38,7 @@ __all__ = [
     "chunk_by_headings",
     "scan_files",
     "ingest_path",
+    "iter_ingest_path",
     "diff_path",
     "prune_stale",
     "TYPED_RELATION_ALLOWLIST",
@@ -906,6 +909,41 @@ async def prune_stale(
     }
 
 
+def _read_source(f: Path, base: Path) -> tuple[str, str] | IngestResult:
+    """Read and convert one file for ingest: ``(markdown, content hash)``.
+
+    Returns an IngestResult instead when the file is skipped or unreadable.
+    Blocking (disk reads, PDF extraction), so `iter_ingest_path` runs it in a
+    worker thread.
+    """
+    rel = str(f.relative_to(base))
+    try:
+        if f.suffix.lower() == ".pdf":
+            raw = f.read_bytes()
+            digest = hashlib.sha256(raw).hexdigest()[:16]
+            md_text = _convert_pdf(raw, f)
+            if not md_text or len(md_text.strip()) < 50:
+                return IngestResult(
+                    path=rel, chunks=0, action="skipped", detail="PDF empty or too small"
+                )
+            return md_text, digest
+        if _looks_binary(f):
+            return IngestResult(path=rel, chunks=0, action="skipped", detail="Binary content")
+        text = f.read_text(encoding="utf-8", errors="replace")
+        if len(text.strip()) < 50:
+            return IngestResult(path=rel, chunks=0, action="skipped", detail="Too small")
+        digest = content_hash(text)
+        md_text = _convert_to_markdown(text, f)
+    except OSError as e:
+        return IngestResult(path=rel, chunks=0, action="error", detail=str(e))
+    # Post-convert size check: some converters (empty ipynb, CSVs with only a
+    # header) return tiny/empty output that would otherwise reach FTS as a
+    # single dehydrated chunk.
+    if not md_text or len(md_text.strip()) < 50:
+        return IngestResult(path=rel, chunks=0, action="skipped", detail="Empty after conversion")
+    return md_text, digest
+
+
 async def ingest_path(
     config,
     root: str,
@@ -923,68 +961,55 @@ async def ingest_path(
     Returns:
         List of IngestResult for each file processed.
     """
+    return [r async for r in iter_ingest_path(config, root, dry_run=dry_run, force=force)]
+
+
+async def iter_ingest_path(
+    config,
+    root: str,
+    *,
+    dry_run: bool = False,
+    force: bool = False,
+) -> AsyncIterator[IngestResult]:
+    """Like `ingest_path`, but yield each file's IngestResult as it finishes.
+
+    Callers can report progress while a large tree is still being ingested
+    without holding every result in memory.
+    """
     root_path = Path(root).resolve()
     if not root_path.exists():
-        return [IngestResult(path=root, chunks=0, action="error", detail="Path does not exist")]
+        yield IngestResult(path=root, chunks=0, action="error", detail="Path does not exist")
+        return
 
     files = scan_files(root_path)
     if not files:
-        return [
-            IngestResult(path=root, chunks=0, action="skipped", detail="No supported files found")
-        ]
+        yield IngestResult(
+            path=root, chunks=0, action="skipped", detail="No supported files found"
+        )
+        return
 
     # Determine base for relative paths
     base = root_path.parent if root_path.is_file() else root_path
 
-    results: list[IngestResult] = []
-
     if dry_run:
+        # Same read, skip and convert rules as a real ingest, minus the writes.
         for f in files:
+            loaded = _read_source(f, base)
+            if isinstance(loaded, IngestResult):
+                yield loaded
+                continue
+            md_text, _ = loaded
             rel = str(f.relative_to(base))
-            if f.suffix.lower() == ".pdf":
-                raw = f.read_bytes()
-                md_text = _convert_pdf(raw, f)
-                if not md_text or len(md_text.strip()) < 50:
-                    results.append(
-                        IngestResult(
-                            path=rel, chunks=0, action="skipped", detail="PDF empty or too small"
-                        )
-                    )
-                    continue
-            else:
-                if _looks_binary(f):
-                    results.append(
-                        IngestResult(path=rel, chunks=0, action="skipped", detail="Binary content")
-                    )
-                    continue
-                text = f.read_text(encoding="utf-8", errors="replace")
-                if len(text.strip()) < 50:
-                    results.append(
-                        IngestResult(
-                            path=rel, chunks=0, action="skipped", detail="Too small (<50 chars)"
-                        )
-                    )
-                    continue
-                md_text = _convert_to_markdown(text, f)
-                if not md_text or len(md_text.strip()) < 50:
-                    results.append(
-                        IngestResult(
-                            path=rel,
-                            chunks=0,
-                            action="skipped",
-                            detail="Empty after conversion",
-                        )
-                    )
-                    continue
             _, body = parse_frontmatter(md_text)
             chunks = chunk_by_headings(body, rel, max_chunk_size=config.chunk_size)
-            results.append(IngestResult(path=rel, chunks=len(chunks), action="dry-run"))
-        return results
+            yield IngestResult(path=rel, chunks=len(chunks), action="dry-run")
+        return
 
     from gnosis_mcp.backend import create_backend
 
     backend = create_backend(config)
     await backend.startup()
+    pending = None
 
     try:
         # Auto-initialize schema if tables don't exist (zero-config experience)
@@ -998,56 +1023,22 @@ async def ingest_path(
         has_tags = await backend.has_column(table_name, "tags")
 
         total_files = len(files)
+        # Checked once per walk: up to four INFO lines per file otherwise.
+        verbose = log.isEnabledFor(logging.INFO)
+        pending = asyncio.create_task(asyncio.to_thread(_read_source, files[0], base))
         for idx, f in enumerate(files, 1):
             rel = str(f.relative_to(base))
-            try:
-                if f.suffix.lower() == ".pdf":
-                    raw = f.read_bytes()
-                    text = raw.hex()[:100]  # Placeholder for hash input
-                    digest = hashlib.sha256(raw).hexdigest()[:16]
-                    md_text = _convert_pdf(raw, f)
-                    if not md_text or len(md_text.strip()) < 50:
-                        results.append(
-                            IngestResult(
-                                path=rel,
-                                chunks=0,
-                                action="skipped",
-                                detail="PDF empty or too small",
-                            )
-                        )
-                        continue
-                else:
-                    if _looks_binary(f):
-                        results.append(
-                            IngestResult(
-                                path=rel, chunks=0, action="skipped", detail="Binary content"
-                            )
-                        )
-                        continue
-                    text = f.read_text(encoding="utf-8", errors="replace")
-                    if len(text.strip()) < 50:
-                        results.append(
-                            IngestResult(path=rel, chunks=0, action="skipped", detail="Too small")
-                        )
-                        continue
-                    digest = content_hash(text)
-                    md_text = _convert_to_markdown(text, f)
-                    # Post-convert size check: some converters (empty ipynb,
-                    # CSVs with only a header) return tiny/empty output that
-                    # would otherwise reach FTS as a single dehydrated chunk.
-                    if not md_text or len(md_text.strip()) < 50:
-                        results.append(
-                            IngestResult(
-                                path=rel,
-                                chunks=0,
-                                action="skipped",
-                                detail="Empty after conversion",
-                            )
-                        )
-                        continue
-            except OSError as e:
-                results.append(IngestResult(path=rel, chunks=0, action="error", detail=str(e)))
+            loaded = await pending
+            # Read the next file in a worker thread while this one is written.
+            pending = (
+                asyncio.create_task(asyncio.to_thread(_read_source, files[idx], base))
+                if idx < total_files
+                else None
+            )
+            if isinstance(loaded, IngestResult):
+                yield loaded
                 continue
+            md_text, digest = loaded
 
             # Parse frontmatter
             frontmatter, body = parse_frontmatter(md_text)
@@ -1058,9 +1049,7 @@ async def ingest_path(
                 if existing == digest:
                     # Count existing chunks — use get_doc for chunk count
                     doc_chunks = await backend.get_doc(rel)
-                    results.append(
-                        IngestResult(path=rel, chunks=len(doc_chunks), action="unchanged")
-                    )
+                    yield IngestResult(path=rel, chunks=len(doc_chunks), action="unchanged")
                     continue
 
             # Extract metadata
@@ -1093,7 +1082,8 @@ async def ingest_path(
             if link_targets:
                 try:
                     inserted = await backend.insert_links(rel, link_targets)
-                    log.info("links: %s -> %d targets", rel, inserted)
+                    if verbose:
+                        log.info("links: %s -> %d targets", rel, inserted)
                 except Exception:
                     log.debug("insert_links failed for %s (links table may not exist)", rel)
 
@@ -1109,7 +1099,10 @@ async def ingest_path(
                         t_inserted = await backend.insert_links(
                             rel, t_targets, relation_type=t_type
                         )
-                        log.info("typed_relations[%s]: %s -> %d targets", t_type, rel, t_inserted)
+                        if verbose:
+                            log.info(
+                                "typed_relations[%s]: %s -> %d targets", t_type, rel, t_inserted
+                            )
                     except Exception:
                         log.debug(
                             "typed_relations insert failed for %s type=%s (links table may not exist)",
@@ -1126,18 +1119,21 @@ async def ingest_path(
                         content_links,
                         relation_type="content_link",
                     )
-                    log.info("content_links: %s -> %d targets", rel, cl_inserted)
+                    if verbose:
+                        log.info("content_links: %s -> %d targets", rel, cl_inserted)
                 except Exception:
                     log.debug("content link insert failed for %s", rel)
 
-            results.append(IngestResult(path=rel, chunks=count, action="ingested"))
-            log.info("[%d/%d] ingested: %s (%d chunks)", idx, total_files, rel, count)
+            yield IngestResult(path=rel, chunks=count, action="ingested")
+            if verbose:
+                log.info("[%d/%d] ingested: %s (%d chunks)", idx, total_files, rel, count)
 
     finally:
+        # The caller may stop iterating early: don't leave a read-ahead behind.
+        if pending is not None:
+            pending.cancel()
         await backend.shutdown()
 
-    return results
-
 
 async def diff_path(config, root: str) -> dict[str, list[str]]:
     """Compare filesystem files with database state.
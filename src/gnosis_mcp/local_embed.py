@@ -10,6 +10,7 @@ from __future__ import annotations
 import hashlib
 import logging
 import os
+import threading
 import urllib.request
 from pathlib import Path
 
@@ -54,9 +55,11 @@ def _sha256_file(path: Path) -> str:
     return h.hexdigest()
 
 
-# Module-level singleton — loaded once, reused across calls
+# Module-level singleton — loaded once, reused across calls. `embed --concurrency`
+# calls into it from several worker threads, so creation is serialized.
 _embedder: LocalEmbedder | None = None
 _embedder_model: str | None = None
+_embedder_lock = threading.Lock()
 
 
 def _get_cache_dir() -> Path:
@@ -157,31 +160,38 @@ class LocalEmbedder:
         self._tokenizer = None
         self._session = None
         self._input_names: list[str] = []
+        self._load_lock = threading.Lock()
 
     def _ensure_model(self) -> None:
         """Download model if missing, then load tokenizer + ONNX session."""
         if self._session is not None:
             return
 
-        from tokenizers import Tokenizer
-        import onnxruntime as ort
+        with self._load_lock:
+            if self._session is not None:
+                return
 
-        model_dir, onnx_rel = _download_model(self._model_id, self._cache_dir)
+            from tokenizers import Tokenizer
+            import onnxruntime as ort
 
-        # Load tokenizer
-        tokenizer_path = model_dir / "tokenizer.json"
-        self._tokenizer = Tokenizer.from_file(str(tokenizer_path))
+            model_dir, onnx_rel = _download_model(self._model_id, self._cache_dir)
 
-        # Load ONNX model with CPU provider
-        onnx_path = model_dir / onnx_rel
-        opts = ort.SessionOptions()
-        opts.inter_op_num_threads = 1
-        opts.intra_op_num_threads = 4
-        self._session = ort.InferenceSession(
-            str(onnx_path), sess_options=opts, providers=["CPUExecutionProvider"]
-        )
-        self._input_names = [inp.name for inp in self._session.get_inputs()]
-        log.info("Local embedder loaded: model=%s dim=%d", self._model_id, self._dim)
+            # Load tokenizer
+            tokenizer_path = model_dir / "tokenizer.json"
+            self._tokenizer = Tokenizer.from_file(str(tokenizer_path))
+
+            # Load ONNX model with CPU provider
+            onnx_path = model_dir / onnx_rel
+            opts = ort.SessionOptions()
+            opts.inter_op_num_threads = 1
+            opts.intra_op_num_threads = 4
+            session = ort.InferenceSession(
+                str(onnx_path), sess_options=opts, providers=["CPUExecutionProvider"]
+            )
+            self._input_names = [inp.name for inp in session.get_inputs()]
+            # Publish the session last: other threads skip the lock once it is set.
+            self._session = session
+            log.info("Local embedder loaded: model=%s dim=%d", self._model_id, self._dim)
 
     def embed(self, texts: list[str]) -> list[list[float]]:
         """Embed a batch of texts. Returns list of float vectors."""
@@ -244,8 +254,8 @@ def get_embedder(model: str | None = None, dim: int | None = None) -> LocalEmbed
     model = model or _DEFAULT_MODEL
     dim = dim or _DEFAULT_DIM
 
-    if _embedder is None or _embedder_model != model:
-        _embedder = LocalEmbedder(model_id=model, dim=dim)
-        _embedder_model = model
-
-    return _embedder
+    with _embedder_lock:
+        if _embedder is None or _embedder_model != model:
+            _embedder = LocalEmbedder(model_id=model, dim=dim)
+            _embedder_model = model
+        return _embedder
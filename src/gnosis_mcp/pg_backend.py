@@ -2,13 +2,61 @@
 
 from __future__ import annotations
 
+import json
 import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
 from typing import Any
 
+from gnosis_mcp.backend import _finish_export_doc
+
 __all__ = ["PostgresBackend"]
 
 log = logging.getLogger("gnosis_mcp")
 
+_TABLE_EXISTS_SQL = (
+    "SELECT EXISTS ("
+    "  SELECT 1 FROM information_schema.tables"
+    "  WHERE table_schema = $1 AND table_name = $2"
+    ")"
+)
+
+# check_health's catalog probes, answered in one row: server version,
+# pgvector, chunks table, links table, search function ($4/$5 NULL = none).
+_HEALTH_SQL = (
+    "SELECT version(),"
+    " EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'vector'),"
+    " EXISTS (SELECT 1 FROM information_schema.tables"
+    "  WHERE table_schema = $1 AND table_name = $2),"
+    " EXISTS (SELECT 1 FROM information_schema.tables"
+    "  WHERE table_schema = $1 AND table_name = $3),"
+    " EXISTS (SELECT 1 FROM information_schema.routines"
+    "  WHERE routine_schema = $4 AND routine_name = $5)"
+)
+
+# Pool connection lifecycle: recycle after this many queries (asyncpg's own
+# default, made explicit) and close connections idle for longer than 5 minutes.
+_POOL_MAX_QUERIES = 50_000
+_POOL_MAX_IDLE_S = 300.0
+
+# Session settings sent in every connection's startup packet. Unlike a SET
+# in an init callback they survive the RESET ALL asyncpg runs when a
+# connection goes back to the pool. The statements here return tens of rows,
+# where JIT compilation only adds latency once a large table pushes the plan
+# cost past jit_above_cost. The text search config is not among them: the
+# SQL names 'english' itself, matching the stored tsv column, whatever the
+# server default or a connection pooler lets through.
+_SERVER_SETTINGS = {
+    "jit": "off",
+    "application_name": "gnosis-mcp",
+}
+
+# Rows fetched per round trip when streaming export_docs. Only one batch is
+# held at a time, so a larger batch trades a little memory for fewer trips.
+_EXPORT_FETCH = 1000
+
+_HEADLINE_OPTS = "'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=20'"
+
 
 def _to_or_query(text: str) -> str:
     """Convert multi-word query to websearch_to_tsquery OR format.
@@ -30,6 +78,264 @@ def _row_count(status: str) -> int:
         return 0
 
 
+def _union_select(
+    tables: list[str], select_clause: str, where_clause: str = "", order_clause: str = ""
+) -> str:
+    """SELECT over one chunks table, or a UNION ALL over several."""
+    if len(tables) == 1:
+        sql = f"SELECT {select_clause} FROM {tables[0]}"
+        if where_clause:
+            sql += f" WHERE {where_clause}"
+        if order_clause:
+            sql += f" {order_clause}"
+        return sql
+
+    parts = []
+    for tbl in tables:
+        part = f"SELECT {select_clause} FROM {tbl}"
+        if where_clause:
+            part += f" WHERE {where_clause}"
+        parts.append(part)
+    sql = f"SELECT * FROM ({' UNION ALL '.join(parts)}) AS _combined"
+    if order_clause:
+        sql += f" {order_clause}"
+    return sql
+
+
+def _vector_literal(values) -> str:
+    """Render an embedding as pgvector's text input, e.g. ``[0.1,0.2]``.
+
+    ``map(str, ...)`` runs the per-element conversion in C, which matters at
+    384-1536 dimensions per call; ``str`` (not ``repr``) also keeps numpy
+    scalars as plain numbers.
+    """
+    return "[" + ",".join(map(str, values)) + "]"
+
+
+def _search_rows(rows) -> list[dict[str, Any]]:
+    """Shape keyword/hybrid search Records as result dicts.
+
+    Both statements select file_path, title, content, category, score, highlight
+    in that order (see `_build_queries`), so columns are read by position:
+    an index into the Record instead of a name lookup per field per row.
+    """
+    return [
+        {
+            "file_path": r[0],
+            "title": r[1],
+            "content": r[2],
+            "category": r[3],
+            "score": float(r[4]),
+            "highlight": r[5],
+        }
+        for r in rows
+    ]
+
+
+@dataclass(frozen=True)
+class _Queries:
+    """Hot-path SQL specialised for one config.
+
+    Column and table names are fixed for the backend's lifetime, so the text is
+    built once in `PostgresBackend.__init__`. Identical text per call also keeps
+    asyncpg's per-connection prepared-statement cache hitting.
+    """
+
+    search_keyword: str
+    search_hybrid: str
+    search_custom: str
+    search_custom_embedding: str
+    get_doc: str
+    get_doc_content: str
+    related: str
+    related_rt: str
+    related_titled: str
+    related_titled_rt: str
+    related_graph: str
+    related_graph_rt: str
+    related_title: str
+    export_docs: str
+
+
+def _build_queries(cfg, content_chars: int | None = None) -> _Queries:
+    """Render every `_Queries` statement for `cfg` (a validated GnosisMcpConfig).
+
+    With `content_chars`, the keyword/hybrid search statements return only the
+    head of the content column. `left()` lets PostgreSQL stop detoasting early
+    and keeps the rest of the chunk off the wire and out of asyncpg's decoder.
+    """
+    tables = cfg.qualified_chunks_tables
+    lt = cfg.qualified_links_table
+    qt = cfg.qualified_chunks_table
+    col_src = cfg.col_source_path
+    col_tgt = cfg.col_target_path
+    col_rt = cfg.col_relation_type
+
+    # The search statements parse the query once in a CTE (`_q.tsq`) and take
+    # the category as a nullable parameter, so each mode is a single statement
+    # whatever the filter: one prepared-statement cache entry instead of two.
+    headline = f"ts_headline('english', {cfg.col_content}, _q.tsq, {_HEADLINE_OPTS}) AS highlight"
+    content_col = cfg.col_content
+    if content_chars is not None:
+        content_col = f"left({cfg.col_content}, {int(content_chars)}) AS {cfg.col_content}"
+    base_cols = f"{cfg.col_file_path}, {cfg.col_title}, {content_col}, {cfg.col_category}"
+    order = "ORDER BY score DESC LIMIT $2"
+
+    tsq_cte = "WITH _q AS (SELECT websearch_to_tsquery('english', $1) AS tsq) "
+    tables_q = [f"{t}, _q" for t in tables]
+
+    # Keyword binds (query, limit, category).
+    keyword_select = f"{base_cols}, ts_rank({cfg.col_tsv}, _q.tsq) AS score, {headline}"
+    keyword_where = (
+        f"{cfg.col_tsv} @@ _q.tsq AND ($3::text IS NULL OR {cfg.col_category} = $3::text)"
+    )
+
+    # Hybrid binds (query, limit, embedding, category).
+    hybrid_select = (
+        f"{base_cols}, "
+        f"CASE WHEN {cfg.col_embedding} IS NOT NULL THEN "
+        f"  (ts_rank({cfg.col_tsv}, _q.tsq)::float * 0.4 "
+        f"  + (1.0 - ({cfg.col_embedding} <=> $3::vector))::float * 0.6) "
+        f"ELSE ts_rank({cfg.col_tsv}, _q.tsq)::float "
+        f"END AS score, "
+        f"{headline}"
+    )
+    hybrid_where = (
+        f"({cfg.col_tsv} @@ _q.tsq "
+        f"OR ({cfg.col_embedding} IS NOT NULL "
+        f"AND ({cfg.col_embedding} <=> $3::vector) < 0.8)) "
+        f"AND ($4::text IS NULL OR {cfg.col_category} = $4::text)"
+    )
+
+    doc_cols = (
+        f"{cfg.col_title}, {cfg.col_content}, {cfg.col_category}, "
+        f"{cfg.col_audience}, {cfg.col_tags}, {cfg.col_chunk_index}"
+    )
+
+    fn = cfg.search_function
+    # Depth-1 neighbours. The titled variant joins chunk 0 of the far end.
+    related = (
+        f"SELECT "
+        f"  CASE WHEN {col_src} = $1 THEN {col_tgt} ELSE {col_src} END AS related_path, "
+        f"  {col_rt}, "
+        f"  CASE WHEN {col_src} = $1 THEN 'outgoing' ELSE 'incoming' END AS direction "
+        f"FROM {lt} "
+        f"WHERE ({col_src} = $1 OR {col_tgt} = $1) "
+    )
+    related_titled = (
+        f"SELECT "
+        f"  CASE WHEN l.{col_src} = $1 "
+        f"    THEN l.{col_tgt} ELSE l.{col_src} END AS related_path, "
+        f"  l.{col_rt}, "
+        f"  CASE WHEN l.{col_src} = $1 "
+        f"    THEN 'outgoing' ELSE 'incoming' END AS direction, "
+        f"  c.{cfg.col_title} AS title, c.{cfg.col_category} AS category "
+        f"FROM {lt} l "
+        f"LEFT JOIN {qt} c "
+        f"  ON c.{cfg.col_file_path} = CASE WHEN l.{col_src} = $1 "
+        f"    THEN l.{col_tgt} ELSE l.{col_src} END "
+        f"  AND c.{cfg.col_chunk_index} = 0 "
+        f"WHERE (l.{col_src} = $1 OR l.{col_tgt} = $1) "
+    )
+
+    def graph(rt_filter_base: str, rt_filter_recurse: str) -> str:
+        return (
+            f"WITH RECURSIVE graph(path, rel_type, hop) AS ("
+            f"  SELECT CASE WHEN {col_src} = $1 THEN {col_tgt} ELSE {col_src} END, "
+            f"         {col_rt}, 1 "
+            f"  FROM {lt} "
+            f"  WHERE ({col_src} = $1 OR {col_tgt} = $1){rt_filter_base} "
+            f"  UNION "
+            f"  SELECT CASE WHEN l.{col_src} = g.path THEN l.{col_tgt} ELSE l.{col_src} END, "
+            f"         l.{col_rt}, g.hop + 1 "
+            f"  FROM graph g "
+            f"  JOIN {lt} l ON (l.{col_src} = g.path OR l.{col_tgt} = g.path) "
+            f"  WHERE g.hop < $2 AND "
+            f"    CASE WHEN l.{col_src} = g.path THEN l.{col_tgt} ELSE l.{col_src} END != $1"
+            f"    {rt_filter_recurse}"
+            f") "
+            f"SELECT DISTINCT path AS related_path, rel_type AS relation_type, MIN(hop) AS hops "
+            f"FROM graph "
+            f"WHERE path != $1 "
+            f"GROUP BY path, rel_type "
+            f"ORDER BY hops, path "
+            f"LIMIT 50"
+        )
+
+    return _Queries(
+        search_keyword=tsq_cte + _union_select(tables_q, keyword_select, keyword_where, order),
+        search_hybrid=tsq_cte + _union_select(tables_q, hybrid_select, hybrid_where, order),
+        search_custom=(
+            f"SELECT * FROM {fn}("
+            f"p_query_text := $1::text, p_embedding := NULL::vector, "
+            f"p_categories := $2::text[], p_limit := $3::integer)"
+        ),
+        search_custom_embedding=(
+            f"SELECT * FROM {fn}("
+            f"p_query_text := $1::text, p_embedding := $2::vector, "
+            f"p_categories := $3::text[], p_limit := $4::integer)"
+        ),
+        get_doc=_union_select(
+            tables, doc_cols, f"{cfg.col_file_path} = $1", f"ORDER BY {cfg.col_chunk_index} ASC"
+        ),
+        # Joins the chunks server-side: one row on the wire instead of one per
+        # chunk. Metadata comes from the first chunk via LATERAL (tags is an
+        # array column, so array_agg(...)[1] would not work). No chunks means
+        # an empty LATERAL and therefore no row.
+        get_doc_content=(
+            f"WITH _doc AS ({_union_select(tables, doc_cols, f'{cfg.col_file_path} = $1')}) "
+            f"SELECT f.{cfg.col_title}, a.content, f.{cfg.col_category}, "
+            f"f.{cfg.col_audience}, f.{cfg.col_tags}, a.chunks "
+            f"FROM (SELECT string_agg({cfg.col_content}, E'\\n\\n' "
+            f"ORDER BY {cfg.col_chunk_index}) AS content, count(*) AS chunks FROM _doc) a, "
+            f"LATERAL (SELECT {cfg.col_title}, {cfg.col_category}, {cfg.col_audience}, "
+            f"{cfg.col_tags} FROM _doc ORDER BY {cfg.col_chunk_index} LIMIT 1) f"
+        ),
+        related=f"{related}ORDER BY {col_rt}, related_path",
+        related_rt=f"{related}AND {col_rt} = $2 ORDER BY {col_rt}, related_path",
+        related_titled=f"{related_titled}ORDER BY l.{col_rt}, related_path",
+        related_titled_rt=(
+            f"{related_titled}AND l.{col_rt} = $2 ORDER BY l.{col_rt}, related_path"
+        ),
+        related_graph=graph("", ""),
+        related_graph_rt=graph(f" AND {col_rt} = $3", f" AND l.{col_rt} = $3"),
+        related_title=(
+            f"SELECT {cfg.col_title} AS title, {cfg.col_category} AS category "
+            f"FROM {qt} "
+            f"WHERE {cfg.col_file_path} = $1 AND {cfg.col_chunk_index} = 0"
+        ),
+        # Binds the category as a nullable parameter, like the search statements.
+        export_docs=(
+            f"SELECT {cfg.col_file_path}, {cfg.col_title}, {cfg.col_content}, {cfg.col_category} "
+            f"FROM {qt} "
+            f"WHERE ($1::text IS NULL OR {cfg.col_category} = $1::text) "
+            f"ORDER BY {cfg.col_file_path}, {cfg.col_chunk_index}"
+        ),
+    )
+
+
+def _build_stats_sql(cfg, embedded: bool, links: bool) -> str:
+    """Render stats() as one statement for `cfg`.
+
+    The embedding count and links count are only referenced when the column
+    and table exist; otherwise they are literals.
+    """
+    qt = cfg.qualified_chunks_table
+    fp, cat = cfg.col_file_path, cfg.col_category
+    embedded_sql = f"count({cfg.col_embedding})" if embedded else "0"
+    links_sql = f"(SELECT count(*) FROM {cfg.qualified_links_table})" if links else "NULL"
+    return (
+        f"SELECT count(*) AS chunks, count(DISTINCT {fp}) AS docs, "
+        f"coalesce(sum(length({cfg.col_content})), 0) AS size, "
+        f"{embedded_sql} AS embedded, {links_sql} AS links, "
+        f"(SELECT coalesce(json_agg(json_build_object("
+        f"'cat', c.cat, 'docs', c.docs, 'chunks', c.chunks) ORDER BY c.docs DESC), '[]') "
+        f"FROM (SELECT {cat} AS cat, count(DISTINCT {fp}) AS docs, count(*) AS chunks "
+        f"FROM {qt} GROUP BY {cat}) c) AS cats "
+        f"FROM {qt}"
+    )
+
+
 class PostgresBackend:
     """DocBackend implementation for PostgreSQL with pgvector."""
 
@@ -38,6 +344,17 @@ class PostgresBackend:
 
         self._cfg: GnosisMcpConfig = config
         self._pool = None
+        self._sql = _build_queries(config)
+        # Startup-packet settings, or none when SERVER_SETTINGS is off (PgBouncer).
+        self._server_settings = _SERVER_SETTINGS if config.server_settings else None
+        # Preview-length search variants, keyed by content_chars. Callers pass
+        # a config-derived length, so this holds one or two entries in practice.
+        self._preview_sql: dict[int, _Queries] = {}
+        # stats() statements, keyed by (embedding column exists, links table exists).
+        self._stats_sql: dict[tuple[bool, bool], str] = {}
+        # Whether the links table exists. Probed once (information_schema is
+        # not cheap) and reset by init_schema(), the only DDL this backend runs.
+        self._links_exists: bool | None = None
 
     # -- lifecycle -------------------------------------------------------------
 
@@ -48,8 +365,14 @@ class PostgresBackend:
         try:
             self._pool = await asyncpg.create_pool(
                 cfg.database_url,
-                min_size=cfg.pool_min,
+                # A POOL_MAX below the default POOL_MIN shrinks the floor too.
+                min_size=min(cfg.pool_min, cfg.pool_max),
                 max_size=cfg.pool_max,
+                max_queries=_POOL_MAX_QUERIES,
+                max_inactive_connection_lifetime=_POOL_MAX_IDLE_S,
+                command_timeout=cfg.command_timeout,
+                statement_cache_size=cfg.statement_cache_size,
+                server_settings=self._server_settings,
             )
         except (OSError, asyncpg.PostgresError) as exc:
             log.error("Failed to connect to database: %s", exc)
@@ -57,7 +380,8 @@ class PostgresBackend:
             raise SystemExit(1) from exc
 
         async with self._pool.acquire() as conn:
-            await conn.fetchval("SELECT 1")
+            # Doubles as the connectivity check and warms the links-table cache.
+            await self._links_table_exists(conn)
 
         log.info(
             "gnosis-mcp started: backend=postgres schema=%s chunks=%s links=%s search_fn=%s",
@@ -74,29 +398,20 @@ class PostgresBackend:
 
     # -- helpers ---------------------------------------------------------------
 
+    async def _links_table_exists(self, conn) -> bool:
+        if self._links_exists is None:
+            cfg = self._cfg
+            self._links_exists = bool(
+                await conn.fetchval(_TABLE_EXISTS_SQL, cfg.schema, cfg.links_table)
+            )
+        return self._links_exists
+
     def _union_select(
         self, select_clause: str, where_clause: str = "", order_clause: str = ""
     ) -> str:
-        cfg = self._cfg
-        tables = cfg.qualified_chunks_tables
-        if len(tables) == 1:
-            sql = f"SELECT {select_clause} FROM {tables[0]}"
-            if where_clause:
-                sql += f" WHERE {where_clause}"
-            if order_clause:
-                sql += f" {order_clause}"
-            return sql
-
-        parts = []
-        for tbl in tables:
-            part = f"SELECT {select_clause} FROM {tbl}"
-            if where_clause:
-                part += f" WHERE {where_clause}"
-            parts.append(part)
-        sql = f"SELECT * FROM ({' UNION ALL '.join(parts)}) AS _combined"
-        if order_clause:
-            sql += f" {order_clause}"
-        return sql
+        return _union_select(
+            self._cfg.qualified_chunks_tables, select_clause, where_clause, order_clause
+        )
 
     async def _acquire(self):
         """Acquire a connection from the pool, or create a standalone connection."""
@@ -105,21 +420,46 @@ class PostgresBackend:
 
         # Standalone connection for CLI commands
         class _StandaloneCtx:
-            def __init__(self, url):
+            def __init__(self, url, server_settings):
                 self._url = url
+                self._server_settings = server_settings
                 self._conn = None
 
             async def __aenter__(self):
                 import asyncpg as apg
 
-                self._conn = await apg.connect(self._url)
+                self._conn = await apg.connect(self._url, server_settings=self._server_settings)
                 return self._conn
 
             async def __aexit__(self, *exc):
                 if self._conn:
                     await self._conn.close()
 
-        return _StandaloneCtx(self._cfg.database_url)
+        return _StandaloneCtx(self._cfg.database_url, self._server_settings)
+
+    # Single-statement shortcuts. With a pool, asyncpg's Pool.fetch/fetchval/
+    # execute acquire and release internally, skipping the acquire-context
+    # coroutines; without one (startup() not called) they fall back to a
+    # standalone connection. Multi-statement methods still acquire explicitly
+    # so their queries share one connection.
+
+    async def _fetch(self, sql: str, *args) -> list:
+        if self._pool:
+            return await self._pool.fetch(sql, *args)
+        async with await self._acquire() as conn:
+            return await conn.fetch(sql, *args)
+
+    async def _fetchval(self, sql: str, *args) -> Any:
+        if self._pool:
+            return await self._pool.fetchval(sql, *args)
+        async with await self._acquire() as conn:
+            return await conn.fetchval(sql, *args)
+
+    async def _execute(self, sql: str, *args) -> str:
+        if self._pool:
+            return await self._pool.execute(sql, *args)
+        async with await self._acquire() as conn:
+            return await conn.execute(sql, *args)
 
     # -- schema ----------------------------------------------------------------
 
@@ -129,75 +469,58 @@ class PostgresBackend:
         from gnosis_mcp.schema import get_init_sql
 
         sql = get_init_sql(self._cfg)
-        conn = await asyncpg.connect(self._cfg.database_url)
+        # The DDL gets its own connection, outside the pool's command_timeout:
+        # building the HNSW or GIN index on a populated table can take minutes.
+        conn = await asyncpg.connect(self._cfg.database_url, server_settings=self._server_settings)
         try:
             await conn.execute(sql)
         finally:
             await conn.close()
+        self._links_exists = None
         return sql
 
     async def check_health(self) -> dict[str, Any]:
-        import asyncpg
-
         cfg = self._cfg
         result: dict[str, Any] = {"backend": "postgres"}
-        conn = await asyncpg.connect(cfg.database_url)
-        try:
-            version = await conn.fetchval("SELECT version()")
-            result["version"] = version.split(",")[0]
-
-            has_vector = await conn.fetchval(
-                "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'vector')"
+        fn_schema = fn_name = None
+        if cfg.search_function:
+            fn_schema, fn_name = (
+                cfg.search_function.split(".", 1)
+                if "." in cfg.search_function
+                else ("public", cfg.search_function)
             )
-            result["pgvector"] = has_vector
-
-            chunks_exists = await conn.fetchval(
-                "SELECT EXISTS ("
-                "  SELECT 1 FROM information_schema.tables"
-                "  WHERE table_schema = $1 AND table_name = $2"
-                ")",
+        # Two round-trips on one connection: every catalog probe in a single
+        # row, then the row counts for whichever tables exist.
+        async with await self._acquire() as conn:
+            version, has_vector, chunks_exists, links_exists, fn_exists = await conn.fetchrow(
+                _HEALTH_SQL,
                 cfg.schema,
                 cfg.chunks_tables[0],
-            )
-            result["chunks_table_exists"] = chunks_exists
-            if chunks_exists:
-                count = await conn.fetchval(f"SELECT count(*) FROM {cfg.qualified_chunks_table}")
-                result["chunks_count"] = count
-                docs = await conn.fetchval(
-                    f"SELECT count(DISTINCT {cfg.col_file_path}) FROM {cfg.qualified_chunks_table}"
-                )
-                result["docs_count"] = docs
-
-            links_exists = await conn.fetchval(
-                "SELECT EXISTS ("
-                "  SELECT 1 FROM information_schema.tables"
-                "  WHERE table_schema = $1 AND table_name = $2"
-                ")",
-                cfg.schema,
                 cfg.links_table,
+                fn_schema,
+                fn_name,
             )
-            result["links_table_exists"] = links_exists
+            self._links_exists = bool(links_exists)
+
+            counts: list[str] = []
+            if chunks_exists:
+                qt = cfg.qualified_chunks_table
+                counts.append(f"(SELECT count(*) FROM {qt})")
+                counts.append(f"(SELECT count(DISTINCT {cfg.col_file_path}) FROM {qt})")
             if links_exists:
-                count = await conn.fetchval(f"SELECT count(*) FROM {cfg.qualified_links_table}")
-                result["links_count"] = count
-
-            if cfg.search_function:
-                fn_schema, fn_name = (
-                    cfg.search_function.split(".", 1)
-                    if "." in cfg.search_function
-                    else ("public", cfg.search_function)
-                )
-                fn_exists = await conn.fetchval(
-                    "SELECT EXISTS ("
-                    "  SELECT 1 FROM information_schema.routines"
-                    "  WHERE routine_schema = $1 AND routine_name = $2"
-                    ")",
-                    fn_schema,
-                    fn_name,
-                )
-                result["search_function_exists"] = fn_exists
-        finally:
-            await conn.close()
+                counts.append(f"(SELECT count(*) FROM {cfg.qualified_links_table})")
+            counted = list(await conn.fetchrow("SELECT " + ", ".join(counts))) if counts else []
+
+        result["version"] = version.split(",")[0]
+        result["pgvector"] = has_vector
+        result["chunks_table_exists"] = chunks_exists
+        if chunks_exists:
+            result["chunks_count"], result["docs_count"] = counted[:2]
+        result["links_table_exists"] = links_exists
+        if links_exists:
+            result["links_count"] = counted[-1]
+        if cfg.search_function:
+            result["search_function_exists"] = fn_exists
         return result
 
     # -- search ----------------------------------------------------------------
@@ -209,6 +532,7 @@ class PostgresBackend:
         category: str | None = None,
         limit: int = 5,
         query_embedding: list[float] | None = None,
+        content_chars: int | None = None,
     ) -> list[dict[str, Any]]:
         query = query.strip()
         if not query:
@@ -217,22 +541,32 @@ class PostgresBackend:
 
         cfg = self._cfg
 
+        if cfg.search_function:
+            # Pass raw query — custom functions do their own query parsing.
+            # _to_or_query breaks custom functions' ILIKE fallback and
+            # causes websearch_to_tsquery to treat "or" as boolean OR.
+            # The result shape of a custom function is not ours to rewrite, so
+            # content_chars is not pushed down here; callers still slice.
+            return await self._search_custom(query, category, limit, query_embedding)
+        sql = self._search_sql(content_chars)
         or_query = _to_or_query(query)
-        async with await self._acquire() as conn:
-            if cfg.search_function:
-                # Pass raw query — custom functions do their own query parsing.
-                # _to_or_query breaks custom functions' ILIKE fallback and
-                # causes websearch_to_tsquery to treat "or" as boolean OR.
-                return await self._search_custom(conn, query, category, limit, query_embedding)
-            elif query_embedding:
-                return await self._search_hybrid(conn, or_query, category, limit, query_embedding)
-            else:
-                return await self._search_keyword(conn, or_query, category, limit)
+        if query_embedding:
+            return await self._search_hybrid(sql, or_query, category, limit, query_embedding)
+        return await self._search_keyword(sql, or_query, category, limit)
+
+    def _search_sql(self, content_chars: int | None) -> _Queries:
+        if content_chars is None:
+            return self._sql
+        sql = self._preview_sql.get(content_chars)
+        if sql is None:
+            sql = self._preview_sql[content_chars] = _build_queries(self._cfg, content_chars)
+        return sql
 
-    async def _search_custom(self, conn, query, category, limit, query_embedding):
-        cfg = self._cfg
+    async def _search_custom(self, query, category, limit, query_embedding):
+        sql = self._sql
+        categories = [category] if category else None
         if query_embedding:
-            embedding_str = "[" + ",".join(str(f) for f in query_embedding) + "]"
+            embedding_str = _vector_literal(query_embedding)
             # asyncpg.exceptions is the authoritative module for Postgres error classes
             import asyncpg  # local import — asyncpg is an optional extra
 
@@ -242,34 +576,14 @@ class PostgresBackend:
                 asyncpg.exceptions.InvalidParameterValueError,
             )
             try:
-                rows = await conn.fetch(
-                    f"SELECT * FROM {cfg.search_function}("
-                    f"p_query_text := $1::text, p_embedding := $2::vector, "
-                    f"p_categories := $3::text[], p_limit := $4::integer)",
-                    query,
-                    embedding_str,
-                    [category] if category else None,
-                    limit,
+                rows = await self._fetch(
+                    sql.search_custom_embedding, query, embedding_str, categories, limit
                 )
             except _signature_mismatch:
                 log.debug("Custom search function doesn't accept p_embedding, falling back")
-                rows = await conn.fetch(
-                    f"SELECT * FROM {cfg.search_function}("
-                    f"p_query_text := $1::text, p_embedding := NULL::vector, "
-                    f"p_categories := $2::text[], p_limit := $3::integer)",
-                    query,
-                    [category] if category else None,
-                    limit,
-                )
+                rows = await self._fetch(sql.search_custom, query, categories, limit)
         else:
-            rows = await conn.fetch(
-                f"SELECT * FROM {cfg.search_function}("
-                f"p_query_text := $1::text, p_embedding := NULL::vector, "
-                f"p_categories := $2::text[], p_limit := $3::integer)",
-                query,
-                [category] if category else None,
-                limit,
-            )
+            rows = await self._fetch(sql.search_custom, query, categories, limit)
         return [
             {
                 "file_path": r["file_path"],
@@ -282,100 +596,44 @@ class PostgresBackend:
             for r in rows
         ]
 
-    async def _search_hybrid(self, conn, query, category, limit, query_embedding):
-        cfg = self._cfg
-        embedding_str = "[" + ",".join(str(f) for f in query_embedding) + "]"
-        # Always use $3 for embedding, $4 for category (when present).
-        # This avoids parameter numbering gaps when category is None.
-        select = (
-            f"{cfg.col_file_path}, {cfg.col_title}, {cfg.col_content}, "
-            f"{cfg.col_category}, "
-            f"CASE WHEN {cfg.col_embedding} IS NOT NULL THEN "
-            f"  (ts_rank({cfg.col_tsv}, websearch_to_tsquery('english', $1))::float * 0.4 "
-            f"  + (1.0 - ({cfg.col_embedding} <=> $3::vector))::float * 0.6) "
-            f"ELSE ts_rank({cfg.col_tsv}, websearch_to_tsquery('english', $1))::float "
-            f"END AS score, "
-            f"ts_headline('english', {cfg.col_content}, websearch_to_tsquery('english', $1), "
-            f"'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=20') AS highlight"
-        )
-        where = (
-            f"({cfg.col_tsv} @@ websearch_to_tsquery('english', $1) "
-            f"OR ({cfg.col_embedding} IS NOT NULL "
-            f"AND ({cfg.col_embedding} <=> $3::vector) < 0.8))"
-        )
-        if category:
-            where += f" AND {cfg.col_category} = $4"
-        sql = self._union_select(select, where, "ORDER BY score DESC LIMIT $2")
-        params = [query, limit, embedding_str]
-        if category:
-            params.append(category)
-        rows = await conn.fetch(sql, *params)
-        return [
-            {
-                "file_path": r[cfg.col_file_path],
-                "title": r[cfg.col_title],
-                "content": r[cfg.col_content],
-                "category": r.get(cfg.col_category),
-                "score": float(r["score"]),
-                "highlight": r["highlight"],
-            }
-            for r in rows
-        ]
+    async def _search_hybrid(self, sql, query, category, limit, query_embedding):
+        embedding_str = _vector_literal(query_embedding)
+        rows = await self._fetch(sql.search_hybrid, query, limit, embedding_str, category or None)
+        return _search_rows(rows)
 
-    async def _search_keyword(self, conn, query, category, limit):
-        cfg = self._cfg
-        select = (
-            f"{cfg.col_file_path}, {cfg.col_title}, {cfg.col_content}, "
-            f"{cfg.col_category}, "
-            f"ts_rank({cfg.col_tsv}, websearch_to_tsquery('english', $1)) AS score, "
-            f"ts_headline('english', {cfg.col_content}, websearch_to_tsquery('english', $1), "
-            f"'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=20') AS highlight"
-        )
-        where = f"{cfg.col_tsv} @@ websearch_to_tsquery('english', $1)"
-        if category:
-            where += f" AND {cfg.col_category} = $3"
-        sql = self._union_select(select, where, "ORDER BY score DESC LIMIT $2")
-        rows = await conn.fetch(
-            sql,
-            query,
-            limit,
-            *([category] if category else []),
-        )
+    async def _search_keyword(self, sql, query, category, limit):
+        rows = await self._fetch(sql.search_keyword, query, limit, category or None)
+        return _search_rows(rows)
+
+    # -- document CRUD ---------------------------------------------------------
+
+    async def get_doc(self, path: str) -> list[dict[str, Any]]:
+        rows = await self._fetch(self._sql.get_doc, path)
         return [
             {
-                "file_path": r[cfg.col_file_path],
-                "title": r[cfg.col_title],
-                "content": r[cfg.col_content],
-                "category": r.get(cfg.col_category),
-                "score": float(r["score"]),
-                "highlight": r["highlight"],
+                "title": r[0],
+                "content": r[1],
+                "category": r[2],
+                "audience": r[3],
+                "tags": r[4],
+                "chunk_index": r[5],
             }
             for r in rows
         ]
 
-    # -- document CRUD ---------------------------------------------------------
-
-    async def get_doc(self, path: str) -> list[dict[str, Any]]:
-        cfg = self._cfg
-        async with await self._acquire() as conn:
-            sql = self._union_select(
-                f"{cfg.col_title}, {cfg.col_content}, {cfg.col_category}, "
-                f"{cfg.col_audience}, {cfg.col_tags}, {cfg.col_chunk_index}",
-                f"{cfg.col_file_path} = $1",
-                f"ORDER BY {cfg.col_chunk_index} ASC",
-            )
-            rows = await conn.fetch(sql, path)
-            return [
-                {
-                    "title": r[cfg.col_title],
-                    "content": r[cfg.col_content],
-                    "category": r[cfg.col_category],
-                    "audience": r[cfg.col_audience],
-                    "tags": r[cfg.col_tags],
-                    "chunk_index": r[cfg.col_chunk_index],
-                }
-                for r in rows
-            ]
+    async def get_doc_content(self, path: str) -> dict[str, Any] | None:
+        rows = await self._fetch(self._sql.get_doc_content, path)
+        if not rows:
+            return None
+        r = rows[0]
+        return {
+            "title": r[0],
+            "content": r[1],
+            "category": r[2],
+            "audience": r[3],
+            "tags": r[4],
+            "chunks": r[5],
+        }
 
     async def get_related(
         self,
@@ -385,194 +643,93 @@ class PostgresBackend:
         relation_type: str | None = None,
         include_titles: bool = False,
     ) -> list[dict[str, Any]] | None:
-        cfg = self._cfg
-        async with await self._acquire() as conn:
-            exists = await conn.fetchval(
-                "SELECT EXISTS ("
-                "  SELECT 1 FROM information_schema.tables"
-                "  WHERE table_schema = $1 AND table_name = $2"
-                ")",
-                cfg.schema,
-                cfg.links_table,
-            )
-            if not exists:
-                return None
-
-            depth = min(depth, 3)  # Hard cap
-
-            if depth == 1:
-                # Single-hop query
-                base_sql = (
-                    f"SELECT "
-                    f"  CASE WHEN {cfg.col_source_path} = $1 "
-                    f"    THEN {cfg.col_target_path} ELSE {cfg.col_source_path} END AS related_path, "
-                    f"  {cfg.col_relation_type}, "
-                    f"  CASE WHEN {cfg.col_source_path} = $1 "
-                    f"    THEN 'outgoing' ELSE 'incoming' END AS direction "
-                )
-                if include_titles:
-                    base_sql = (
-                        f"SELECT "
-                        f"  CASE WHEN l.{cfg.col_source_path} = $1 "
-                        f"    THEN l.{cfg.col_target_path} ELSE l.{cfg.col_source_path} END AS related_path, "
-                        f"  l.{cfg.col_relation_type}, "
-                        f"  CASE WHEN l.{cfg.col_source_path} = $1 "
-                        f"    THEN 'outgoing' ELSE 'incoming' END AS direction, "
-                        f"  c.{cfg.col_title} AS title, c.{cfg.col_category} AS category "
-                        f"FROM {cfg.qualified_links_table} l "
-                        f"LEFT JOIN {cfg.qualified_chunks_table} c "
-                        f"  ON c.{cfg.col_file_path} = CASE WHEN l.{cfg.col_source_path} = $1 "
-                        f"    THEN l.{cfg.col_target_path} ELSE l.{cfg.col_source_path} END "
-                        f"  AND c.{cfg.col_chunk_index} = 0 "
-                        f"WHERE (l.{cfg.col_source_path} = $1 OR l.{cfg.col_target_path} = $1) "
-                    )
-                else:
-                    base_sql += (
-                        f"FROM {cfg.qualified_links_table} "
-                        f"WHERE ({cfg.col_source_path} = $1 OR {cfg.col_target_path} = $1) "
-                    )
-
-                params: list[Any] = [path]
-                idx = 2
-
-                if relation_type:
-                    rt_col = (
-                        f"l.{cfg.col_relation_type}" if include_titles else cfg.col_relation_type
-                    )
-                    base_sql += f"AND {rt_col} = ${idx} "
-                    params.append(relation_type)
-                    idx += 1
-
-                rt_order = (
-                    f"l.{cfg.col_relation_type}" if include_titles else cfg.col_relation_type
-                )
-                base_sql += f"ORDER BY {rt_order}, related_path"
-
-                rows = await conn.fetch(base_sql, *params)
+        import asyncpg
 
-                if include_titles:
+        # No existence probe: the links table is there in any deployment that
+        # has ingested, so the rare missing table is read off the query's error
+        # instead of paying an information_schema round trip on every call.
+        try:
+            async with await self._acquire() as conn:
+                depth = min(depth, 3)  # Hard cap
+                sql = self._sql
+
+                if depth == 1:
+                    # Single-hop query
+                    if include_titles:
+                        stmt = sql.related_titled_rt if relation_type else sql.related_titled
+                    else:
+                        stmt = sql.related_rt if relation_type else sql.related
+                    params: list[Any] = [path, relation_type] if relation_type else [path]
+
+                    rows = await conn.fetch(stmt, *params)
+
+                    if include_titles:
+                        return [
+                            {
+                                "related_path": r[0],
+                                "relation_type": r[1],
+                                "direction": r[2],
+                                "title": r[3],
+                                "category": r[4],
+                            }
+                            for r in rows
+                        ]
                     return [
-                        {
-                            "related_path": r["related_path"],
-                            "relation_type": r[cfg.col_relation_type],
-                            "direction": r["direction"],
-                            "title": r["title"],
-                            "category": r["category"],
-                        }
+                        {"related_path": r[0], "relation_type": r[1], "direction": r[2]}
                         for r in rows
                     ]
-                return [
-                    {
-                        "related_path": r["related_path"],
-                        "relation_type": r[cfg.col_relation_type],
-                        "direction": r["direction"],
-                    }
-                    for r in rows
-                ]
 
-            # Multi-hop: recursive CTE
-            col_src = cfg.col_source_path
-            col_tgt = cfg.col_target_path
-            col_rt = cfg.col_relation_type
-            lt = cfg.qualified_links_table
-
-            if relation_type:
-                rt_filter_base = f" AND {col_rt} = $3"
-                rt_filter_recurse = f" AND l.{col_rt} = $3"
-                params_cte: list[Any] = [path, depth, relation_type]
-            else:
-                rt_filter_base = ""
-                rt_filter_recurse = ""
-                params_cte = [path, depth]
-
-            cte_sql = (
-                f"WITH RECURSIVE graph(path, rel_type, hop) AS ("
-                f"  SELECT CASE WHEN {col_src} = $1 THEN {col_tgt} ELSE {col_src} END, "
-                f"         {col_rt}, 1 "
-                f"  FROM {lt} "
-                f"  WHERE ({col_src} = $1 OR {col_tgt} = $1){rt_filter_base} "
-                f"  UNION "
-                f"  SELECT CASE WHEN l.{col_src} = g.path THEN l.{col_tgt} ELSE l.{col_src} END, "
-                f"         l.{col_rt}, g.hop + 1 "
-                f"  FROM graph g "
-                f"  JOIN {lt} l ON (l.{col_src} = g.path OR l.{col_tgt} = g.path) "
-                f"  WHERE g.hop < $2 AND "
-                f"    CASE WHEN l.{col_src} = g.path THEN l.{col_tgt} ELSE l.{col_src} END != $1"
-                f"    {rt_filter_recurse}"
-                f") "
-                f"SELECT DISTINCT path AS related_path, rel_type AS relation_type, MIN(hop) AS hops "
-                f"FROM graph "
-                f"WHERE path != $1 "
-                f"GROUP BY path, rel_type "
-                f"ORDER BY hops, path "
-                f"LIMIT 50"
-            )
-
-            rows = await conn.fetch(cte_sql, *params_cte)
-            results = [
-                {
-                    "related_path": r["related_path"],
-                    "relation_type": r["relation_type"],
-                    "hops": r["hops"],
-                }
-                for r in rows
-            ]
+                # Multi-hop: recursive CTE
+                if relation_type:
+                    rows = await conn.fetch(sql.related_graph_rt, path, depth, relation_type)
+                else:
+                    rows = await conn.fetch(sql.related_graph, path, depth)
+                results = [
+                    {"related_path": r[0], "relation_type": r[1], "hops": r[2]} for r in rows
+                ]
 
-            # Optionally enrich with titles
-            if include_titles:
-                for r in results:
-                    row = await conn.fetchrow(
-                        f"SELECT {cfg.col_title} AS title, {cfg.col_category} AS category "
-                        f"FROM {cfg.qualified_chunks_table} "
-                        f"WHERE {cfg.col_file_path} = $1 AND {cfg.col_chunk_index} = 0",
-                        r["related_path"],
-                    )
-                    if row:
-                        r["title"] = row["title"]
-                        r["category"] = row["category"]
+                # Optionally enrich with titles
+                if include_titles:
+                    for r in results:
+                        row = await conn.fetchrow(sql.related_title, r["related_path"])
+                        if row:
+                            r["title"] = row[0]
+                            r["category"] = row[1]
 
-            return results
+                return results
+        except asyncpg.UndefinedTableError:
+            return None
 
     async def list_docs(self) -> list[dict[str, Any]]:
         cfg = self._cfg
-        async with await self._acquire() as conn:
-            inner = self._union_select(
-                f"{cfg.col_file_path}, {cfg.col_title}, {cfg.col_category}",
-            )
-            rows = await conn.fetch(
-                f"SELECT {cfg.col_file_path}, "
-                f"  MIN({cfg.col_title}) AS title, "
-                f"  MIN({cfg.col_category}) AS category, "
-                f"  COUNT(*) AS chunks "
-                f"FROM ({inner}) AS _all "
-                f"GROUP BY {cfg.col_file_path} "
-                f"ORDER BY category, {cfg.col_file_path}"
-            )
-            return [
-                {
-                    "file_path": r[cfg.col_file_path],
-                    "title": r["title"],
-                    "category": r["category"],
-                    "chunks": r["chunks"],
-                }
-                for r in rows
-            ]
+        inner = self._union_select(
+            f"{cfg.col_file_path}, {cfg.col_title}, {cfg.col_category}",
+        )
+        rows = await self._fetch(
+            f"SELECT {cfg.col_file_path}, "
+            f"  MIN({cfg.col_title}) AS title, "
+            f"  MIN({cfg.col_category}) AS category, "
+            f"  COUNT(*) AS chunks "
+            f"FROM ({inner}) AS _all "
+            f"GROUP BY {cfg.col_file_path} "
+            f"ORDER BY category, {cfg.col_file_path}"
+        )
+        return [{"file_path": r[0], "title": r[1], "category": r[2], "chunks": r[3]} for r in rows]
 
     async def list_categories(self) -> list[dict[str, Any]]:
         cfg = self._cfg
-        async with await self._acquire() as conn:
-            inner = self._union_select(
-                f"{cfg.col_file_path}, {cfg.col_category}",
-                f"{cfg.col_category} IS NOT NULL",
-            )
-            rows = await conn.fetch(
-                f"SELECT {cfg.col_category} AS category, "
-                f"  COUNT(DISTINCT {cfg.col_file_path}) AS docs "
-                f"FROM ({inner}) AS _all "
-                f"GROUP BY {cfg.col_category} "
-                f"ORDER BY {cfg.col_category}"
-            )
-            return [{"category": r["category"], "docs": r["docs"]} for r in rows]
+        inner = self._union_select(
+            f"{cfg.col_file_path}, {cfg.col_category}",
+            f"{cfg.col_category} IS NOT NULL",
+        )
+        rows = await self._fetch(
+            f"SELECT {cfg.col_category} AS category, "
+            f"  COUNT(DISTINCT {cfg.col_file_path}) AS docs "
+            f"FROM ({inner}) AS _all "
+            f"GROUP BY {cfg.col_category} "
+            f"ORDER BY {cfg.col_category}"
+        )
+        return [{"category": r[0], "docs": r[1]} for r in rows]
 
     async def upsert_doc(
         self,
@@ -598,31 +755,38 @@ class PostgresBackend:
                     f"DELETE FROM {cfg.qualified_chunks_table} WHERE {cfg.col_file_path} = $1",
                     path,
                 )
+                cols = (
+                    f"{cfg.col_file_path}, {cfg.col_chunk_index}, {cfg.col_title}, "
+                    f"{cfg.col_content}, {cfg.col_category}, {cfg.col_audience}, {cfg.col_tags}"
+                )
+                vals = "$1, $2, $3, $4, $5, $6, $7"
+                if has_hash_col:
+                    cols += ", content_hash"
+                    vals += ", $8"
+                rows: list[list[Any]] = []
                 for i, chunk in enumerate(chunks):
-                    cols = (
-                        f"{cfg.col_file_path}, {cfg.col_chunk_index}, {cfg.col_title}, "
-                        f"{cfg.col_content}, {cfg.col_category}, {cfg.col_audience}, {cfg.col_tags}"
-                    )
-                    vals = "$1, $2, $3, $4, $5, $6, $7"
-                    params: list[Any] = [path, i, title, chunk, category, audience, tags]
-                    idx = 8
-
+                    row: list[Any] = [path, i, title, chunk, category, audience, tags]
                     if has_hash_col:
-                        cols += ", content_hash"
-                        vals += f", ${idx}"
-                        params.append(digest)
-                        idx += 1
-
-                    if embeddings is not None and i < len(embeddings):
-                        embedding_str = "[" + ",".join(str(f) for f in embeddings[i]) + "]"
-                        cols += f", {cfg.col_embedding}"
-                        vals += f", ${idx}::vector"
-                        params.append(embedding_str)
-                        idx += 1
-
-                    await conn.execute(
+                        row.append(digest)
+                    rows.append(row)
+
+                # Chunks with an embedding take one extra column. Each group is
+                # a single executemany: asyncpg pipelines the rows instead of
+                # paying a round-trip per chunk.
+                n_embedded = min(len(embeddings), len(chunks)) if embeddings is not None else 0
+                if n_embedded:
+                    for i in range(n_embedded):
+                        rows[i].append(_vector_literal(embeddings[i]))
+                    await conn.executemany(
+                        f"INSERT INTO {cfg.qualified_chunks_table} "
+                        f"({cols}, {cfg.col_embedding}) "
+                        f"VALUES ({vals}, ${len(rows[0])}::vector)",
+                        rows[:n_embedded],
+                    )
+                if n_embedded < len(rows):
+                    await conn.executemany(
                         f"INSERT INTO {cfg.qualified_chunks_table} ({cols}) VALUES ({vals})",
-                        *params,
+                        rows[n_embedded:],
                     )
         return len(chunks)
 
@@ -635,14 +799,7 @@ class PostgresBackend:
             )
             deleted = _row_count(result)
 
-            links_exists = await conn.fetchval(
-                "SELECT EXISTS ("
-                "  SELECT 1 FROM information_schema.tables"
-                "  WHERE table_schema = $1 AND table_name = $2"
-                ")",
-                cfg.schema,
-                cfg.links_table,
-            )
+            links_exists = await self._links_table_exists(conn)
             links_deleted = 0
             if links_exists:
                 link_result = await conn.execute(
@@ -687,14 +844,13 @@ class PostgresBackend:
         if not updates:
             return 0
 
-        async with await self._acquire() as conn:
-            result = await conn.execute(
-                f"UPDATE {cfg.qualified_chunks_table} "
-                f"SET {', '.join(updates)} "
-                f"WHERE {cfg.col_file_path} = $1",
-                *params,
-            )
-            return _row_count(result)
+        result = await self._execute(
+            f"UPDATE {cfg.qualified_chunks_table} "
+            f"SET {', '.join(updates)} "
+            f"WHERE {cfg.col_file_path} = $1",
+            *params,
+        )
+        return _row_count(result)
 
     # -- stats / export --------------------------------------------------------
 
@@ -704,153 +860,104 @@ class PostgresBackend:
         # Check column existence BEFORE acquiring connection to avoid pool deadlock
         has_embed_col = await self.has_column(qt.split(".")[-1], cfg.col_embedding)
         async with await self._acquire() as conn:
-            total = await conn.fetchval(f"SELECT count(*) FROM {qt}")
-            docs = await conn.fetchval(f"SELECT count(DISTINCT {cfg.col_file_path}) FROM {qt}")
-            cats = await conn.fetch(
-                f"SELECT {cfg.col_category} AS cat, count(DISTINCT {cfg.col_file_path}) AS docs, "
-                f"count(*) AS chunks "
-                f"FROM {qt} GROUP BY {cfg.col_category} ORDER BY docs DESC"
-            )
-            size = await conn.fetchval(
-                f"SELECT coalesce(sum(length({cfg.col_content})), 0) FROM {qt}"
-            )
-
-            links = None
-            links_exists = await conn.fetchval(
-                "SELECT EXISTS ("
-                "  SELECT 1 FROM information_schema.tables"
-                "  WHERE table_schema = $1 AND table_name = $2"
-                ")",
-                cfg.schema,
-                cfg.links_table,
-            )
-            if links_exists:
-                links = await conn.fetchval(f"SELECT count(*) FROM {cfg.qualified_links_table}")
-
-            # Embedded chunks count (has_embed_col checked before acquiring conn)
-            embedded = (
-                await conn.fetchval(
-                    f"SELECT count(*) FROM {qt} WHERE {cfg.col_embedding} IS NOT NULL"
-                )
-                if has_embed_col
-                else 0
-            )
+            key = (has_embed_col, await self._links_table_exists(conn))
+            sql = self._stats_sql.get(key)
+            if sql is None:
+                sql = self._stats_sql[key] = _build_stats_sql(cfg, *key)
+            # One statement: totals, per-category breakdown, and links count
+            row = await conn.fetchrow(sql)
 
         return {
             "table": qt,
-            "docs": docs,
-            "chunks": total,
-            "embedded_chunks": embedded,
-            "content_bytes": size,
-            "categories": [
-                {"cat": r["cat"], "docs": r["docs"], "chunks": r["chunks"]} for r in cats
-            ],
-            "links": links,
+            "docs": row["docs"],
+            "chunks": row["chunks"],
+            "embedded_chunks": row["embedded"],
+            "content_bytes": row["size"],
+            "categories": json.loads(row["cats"]),
+            "links": row["links"],
         }
 
     async def export_docs(self, category: str | None = None) -> list[dict[str, Any]]:
-        cfg = self._cfg
-        qt = cfg.qualified_chunks_table
-        async with await self._acquire() as conn:
-            where = ""
-            params: list[Any] = []
-            if category:
-                where = f" WHERE {cfg.col_category} = $1"
-                params = [category]
-
-            rows = await conn.fetch(
-                f"SELECT {cfg.col_file_path}, {cfg.col_chunk_index}, "
-                f"{cfg.col_title}, {cfg.col_content}, {cfg.col_category} "
-                f"FROM {qt}{where} "
-                f"ORDER BY {cfg.col_file_path}, {cfg.col_chunk_index}",
-                *params,
-            )
-
-        docs: dict[str, dict] = {}
-        for r in rows:
-            fp = r[cfg.col_file_path]
-            if fp not in docs:
-                docs[fp] = {
-                    "file_path": fp,
-                    "title": r[cfg.col_title],
-                    "category": r[cfg.col_category],
-                    "content": "",
-                }
-            docs[fp]["content"] += r[cfg.col_content] + "\n\n"
-
-        for d in docs.values():
-            d["content"] = d["content"].rstrip()
-
-        return list(docs.values())
+        return [d async for d in self.iter_export_docs(category)]
+
+    async def iter_export_docs(self, category: str | None = None) -> AsyncIterator[dict[str, Any]]:
+        # Server-side cursor: rows arrive _EXPORT_FETCH at a time, and each
+        # document is yielded as soon as the next one starts. An empty category
+        # means no filter, as on SQLite.
+        async with await self._acquire() as conn, conn.transaction():
+            d = None
+            async for r in conn.cursor(
+                self._sql.export_docs, category or None, prefetch=_EXPORT_FETCH
+            ):
+                if d is not None and r[0] != d["file_path"]:
+                    yield _finish_export_doc(d)
+                    d = None
+                if d is None:
+                    d = {
+                        "file_path": r[0],
+                        "title": r[1],
+                        "category": r[3],
+                        "content": [],
+                        "chunks": 0,
+                    }
+                d["content"].append(r[2])
+                d["chunks"] += 1
+            if d is not None:
+                yield _finish_export_doc(d)
 
     # -- embedding support -----------------------------------------------------
 
     async def count_pending_embeddings(self) -> int:
         cfg = self._cfg
         qt = cfg.qualified_chunks_table
-        async with await self._acquire() as conn:
-            return await conn.fetchval(
-                f"SELECT count(*) FROM {qt} WHERE {cfg.col_embedding} IS NULL"
-            )
+        return await self._fetchval(f"SELECT count(*) FROM {qt} WHERE {cfg.col_embedding} IS NULL")
 
     async def get_pending_embeddings(self, batch_size: int) -> list[dict[str, Any]]:
         cfg = self._cfg
         qt = cfg.qualified_chunks_table
-        async with await self._acquire() as conn:
-            rows = await conn.fetch(
-                f"SELECT id, {cfg.col_content}, {cfg.col_title}, {cfg.col_file_path} FROM {qt} "
-                f"WHERE {cfg.col_embedding} IS NULL "
-                f"ORDER BY id LIMIT $1",
-                batch_size,
-            )
-            return [
-                {
-                    "id": r["id"],
-                    "content": r[cfg.col_content],
-                    "title": r[cfg.col_title],
-                    "file_path": r[cfg.col_file_path],
-                }
-                for r in rows
-            ]
+        rows = await self._fetch(
+            f"SELECT id, {cfg.col_content}, {cfg.col_title}, {cfg.col_file_path} FROM {qt} "
+            f"WHERE {cfg.col_embedding} IS NULL "
+            f"ORDER BY id LIMIT $1",
+            batch_size,
+        )
+        return [{"id": r[0], "content": r[1], "title": r[2], "file_path": r[3]} for r in rows]
 
     async def set_embedding(self, chunk_id: int, embedding: list[float]) -> None:
         cfg = self._cfg
         qt = cfg.qualified_chunks_table
-        embedding_str = "[" + ",".join(str(f) for f in embedding) + "]"
-        async with await self._acquire() as conn:
-            await conn.execute(
-                f"UPDATE {qt} SET {cfg.col_embedding} = $1::vector WHERE id = $2",
-                embedding_str,
-                chunk_id,
-            )
+        embedding_str = _vector_literal(embedding)
+        await self._execute(
+            f"UPDATE {qt} SET {cfg.col_embedding} = $1::vector WHERE id = $2",
+            embedding_str,
+            chunk_id,
+        )
 
     # -- ingest support --------------------------------------------------------
 
     async def has_column(self, table: str, column: str) -> bool:
         cfg = self._cfg
-        async with await self._acquire() as conn:
-            return await conn.fetchval(
-                "SELECT EXISTS ("
-                "  SELECT 1 FROM pg_catalog.pg_attribute a"
-                "  JOIN pg_catalog.pg_class c ON a.attrelid = c.oid"
-                "  JOIN pg_catalog.pg_namespace n ON c.relnamespace = n.oid"
-                "  WHERE n.nspname = $1 AND c.relname = $2"
-                "    AND a.attname = $3 AND a.attnum > 0"
-                "    AND NOT a.attisdropped"
-                ")",
-                cfg.schema,
-                table,
-                column,
-            )
+        return await self._fetchval(
+            "SELECT EXISTS ("
+            "  SELECT 1 FROM pg_catalog.pg_attribute a"
+            "  JOIN pg_catalog.pg_class c ON a.attrelid = c.oid"
+            "  JOIN pg_catalog.pg_namespace n ON c.relnamespace = n.oid"
+            "  WHERE n.nspname = $1 AND c.relname = $2"
+            "    AND a.attname = $3 AND a.attnum > 0"
+            "    AND NOT a.attisdropped"
+            ")",
+            cfg.schema,
+            table,
+            column,
+        )
 
     async def get_content_hash(self, path: str) -> str | None:
         cfg = self._cfg
         qt = cfg.qualified_chunks_table
-        async with await self._acquire() as conn:
-            return await conn.fetchval(
-                f"SELECT content_hash FROM {qt} WHERE file_path = $1 LIMIT 1",
-                path,
-            )
+        return await self._fetchval(
+            f"SELECT content_hash FROM {qt} WHERE file_path = $1 LIMIT 1",
+            path,
+        )
 
     async def insert_links(
         self,
@@ -872,19 +979,13 @@ class PostgresBackend:
                     relation_type,
                 )
 
-                count = 0
-                for target in target_paths:
-                    await conn.execute(
-                        f"INSERT INTO {lt} ({cfg.col_source_path}, {cfg.col_target_path}, {cfg.col_relation_type}) "
-                        f"VALUES ($1, $2, $3) "
-                        f"ON CONFLICT ({cfg.col_source_path}, {cfg.col_target_path}, {cfg.col_relation_type}) DO NOTHING",
-                        source_path,
-                        target,
-                        relation_type,
-                    )
-                    count += 1
-
-                return count
+                await conn.executemany(
+                    f"INSERT INTO {lt} ({cfg.col_source_path}, {cfg.col_target_path}, {cfg.col_relation_type}) "
+                    f"VALUES ($1, $2, $3) "
+                    f"ON CONFLICT ({cfg.col_source_path}, {cfg.col_target_path}, {cfg.col_relation_type}) DO NOTHING",
+                    [(source_path, target, relation_type) for target in target_paths],
+                )
+                return len(target_paths)
 
     async def savings_report(self, *, days: int = 30) -> dict[str, Any]:
         """See `DocBackend.savings_report` protocol docstring."""
@@ -1036,13 +1137,12 @@ class PostgresBackend:
     async def purge_access_log(self, days: int = 90) -> int:
         """Delete access log entries older than N days. Returns rows deleted."""
         cfg = self._cfg
-        async with await self._acquire() as conn:
-            status = await conn.execute(
-                f"DELETE FROM {cfg.schema}.search_access_log "
-                f"WHERE accessed_at < now() - ($1 || ' days')::interval",
-                days,
-            )
-            return _row_count(status)
+        status = await self._execute(
+            f"DELETE FROM {cfg.schema}.search_access_log "
+            f"WHERE accessed_at < now() - ($1 || ' days')::interval",
+            days,
+        )
+        return _row_count(status)
 
     async def get_graph_stats(
         self,
@@ -1057,14 +1157,7 @@ class PostgresBackend:
         col_rt = cfg.col_relation_type
 
         async with await self._acquire() as conn:
-            exists = await conn.fetchval(
-                "SELECT EXISTS ("
-                "  SELECT 1 FROM information_schema.tables"
-                "  WHERE table_schema = $1 AND table_name = $2"
-                ")",
-                cfg.schema,
-                cfg.links_table,
-            )
+            exists = await self._links_table_exists(conn)
             if not exists:
                 return None
 
@@ -1162,33 +1255,31 @@ class PostgresBackend:
         async with await self._acquire() as conn:
             async with conn.transaction():
                 await conn.execute(f"DELETE FROM {qt} WHERE file_path = $1", rel_path)
-                for i, chunk in enumerate(chunks):
-                    cols = "file_path, chunk_index, title, content, category, audience"
-                    vals = "$1, $2, $3, $4, $5, $6"
-                    params: list[Any] = [
-                        rel_path,
-                        i,
-                        chunk["title"],
-                        chunk["content"],
-                        category,
-                        audience,
-                    ]
-                    idx = 7
-
-                    if has_tags_col and tags:
-                        cols += ", tags"
-                        vals += f", ${idx}"
-                        params.append(tags)
-                        idx += 1
-
-                    if has_hash_col and content_hash:
-                        cols += ", content_hash"
-                        vals += f", ${idx}"
-                        params.append(content_hash)
-                        idx += 1
-
-                    await conn.execute(
+                cols = "file_path, chunk_index, title, content, category, audience"
+                extra: list[Any] = []
+                if has_tags_col and tags:
+                    cols += ", tags"
+                    extra.append(tags)
+                if has_hash_col and content_hash:
+                    cols += ", content_hash"
+                    extra.append(content_hash)
+                vals = ", ".join(f"${n}" for n in range(1, 7 + len(extra)))
+                # One executemany per file: asyncpg pipelines the rows instead
+                # of paying a round-trip per chunk.
+                if chunks:
+                    await conn.executemany(
                         f"INSERT INTO {qt} ({cols}) VALUES ({vals})",
-                        *params,
+                        [
+                            (
+                                rel_path,
+                                i,
+                                chunk["title"],
+                                chunk["content"],
+                                category,
+                                audience,
+                                *extra,
+                            )
+                            for i, chunk in enumerate(chunks)
+                        ],
                     )
         return len(chunks)
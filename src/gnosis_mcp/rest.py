@@ -250,6 +250,7 @@ async def search(request: Request) -> JSONResponse:
             category=category,
             limit=limit,
             query_embedding=query_embedding,
+            content_chars=cfg.content_preview_chars + 1,
         )
         preview = cfg.content_preview_chars
         items = []
@@ -278,22 +279,10 @@ async def get_doc(request: Request) -> JSONResponse:
     backend = _backend(request)
 
     try:
-        rows = await backend.get_doc(path)
-        if not rows:
+        doc = await backend.get_doc_content(path)
+        if doc is None:
             return JSONResponse({"error": f"Not found: {path}"}, status_code=404)
-
-        first = rows[0]
-        content = "\n\n".join(r["content"] for r in rows)
-        return JSONResponse(
-            {
-                "title": first["title"],
-                "content": content,
-                "category": first.get("category"),
-                "audience": first.get("audience"),
-                "tags": first.get("tags"),
-                "chunks": len(rows),
-            }
-        )
+        return JSONResponse(doc)
     except Exception:
         log.exception("get_doc failed for path=%s", path)
         return JSONResponse({"error": "Failed to retrieve document"}, status_code=500)
@@ -364,7 +353,9 @@ async def get_context(request: Request) -> JSONResponse:
     try:
         docs = []
         if topic:
-            results = await backend.search(topic, category=cat, limit=limit)
+            results = await backend.search(
+                topic, category=cat, limit=limit, content_chars=preview + 1
+            )
             top_accessed = await backend.get_top_accessed(
                 limit=limit,
                 days=30,
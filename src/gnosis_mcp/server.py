@@ -11,7 +11,12 @@ from urllib.parse import urlparse
 
 from mcp.server.fastmcp import FastMCP
 
-from gnosis_mcp.db import AppContext, app_lifespan
+from gnosis_mcp.db import AppContext, app_lifespan, current_app_context
+
+try:
+    import orjson
+except ImportError:  # [fast] extra not installed
+    orjson = None
 
 __all__ = ["mcp"]
 
@@ -29,7 +34,43 @@ _search_stats: dict[str, int] = {"total": 0, "misses": 0, "hybrid": 0, "keyword"
 
 
 async def _get_ctx() -> AppContext:
-    return mcp.get_context().request_context.lifespan_context
+    # Tasks spawned under the lifespan inherit the ContextVar; anything else
+    # (e.g. a lifespan entered in another task) falls back to the request.
+    ctx = current_app_context.get()
+    if ctx is None:
+        ctx = mcp.get_context().request_context.lifespan_context
+    return ctx
+
+
+_ORJSON_OPTS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+
+def _dumps(obj) -> str:
+    """Serialize a tool/resource payload as compact JSON.
+
+    Clients parse these strings rather than display them, so the `indent=2`
+    whitespace was pure overhead: ~30% more bytes on the transport and a slower
+    encoder path on every call. With the [fast] extra the payload goes through
+    orjson, several times quicker on the list-of-dicts results search returns.
+    Datetimes are passed through to `str` and non-ASCII text is left unescaped
+    on both paths, so output matches.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTS).decode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+_CHECK_HINT = "Run `gnosis-mcp check` to diagnose."
+
+
+def _err(exc: BaseException, hint: str = _CHECK_HINT) -> str:
+    """Error payload for a failed backend call: exception type, message and a hint.
+
+    Handlers stay broad on purpose: tools are backend-agnostic (asyncpg and
+    aiosqlite raise unrelated hierarchies) and must answer the client with JSON
+    rather than let a driver error escape through the MCP transport.
+    """
+    return json.dumps({"error": f"{type(exc).__name__}: {exc}", "hint": hint})
 
 
 def _is_private_address(host: str) -> bool:
@@ -268,12 +309,10 @@ async def list_docs() -> str:
     ctx = await _get_ctx()
     try:
         docs = await ctx.backend.list_docs()
-        return json.dumps(docs, indent=2)
+        return _dumps(docs)
     except Exception as e:
         log.exception("list_docs resource failed")
-        return json.dumps(
-            {"error": f"{type(e).__name__}: {e}", "hint": "Run `gnosis-mcp check` to diagnose."}
-        )
+        return _err(e)
 
 
 @mcp.resource("gnosis://docs/{path}")
@@ -281,15 +320,13 @@ async def read_doc_resource(path: str) -> str:
     """Read a document by path as an MCP resource. Reassembles chunks."""
     ctx = await _get_ctx()
     try:
-        rows = await ctx.backend.get_doc(path)
-        if not rows:
+        doc = await ctx.backend.get_doc_content(path)
+        if doc is None:
             return json.dumps({"error": f"No document at: {path}"})
-        return "\n\n".join(r["content"] for r in rows)
+        return doc["content"]
     except Exception as e:
         log.exception("read_doc_resource failed for path=%s", path)
-        return json.dumps(
-            {"error": f"{type(e).__name__}: {e}", "hint": "Run `gnosis-mcp check` to diagnose."}
-        )
+        return _err(e)
 
 
 @mcp.resource("gnosis://categories")
@@ -298,12 +335,10 @@ async def list_categories() -> str:
     ctx = await _get_ctx()
     try:
         cats = await ctx.backend.list_categories()
-        return json.dumps(cats, indent=2)
+        return _dumps(cats)
     except Exception as e:
         log.exception("list_categories resource failed")
-        return json.dumps(
-            {"error": f"{type(e).__name__}: {e}", "hint": "Run `gnosis-mcp check` to diagnose."}
-        )
+        return _err(e)
 
 
 # ---------------------------------------------------------------------------
@@ -382,12 +417,19 @@ async def search_docs(
                 exc,
             )
 
+    # Rerank scores and MMR embeds the full chunk text; otherwise only the
+    # preview is returned, so let the database cut it. One char past the preview
+    # keeps the "..." check in _format_search_result meaningful.
+    use_mmr = 0.0 < cfg.mmr_lambda < 1.0 and query_embedding is not None
+    content_chars = None if use_rerank or use_mmr else preview + 1
+
     try:
         results = await ctx.backend.search(
             query,
             category=category,
             limit=fetch_limit,
             query_embedding=query_embedding,
+            content_chars=content_chars,
         )
 
         if use_rerank and results:
@@ -413,7 +455,7 @@ async def search_docs(
         # MMR runs *after* any rerank reordering (so it sees the best-scored
         # candidates) but *before* collapse-by-doc (so the collapse step still
         # enforces the hard one-per-file_path cap on the diversified output).
-        if 0.0 < cfg.mmr_lambda < 1.0 and query_embedding is not None and len(results) > 1:
+        if use_mmr and len(results) > 1:
             try:
                 from gnosis_mcp.embed import embed_texts
 
@@ -469,15 +511,10 @@ async def search_docs(
                 tokens_returned=[_estimate_tokens(it.get("content_preview", "")) for it in top],
             )
 
-        return json.dumps(items, indent=2)
+        return _dumps(items)
     except Exception as e:
         log.exception("search_docs failed")
-        return json.dumps(
-            {
-                "error": f"{type(e).__name__}: {e}",
-                "hint": "Run `gnosis-mcp check` to verify the DB is initialised and reachable.",
-            }
-        )
+        return _err(e, "Run `gnosis-mcp check` to verify the DB is initialised and reachable.")
 
 
 @mcp.tool()
@@ -492,24 +529,23 @@ async def get_doc(path: str, max_length: int | None = None) -> str:
     ctx = await _get_ctx()
 
     try:
-        rows = await ctx.backend.get_doc(path)
+        doc = await ctx.backend.get_doc_content(path)
 
-        if not rows:
+        if doc is None:
             return json.dumps({"error": f"No document found at path: {path}"})
 
-        first = rows[0]
-        content = "\n\n".join(r["content"] for r in rows)
+        full_content = content = doc["content"]
         truncated = False
         if max_length and len(content) > max_length:
             content = content[:max_length] + "..."
             truncated = True
 
         result = {
-            "title": first["title"],
+            "title": doc["title"],
             "content": content,
-            "category": first["category"],
-            "audience": first["audience"],
-            "tags": first["tags"],
+            "category": doc["category"],
+            "audience": doc["audience"],
+            "tags": doc["tags"],
         }
         if truncated:
             result["truncated"] = True
@@ -518,11 +554,7 @@ async def get_doc(path: str, max_length: int | None = None) -> str:
         # skips the extra round-trip since we already have the full content here
         # and can compute the baseline inline.
         returned_tokens = _estimate_tokens(content)
-        full_tokens = (
-            returned_tokens
-            if not truncated
-            else _estimate_tokens("\n\n".join(r["content"] for r in rows))
-        )
+        full_tokens = returned_tokens if not truncated else _estimate_tokens(full_content)
         try:
             await ctx.backend.log_access(
                 path,
@@ -533,7 +565,7 @@ async def get_doc(path: str, max_length: int | None = None) -> str:
             )
         except Exception:
             log.debug("access log failed", exc_info=True)
-        return json.dumps(result, indent=2)
+        return _dumps(result)
     except Exception:
         log.exception("get_doc failed for path=%s", path)
         return json.dumps({"error": f"Failed to retrieve document: {path}"})
@@ -607,7 +639,7 @@ async def search_git_history(
             author,
             file_path,
         )
-        return json.dumps(items, indent=2)
+        return _dumps(items)
     except Exception:
         log.exception("search_git_history failed")
         return json.dumps({"error": f"Search failed for query: {query!r}"})
@@ -640,16 +672,15 @@ async def get_related(
         )
 
         if results is None:
-            return json.dumps(
+            return _dumps(
                 {
                     "message": f"{cfg.qualified_links_table} table does not exist. "
                     "Related document lookup is not available.",
                     "results": [],
-                },
-                indent=2,
+                }
             )
 
-        return json.dumps(results, indent=2, default=str)
+        return _dumps(results)
     except Exception:
         log.exception("get_related failed for path=%s", path)
         return json.dumps({"error": f"Failed to find related documents for: {path}"})
@@ -684,6 +715,7 @@ async def get_context(
                 topic,
                 category=category,
                 limit=limit,
+                content_chars=preview + 1,
             )
             top_accessed = await ctx.backend.get_top_accessed(
                 limit=limit,
@@ -734,7 +766,7 @@ async def get_context(
         }
 
         log.info("get_context: topic=%r docs=%d", topic, len(docs))
-        return json.dumps({"docs": docs, "stats": stats}, indent=2)
+        return _dumps({"docs": docs, "stats": stats})
     except Exception:
         log.exception("get_context failed")
         return json.dumps({"error": "Failed to get context"})
@@ -753,12 +785,9 @@ async def get_graph_stats(category: str | None = None) -> str:
         stats = await ctx.backend.get_graph_stats(category=category)
 
         if stats is None:
-            return json.dumps(
-                {"message": "Links table does not exist.", "stats": {}},
-                indent=2,
-            )
+            return _dumps({"message": "Links table does not exist.", "stats": {}})
 
-        return json.dumps(stats, indent=2, default=str)
+        return _dumps(stats)
     except Exception:
         log.exception("get_graph_stats failed")
         return json.dumps({"error": "Failed to get graph stats"})
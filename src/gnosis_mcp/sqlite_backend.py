@@ -6,9 +6,12 @@ import json
 import logging
 import re
 import struct
+from collections.abc import AsyncIterator
 from pathlib import Path
 from typing import Any
 
+from gnosis_mcp.backend import _finish_export_doc
+
 __all__ = ["SqliteBackend"]
 
 log = logging.getLogger("gnosis_mcp")
@@ -20,6 +23,17 @@ _RRF_K = 60
 # Characters that have special meaning in FTS5 queries
 _FTS5_SPECIAL = re.compile(r'["\*\(\)\-\+\^:]')
 
+# Rows per fetchmany() when streaming export_docs.
+_EXPORT_FETCH = 256
+
+# Tables check_health reports on, probed in a single sqlite_master scan.
+_HEALTH_TABLES = (
+    "documentation_chunks",
+    "documentation_chunks_fts",
+    "documentation_chunks_vec",
+    "documentation_links",
+)
+
 
 def _sqlite_path_from_url(url: str) -> str:
     """Normalize a sqlite connection string to a plain filesystem path.
@@ -57,6 +71,13 @@ def _to_fts5_query(text: str) -> str:
     return " OR ".join(safe) if len(safe) > 1 else safe[0]
 
 
+def _content_expr(column: str, content_chars: int | None) -> str:
+    """SELECT expression for the content column, cut to a preview when asked."""
+    if content_chars is None:
+        return column
+    return f"substr({column}, 1, {int(content_chars)})"
+
+
 class SqliteBackend:
     """DocBackend implementation for SQLite with FTS5 search."""
 
@@ -184,42 +205,48 @@ class SqliteBackend:
     async def check_health(self) -> dict[str, Any]:
         result: dict[str, Any] = {"backend": "sqlite", "path": self._db_path}
 
-        row = await self._db.execute_fetchall("SELECT sqlite_version()")
-        result["version"] = f"SQLite {row[0][0]}"
-
-        # Check chunks table
-        chunks_exists = await self._table_exists("documentation_chunks")
-        result["chunks_table_exists"] = chunks_exists
+        # Two statements, each one hop to the aiosqlite thread: the version
+        # plus which tables exist, then the counts for the tables that do.
+        rows = await self._db.execute_fetchall(
+            "SELECT sqlite_version(), (SELECT group_concat(name, ',') FROM sqlite_master"
+            f" WHERE type='table' AND name IN ({', '.join('?' * len(_HEALTH_TABLES))}))",
+            _HEALTH_TABLES,
+        )
+        version, names = rows[0]
+        present = set(names.split(",")) if names else set()
+        result["version"] = f"SQLite {version}"
+
+        chunks_exists = "documentation_chunks" in present
+        links_exists = "documentation_links" in present
+        vec_exists = self._has_vec and "documentation_chunks_vec" in present
+        counts: dict[str, str] = {}
         if chunks_exists:
-            row = await self._db.execute_fetchall("SELECT count(*) FROM documentation_chunks")
-            result["chunks_count"] = row[0][0]
-            row = await self._db.execute_fetchall(
-                "SELECT count(DISTINCT file_path) FROM documentation_chunks"
+            counts["chunks_count"] = "SELECT count(*) FROM documentation_chunks"
+            counts["docs_count"] = "SELECT count(DISTINCT file_path) FROM documentation_chunks"
+        if vec_exists:
+            counts["vec_count"] = "SELECT count(*) FROM documentation_chunks_vec"
+        if links_exists:
+            counts["links_count"] = "SELECT count(*) FROM documentation_links"
+        counted: dict[str, int] = {}
+        if counts:
+            rows = await self._db.execute_fetchall(
+                "SELECT " + ", ".join(f"({q})" for q in counts.values())
             )
-            result["docs_count"] = row[0][0]
-
-        # Check FTS table
-        fts_exists = await self._table_exists("documentation_chunks_fts")
-        result["fts_table_exists"] = fts_exists
+            counted = dict(zip(counts, rows[0], strict=True))
 
-        # sqlite-vec status
+        result["chunks_table_exists"] = chunks_exists
+        if chunks_exists:
+            result["chunks_count"] = counted["chunks_count"]
+            result["docs_count"] = counted["docs_count"]
+        result["fts_table_exists"] = "documentation_chunks_fts" in present
         result["sqlite_vec"] = self._has_vec
         if self._has_vec:
-            vec_exists = await self._table_exists("documentation_chunks_vec")
             result["vec_table_exists"] = vec_exists
             if vec_exists:
-                row = await self._db.execute_fetchall(
-                    "SELECT count(*) FROM documentation_chunks_vec"
-                )
-                result["vec_count"] = row[0][0]
-
-        # Check links table
-        links_exists = await self._table_exists("documentation_links")
+                result["vec_count"] = counted["vec_count"]
         result["links_table_exists"] = links_exists
         if links_exists:
-            row = await self._db.execute_fetchall("SELECT count(*) FROM documentation_links")
-            result["links_count"] = row[0][0]
-
+            result["links_count"] = counted["links_count"]
         return result
 
     async def _table_exists(self, name: str) -> bool:
@@ -238,6 +265,7 @@ class SqliteBackend:
         category: str | None = None,
         limit: int = 5,
         query_embedding: list[float] | None = None,
+        content_chars: int | None = None,
     ) -> list[dict[str, Any]]:
         query = query.strip()
         if not query:
@@ -250,15 +278,19 @@ class SqliteBackend:
             and await self._table_exists("documentation_chunks_vec")
         ):
             return await self._search_hybrid(
-                query, query_embedding, category=category, limit=limit
+                query, query_embedding, category=category, limit=limit, content_chars=content_chars
             )
 
-        results = await self._search_keyword(query, category=category, limit=limit)
+        results = await self._search_keyword(
+            query, category=category, limit=limit, content_chars=content_chars
+        )
 
         # Fallback: if FTS5 returned nothing and query looks like a file path,
         # try a LIKE search on file_path column
         if not results and ("/" in query or "." in query):
-            results = await self._search_file_path(query, category=category, limit=limit)
+            results = await self._search_file_path(
+                query, category=category, limit=limit, content_chars=content_chars
+            )
 
         return results
 
@@ -268,10 +300,11 @@ class SqliteBackend:
         *,
         category: str | None = None,
         limit: int = 5,
+        content_chars: int | None = None,
     ) -> list[dict[str, Any]]:
         """Fallback search by file_path LIKE when FTS5 can't handle the query."""
         sql = (
-            "SELECT file_path, title, content, category "
+            f"SELECT file_path, title, {_content_expr('content', content_chars)}, category "
             "FROM documentation_chunks "
             "WHERE file_path LIKE ? "
         )
@@ -303,6 +336,7 @@ class SqliteBackend:
         *,
         category: str | None = None,
         limit: int = 5,
+        content_chars: int | None = None,
     ) -> list[dict[str, Any]]:
         """FTS5 keyword-only search (existing path)."""
         fts_query = _to_fts5_query(query)
@@ -313,7 +347,8 @@ class SqliteBackend:
         title_w = float(self._cfg.fts5_title_weight)
         content_w = float(self._cfg.fts5_content_weight)
         sql = (
-            "SELECT c.file_path, c.title, c.content, c.category, "
+            f"SELECT c.file_path, c.title, {_content_expr('c.content', content_chars)}, "
+            "  c.category, "
             f"  bm25(documentation_chunks_fts, {title_w}, {content_w}) AS score, "
             "  snippet(documentation_chunks_fts, 1, '<mark>', '</mark>', '...', 32) AS highlight "
             "FROM documentation_chunks_fts f "
@@ -350,6 +385,7 @@ class SqliteBackend:
         *,
         category: str | None = None,
         limit: int = 5,
+        content_chars: int | None = None,
     ) -> list[dict[str, Any]]:
         """Hybrid search: FTS5 keyword + sqlite-vec semantic, merged with RRF."""
         import sqlite_vec
@@ -358,7 +394,9 @@ class SqliteBackend:
         fetch_n = max(limit * 4, 20)
 
         # 1. Keyword results (FTS5 BM25)
-        keyword_results = await self._search_keyword(query, category=category, limit=fetch_n)
+        keyword_results = await self._search_keyword(
+            query, category=category, limit=fetch_n, content_chars=content_chars
+        )
 
         # 2. Semantic results (sqlite-vec KNN cosine distance)
         query_blob = sqlite_vec.serialize_float32(query_embedding)
@@ -382,8 +420,8 @@ class SqliteBackend:
         if semantic_ids:
             placeholders = ",".join("?" * len(semantic_ids))
             data_sql = (
-                f"SELECT id, file_path, title, content, category "
-                f"FROM documentation_chunks WHERE id IN ({placeholders})"
+                f"SELECT id, file_path, title, {_content_expr('content', content_chars)}, "
+                f"category FROM documentation_chunks WHERE id IN ({placeholders})"
             )
             data_rows = await self._db.execute_fetchall(data_sql, semantic_ids)
             for r in data_rows:
@@ -477,6 +515,22 @@ class SqliteBackend:
             for r in rows
         ]
 
+    async def get_doc_content(self, path: str) -> dict[str, Any] | None:
+        # In-process database: nothing crosses a wire, so joining in Python is
+        # as cheap as group_concat and keeps the chunk order guaranteed.
+        chunks = await self.get_doc(path)
+        if not chunks:
+            return None
+        first = chunks[0]
+        return {
+            "title": first["title"],
+            "content": "\n\n".join(c["content"] for c in chunks),
+            "category": first["category"],
+            "audience": first["audience"],
+            "tags": first["tags"],
+            "chunks": len(chunks),
+        }
+
     async def get_related(
         self,
         path: str,
@@ -639,21 +693,27 @@ class SqliteBackend:
         has_hash = await self.has_column("documentation_chunks", "content_hash")
 
         await self._db.execute("DELETE FROM documentation_chunks WHERE file_path = ?", (path,))
-        for i, chunk in enumerate(chunks):
-            if has_hash:
-                await self._db.execute(
-                    "INSERT INTO documentation_chunks "
-                    "(file_path, chunk_index, title, content, category, audience, tags, content_hash) "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                    (path, i, title, chunk, category, audience, tags_json, digest),
-                )
-            else:
-                await self._db.execute(
-                    "INSERT INTO documentation_chunks "
-                    "(file_path, chunk_index, title, content, category, audience, tags) "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
-                    (path, i, title, chunk, category, audience, tags_json),
-                )
+        # executemany: one hop to aiosqlite's worker thread instead of one per chunk.
+        if has_hash:
+            await self._db.executemany(
+                "INSERT INTO documentation_chunks "
+                "(file_path, chunk_index, title, content, category, audience, tags, content_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (path, i, title, chunk, category, audience, tags_json, digest)
+                    for i, chunk in enumerate(chunks)
+                ],
+            )
+        else:
+            await self._db.executemany(
+                "INSERT INTO documentation_chunks "
+                "(file_path, chunk_index, title, content, category, audience, tags) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (path, i, title, chunk, category, audience, tags_json)
+                    for i, chunk in enumerate(chunks)
+                ],
+            )
         await self._db.commit()
         return len(chunks)
 
@@ -712,13 +772,18 @@ class SqliteBackend:
     # -- stats / export --------------------------------------------------------
 
     async def stats(self) -> dict[str, Any]:
-        rows = await self._db.execute_fetchall("SELECT count(*) FROM documentation_chunks")
-        total = rows[0][0]
-
+        links_sql = (
+            "(SELECT count(*) FROM documentation_links)"
+            if await self._table_exists("documentation_links")
+            else "NULL"
+        )
+        # All totals in one pass over the chunks table
         rows = await self._db.execute_fetchall(
-            "SELECT count(DISTINCT file_path) FROM documentation_chunks"
+            "SELECT count(*), count(DISTINCT file_path), "
+            "coalesce(sum(length(content)), 0), count(embedding), "
+            f"{links_sql} FROM documentation_chunks"
         )
-        docs = rows[0][0]
+        total, docs, size, embedded, links = rows[0]
 
         cats = await self._db.execute_fetchall(
             "SELECT category AS cat, count(DISTINCT file_path) AS docs, "
@@ -726,22 +791,6 @@ class SqliteBackend:
             "FROM documentation_chunks GROUP BY category ORDER BY docs DESC"
         )
 
-        rows = await self._db.execute_fetchall(
-            "SELECT coalesce(sum(length(content)), 0) FROM documentation_chunks"
-        )
-        size = rows[0][0]
-
-        links = None
-        if await self._table_exists("documentation_links"):
-            rows = await self._db.execute_fetchall("SELECT count(*) FROM documentation_links")
-            links = rows[0][0]
-
-        # Embedded chunks count
-        rows = await self._db.execute_fetchall(
-            "SELECT count(*) FROM documentation_chunks WHERE embedding IS NOT NULL"
-        )
-        embedded = rows[0][0]
-
         result = {
             "table": "documentation_chunks",
             "docs": docs,
@@ -756,35 +805,35 @@ class SqliteBackend:
         return result
 
     async def export_docs(self, category: str | None = None) -> list[dict[str, Any]]:
-        if category:
-            rows = await self._db.execute_fetchall(
-                "SELECT file_path, chunk_index, title, content, category "
-                "FROM documentation_chunks WHERE category = ? "
-                "ORDER BY file_path, chunk_index",
-                (category,),
-            )
-        else:
-            rows = await self._db.execute_fetchall(
-                "SELECT file_path, chunk_index, title, content, category "
-                "FROM documentation_chunks ORDER BY file_path, chunk_index"
-            )
+        return [d async for d in self.iter_export_docs(category)]
 
-        docs: dict[str, dict] = {}
-        for r in rows:
-            fp = r[0]
-            if fp not in docs:
-                docs[fp] = {
-                    "file_path": fp,
-                    "title": r[2],
-                    "category": r[4],
-                    "content": "",
-                }
-            docs[fp]["content"] += r[3] + "\n\n"
-
-        for d in docs.values():
-            d["content"] = d["content"].rstrip()
-
-        return list(docs.values())
+    async def iter_export_docs(self, category: str | None = None) -> AsyncIterator[dict[str, Any]]:
+        sql = "SELECT file_path, title, content, category FROM documentation_chunks "
+        if category:
+            sql += "WHERE category = ? "
+        sql += "ORDER BY file_path, chunk_index"
+
+        # fetchmany keeps one batch of rows in memory; each document is
+        # yielded as soon as the next one starts.
+        async with self._db.execute(sql, (category,) if category else ()) as cur:
+            d = None
+            while rows := await cur.fetchmany(_EXPORT_FETCH):
+                for r in rows:
+                    if d is not None and r[0] != d["file_path"]:
+                        yield _finish_export_doc(d)
+                        d = None
+                    if d is None:
+                        d = {
+                            "file_path": r[0],
+                            "title": r[1],
+                            "category": r[3],
+                            "content": [],
+                            "chunks": 0,
+                        }
+                    d["content"].append(r[2])
+                    d["chunks"] += 1
+            if d is not None:
+                yield _finish_export_doc(d)
 
     # -- embedding support -----------------------------------------------------
 
@@ -854,17 +903,15 @@ class SqliteBackend:
             (source_path, relation_type),
         )
 
-        count = 0
-        for target in target_paths:
-            await self._db.execute(
-                "INSERT OR IGNORE INTO documentation_links "
-                "(source_path, target_path, relation_type) VALUES (?, ?, ?)",
-                (source_path, target, relation_type),
-            )
-            count += 1
+        # executemany: one hop to aiosqlite's worker thread instead of one per link.
+        await self._db.executemany(
+            "INSERT OR IGNORE INTO documentation_links "
+            "(source_path, target_path, relation_type) VALUES (?, ?, ?)",
+            [(source_path, target, relation_type) for target in target_paths],
+        )
 
         await self._db.commit()
-        return count
+        return len(target_paths)
 
     async def log_access(
         self,
@@ -1088,31 +1135,23 @@ class SqliteBackend:
         tags_json = json.dumps(tags) if tags else None
 
         await self._db.execute("DELETE FROM documentation_chunks WHERE file_path = ?", (rel_path,))
-        for i, chunk in enumerate(chunks):
-            cols = "file_path, chunk_index, title, content, category, audience"
-            vals = "?, ?, ?, ?, ?, ?"
-            params: list[Any] = [
-                rel_path,
-                i,
-                chunk["title"],
-                chunk["content"],
-                category,
-                audience,
-            ]
-
-            if has_tags_col and tags_json:
-                cols += ", tags"
-                vals += ", ?"
-                params.append(tags_json)
-
-            if has_hash_col and content_hash:
-                cols += ", content_hash"
-                vals += ", ?"
-                params.append(content_hash)
-
-            await self._db.execute(
-                f"INSERT INTO documentation_chunks ({cols}) VALUES ({vals})",
-                params,
-            )
+        cols = "file_path, chunk_index, title, content, category, audience"
+        extra: list[Any] = []
+        if has_tags_col and tags_json:
+            cols += ", tags"
+            extra.append(tags_json)
+        if has_hash_col and content_hash:
+            cols += ", content_hash"
+            extra.append(content_hash)
+        vals = ", ".join("?" * (6 + len(extra)))
+
+        # executemany: one hop to aiosqlite's worker thread instead of one per chunk.
+        await self._db.executemany(
+            f"INSERT INTO documentation_chunks ({cols}) VALUES ({vals})",
+            [
+                (rel_path, i, chunk["title"], chunk["content"], category, audience, *extra)
+                for i, chunk in enumerate(chunks)
+            ],
+        )
         await self._db.commit()
         return len(chunks)
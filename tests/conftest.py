@@ -5,6 +5,14 @@ import pytest
 from gnosis_mcp.config import GnosisMcpConfig
 
 
+@pytest.fixture(autouse=True)
+def _fresh_config_cache():
+    """Each test sees its own env: drop any config cached by `GnosisMcpConfig.cached()`."""
+    GnosisMcpConfig.invalidate()
+    yield
+    GnosisMcpConfig.invalidate()
+
+
 @pytest.fixture
 def default_config(monkeypatch):
     """Config with defaults and a dummy database URL (PostgreSQL)."""
@@ -1,6 +1,8 @@
 """Tests for backend protocol and factory."""
 
-from gnosis_mcp.backend import DocBackend, create_backend
+import pytest
+
+from gnosis_mcp.backend import DocBackend, _finish_export_doc, create_backend
 from gnosis_mcp.config import GnosisMcpConfig
 from gnosis_mcp.sqlite_backend import SqliteBackend
 
@@ -48,3 +50,13 @@ class TestDocBackendProtocol:
         assert config.backend == "sqlite"
         backend = create_backend(config)
         assert isinstance(backend, SqliteBackend)
+
+
+class TestFinishExportDoc:
+    @pytest.mark.parametrize(
+        "parts",
+        [["a", "b"], ["a  ", "b\n\n"], ["a", "  ", "\n"], ["  ", ""], [], ["a\n", "b "]],
+    )
+    def test_finish_matches_join_then_rstrip(self, parts):
+        expected = "\n\n".join(parts).rstrip()
+        assert _finish_export_doc({"content": list(parts)})["content"] == expected
@@ -125,6 +125,38 @@ class TestCustomConfig:
         assert cfg.pool_min == 2
         assert cfg.pool_max == 10
 
+    def test_pool_defaults(self, monkeypatch):
+        import os
+
+        monkeypatch.setenv("GNOSIS_MCP_DATABASE_URL", "postgresql://localhost/db")
+        cfg = GnosisMcpConfig.from_env()
+        assert cfg.pool_min == 2
+        assert cfg.pool_max == (os.cpu_count() or 2) * 2 + 1
+        assert cfg.command_timeout == 30
+
+    def test_command_timeout(self, monkeypatch):
+        monkeypatch.setenv("GNOSIS_MCP_DATABASE_URL", "postgresql://localhost/db")
+        monkeypatch.setenv("GNOSIS_MCP_COMMAND_TIMEOUT", "5")
+        assert GnosisMcpConfig.from_env().command_timeout == 5
+        monkeypatch.setenv("GNOSIS_MCP_COMMAND_TIMEOUT", "0")
+        with pytest.raises(ValueError, match="GNOSIS_MCP_COMMAND_TIMEOUT must be >= 1"):
+            GnosisMcpConfig.from_env()
+
+    def test_statement_cache_size(self, monkeypatch):
+        monkeypatch.setenv("GNOSIS_MCP_DATABASE_URL", "postgresql://localhost/db")
+        assert GnosisMcpConfig.from_env().statement_cache_size == 100
+        monkeypatch.setenv("GNOSIS_MCP_STATEMENT_CACHE_SIZE", "0")
+        assert GnosisMcpConfig.from_env().statement_cache_size == 0
+        monkeypatch.setenv("GNOSIS_MCP_STATEMENT_CACHE_SIZE", "-1")
+        with pytest.raises(ValueError, match="GNOSIS_MCP_STATEMENT_CACHE_SIZE must be >= 0"):
+            GnosisMcpConfig.from_env()
+
+    def test_server_settings(self, monkeypatch):
+        monkeypatch.setenv("GNOSIS_MCP_DATABASE_URL", "postgresql://localhost/db")
+        assert GnosisMcpConfig.from_env().server_settings is True
+        monkeypatch.setenv("GNOSIS_MCP_SERVER_SETTINGS", "false")
+        assert GnosisMcpConfig.from_env().server_settings is False
+
     def test_embedding_dim(self, monkeypatch):
         monkeypatch.setenv("GNOSIS_MCP_DATABASE_URL", "postgresql://localhost/db")
         monkeypatch.setenv("GNOSIS_MCP_EMBEDDING_DIM", "768")
@@ -193,6 +225,29 @@ class TestWritableConfig:
         assert cfg.writable is True
         assert cfg.webhook_url == "https://example.com/hook"
 
+    def test_boolean_flags(self, monkeypatch):
+        monkeypatch.setenv("GNOSIS_MCP_DATABASE_URL", "postgresql://localhost/db")
+        monkeypatch.setenv("GNOSIS_MCP_REST", "YES")
+        monkeypatch.setenv("GNOSIS_MCP_RERANK_ENABLED", "off")
+        monkeypatch.setenv("GNOSIS_MCP_ACCESS_LOG", "0")
+        cfg = GnosisMcpConfig.from_env()
+        assert cfg.rest is True
+        assert cfg.rerank_enabled is False
+        assert cfg.access_log is False
+        assert cfg.collapse_by_doc is False
+
+    def test_access_log_defaults_on(self, monkeypatch):
+        monkeypatch.setenv("GNOSIS_MCP_DATABASE_URL", "postgresql://localhost/db")
+        monkeypatch.delenv("GNOSIS_MCP_ACCESS_LOG", raising=False)
+        assert GnosisMcpConfig.from_env().access_log is True
+
+    def test_crawl_extract_processes(self, monkeypatch):
+        monkeypatch.setenv("GNOSIS_MCP_DATABASE_URL", "postgresql://localhost/db")
+        monkeypatch.delenv("GNOSIS_MCP_CRAWL_EXTRACT_PROCESSES", raising=False)
+        assert GnosisMcpConfig.from_env().crawl_extract_processes is False
+        monkeypatch.setenv("GNOSIS_MCP_CRAWL_EXTRACT_PROCESSES", "true")
+        assert GnosisMcpConfig.from_env().crawl_extract_processes is True
+
 
 class TestTuningConfig:
     def test_tuning_defaults(self, monkeypatch):
@@ -285,6 +340,28 @@ class TestFrozen:
         with pytest.raises(AttributeError):
             cfg.schema = "changed"
 
+    def test_config_uses_slots(self):
+        cfg = GnosisMcpConfig(database_url="postgresql://localhost/db")
+        assert not hasattr(cfg, "__dict__")
+        assert cfg.qualified_chunks_table == "public.documentation_chunks"
+
+
+class TestCached:
+    def test_returns_same_instance(self, monkeypatch):
+        monkeypatch.setenv("GNOSIS_MCP_DATABASE_URL", "postgresql://localhost/db")
+        assert GnosisMcpConfig.cached() is GnosisMcpConfig.cached()
+
+    def test_ignores_env_changes_until_invalidated(self, monkeypatch):
+        monkeypatch.setenv("GNOSIS_MCP_DATABASE_URL", "postgresql://localhost/db")
+        first = GnosisMcpConfig.cached()
+        monkeypatch.setenv("GNOSIS_MCP_SCHEMA", "other")
+        assert GnosisMcpConfig.cached().schema == "public"
+        GnosisMcpConfig.invalidate()
+        second = GnosisMcpConfig.cached()
+        assert second is not first
+        assert second.schema == "other"
+        assert second.qualified_links_table == "other.documentation_links"
+
 
 class TestIdentifierValidation:
     def test_valid_simple_identifier(self):
@@ -320,6 +397,10 @@ class TestIdentifierValidation:
         with pytest.raises(ValueError, match="Invalid SQL identifier"):
             _validate_identifier("1table", "test")
 
+    def test_rejects_trailing_newline(self):
+        with pytest.raises(ValueError, match="Invalid SQL identifier"):
+            _validate_identifier("public\n", "test")
+
     def test_config_rejects_bad_schema(self, monkeypatch):
         monkeypatch.setenv("GNOSIS_MCP_DATABASE_URL", "postgresql://localhost/db")
         monkeypatch.setenv("GNOSIS_MCP_SCHEMA", "bad schema!")
@@ -6,19 +6,24 @@ from __future__ import annotations
 import asyncio
 import importlib.util
 import os
+import sqlite3
 import stat
+import sys
+from contextlib import asynccontextmanager
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from gnosis_mcp.crawl import (
+    _MAX_DEPTH,
+    _MAX_XML_SIZE,
+    _SITEMAP_FEED_CHARS,
     CrawlAction,
     CrawlConfig,
     CrawlResult,
+    _CompiledRobots,
+    _CrawlCache,
     _is_private_host,
-    _MAX_DEPTH,
-    _MAX_XML_SIZE,
-    _parse_robots,
     check_robots,
     extract_links,
     load_cache,
@@ -33,6 +38,24 @@ def _has_httpx() -> bool:
     return importlib.util.find_spec("httpx") is not None
 
 
+def _stream_from(get):
+    """Stand-in for ``client.stream``: serves ``get``'s mocked response, body from ``.text``."""
+
+    @asynccontextmanager
+    async def stream(method, url, **kwargs):
+        resp = await get(url, **kwargs)
+        body = resp.text.encode() if isinstance(resp.text, str) else b""
+
+        async def aiter_bytes():
+            yield body
+
+        resp.aiter_bytes = aiter_bytes
+        resp.encoding = "utf-8"
+        yield resp
+
+    return MagicMock(side_effect=stream)
+
+
 # ===========================================================================
 # CrawlAction StrEnum
 # ===========================================================================
@@ -241,6 +264,30 @@ class TestParseSitemap:
     def test_html_not_xml(self):
         assert parse_sitemap("<html><body>Not a sitemap</body></html>") == []
 
+    def test_large_sitemap_spans_feed_chunks(self):
+        entries = "".join(
+            f"<url><loc>https://example.com/p{i}</loc><lastmod>2024-01-01</lastmod></url>"
+            for i in range(5000)
+        )
+        xml = f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+        assert len(xml) > _SITEMAP_FEED_CHARS
+        urls = parse_sitemap(xml)
+        assert len(urls) == 5000
+        assert urls[0] == "https://example.com/p0"
+        assert urls[-1] == "https://example.com/p4999"
+
+    def test_loc_outside_entry_ignored(self):
+        xml = """<urlset>
+          <loc>https://example.com/stray</loc>
+          <url><image><loc>https://example.com/img.png</loc></image></url>
+          <url><loc>https://example.com/page</loc></url>
+        </urlset>"""
+        assert parse_sitemap(xml) == ["https://example.com/page"]
+
+    def test_truncated_xml(self):
+        xml = "<urlset><url><loc>https://example.com/a</loc></url><url><loc>"
+        assert parse_sitemap(xml) == []
+
     def test_oversized_xml_rejected(self):
         """XML larger than _MAX_XML_SIZE is rejected."""
         big_xml = "x" * (_MAX_XML_SIZE + 1)
@@ -296,14 +343,56 @@ class TestCheckRobots:
         assert check_robots(robots, "https://example.com/page", "bot") is True
 
 
-class TestParseRobots:
-    def test_returns_robot_file_parser(self):
-        rp = _parse_robots("User-agent: *\nAllow: /")
-        assert rp.can_fetch("bot", "https://example.com/page") is True
+class TestCompiledRobots:
+    def test_allow_all(self):
+        assert _CompiledRobots("User-agent: *\nAllow: /", "bot").can_fetch(
+            "https://example.com/page"
+        )
 
     def test_disallow(self):
-        rp = _parse_robots("User-agent: *\nDisallow: /")
-        assert rp.can_fetch("bot", "https://example.com/page") is False
+        robots = _CompiledRobots("User-agent: *\nDisallow: /", "bot")
+        assert robots.can_fetch("https://example.com/page") is False
+
+    def test_longest_match_wins(self):
+        robots = _CompiledRobots("User-agent: *\nDisallow: /docs/\nAllow: /docs/public/", "bot")
+        assert robots.can_fetch("https://example.com/docs/public/page") is True
+        assert robots.can_fetch("https://example.com/docs/private") is False
+
+    def test_allow_wins_tie(self):
+        robots = _CompiledRobots("User-agent: *\nDisallow: /page\nAllow: /page", "bot")
+        assert robots.can_fetch("https://example.com/page") is True
+
+    def test_wildcard_and_end_anchor(self):
+        robots = _CompiledRobots("User-agent: *\nDisallow: /*.pdf$\nDisallow: /*/drafts/", "bot")
+        assert robots.can_fetch("https://example.com/files/guide.pdf") is False
+        assert robots.can_fetch("https://example.com/files/guide.pdf.html") is True
+        assert robots.can_fetch("https://example.com/blog/drafts/x") is False
+
+    def test_query_string_matched(self):
+        robots = _CompiledRobots("User-agent: *\nDisallow: /search?q=", "bot")
+        assert robots.can_fetch("https://example.com/search?q=x") is False
+        assert robots.can_fetch("https://example.com/search") is True
+
+    def test_specific_group_replaces_wildcard(self):
+        txt = "User-agent: *\nDisallow: /\n\nUser-agent: gnosis-mcp\nDisallow: /private/"
+        robots = _CompiledRobots(txt, "gnosis-mcp/0.8.0")
+        assert robots.can_fetch("https://example.com/page") is True
+        assert robots.can_fetch("https://example.com/private/x") is False
+
+    def test_grouped_user_agents_share_rules(self):
+        txt = "User-agent: a\nUser-agent: *\nDisallow: /x\n# comment\nDisallow: /y # trailing"
+        robots = _CompiledRobots(txt, "bot")
+        assert robots.can_fetch("https://example.com/x") is False
+        assert robots.can_fetch("https://example.com/y") is False
+        assert robots.can_fetch("https://example.com/z") is True
+
+    def test_empty_disallow_allows_all(self):
+        robots = _CompiledRobots("User-agent: *\nDisallow:", "bot")
+        assert robots.can_fetch("https://example.com/page") is True
+
+    def test_percent_encoding_normalized(self):
+        robots = _CompiledRobots("User-agent: *\nDisallow: /caf%C3%A9/", "bot")
+        assert robots.can_fetch("https://example.com/café/menu") is False
 
 
 # ===========================================================================
@@ -398,6 +487,42 @@ class TestExtractLinks:
         links = extract_links(html, "https://example.com/")
         assert len(links) == 0
 
+    def test_repeat_links_normalized_once(self):
+        from gnosis_mcp.crawl import _normalized_parts
+
+        html = '<a href="https://example.com/Nav-Unique-A/">A</a><a href="/nav-unique-b">B</a>'
+        first = extract_links(html, "https://example.com/one")
+        before = _normalized_parts.cache_info()
+        second = extract_links(html, "https://example.com/two")
+        after = _normalized_parts.cache_info()
+        assert (
+            first
+            == second
+            == [
+                "https://example.com/Nav-Unique-A",
+                "https://example.com/nav-unique-b",
+            ]
+        )
+        assert after.hits - before.hits == 2
+        assert after.misses == before.misses
+
+    def test_decodes_entities_in_href(self):
+        html = '<a href="/search?q=test&amp;page=2">Search</a>'
+        links = extract_links(html, "https://example.com/")
+        assert links == ["https://example.com/search?q=test&page=2"]
+
+    def test_regex_fallback_without_lxml(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "lxml", None)
+        html = '<a href="/a">A</a><A HREF="/b">B</A>'
+        links = extract_links(html, "https://example.com/")
+        assert links == ["https://example.com/a", "https://example.com/b"]
+
+    def test_lxml_handles_unquoted_and_multiline_href(self):
+        pytest.importorskip("lxml.html")
+        html = '<a href=/unquoted>U</a><a\n  class="x"\n  href="/multi">M</a>'
+        links = extract_links(html, "https://example.com/")
+        assert links == ["https://example.com/unquoted", "https://example.com/multi"]
+
 
 # ===========================================================================
 # url_matches_pattern
@@ -436,6 +561,20 @@ class TestUrlMatchesPattern:
         assert url_matches_pattern("https://example.com/docs/page.html", "/docs/*.html") is True
         assert url_matches_pattern("https://example.com/docs/page.md", "/docs/*.html") is False
 
+    def test_query_and_fragment_ignored(self):
+        assert url_matches_pattern("https://example.com/docs/a?x=1#top", "/docs/a") is True
+
+    def test_pattern_compiled_once(self):
+        from gnosis_mcp.crawl import _glob_regex
+
+        url_matches_pattern("https://example.com/x", "/compiled-once/*")
+        before = _glob_regex.cache_info()
+        for i in range(5):
+            url_matches_pattern(f"https://example.com/compiled-once/{i}", "/compiled-once/*")
+        after = _glob_regex.cache_info()
+        assert after.misses == before.misses
+        assert after.hits - before.hits == 5
+
 
 # ===========================================================================
 # load_cache / save_cache
@@ -483,6 +622,27 @@ class TestCacheIO:
         mode = stat.S_IMODE(os.stat(cache_file).st_mode)
         assert mode == 0o600
 
+    @pytest.mark.parametrize("orjson_installed", [True, False])
+    def test_written_compact(self, tmp_path, monkeypatch, orjson_installed):
+        if orjson_installed:
+            pytest.importorskip("orjson")
+        else:
+            monkeypatch.setitem(sys.modules, "orjson", None)
+        cache_file = tmp_path / "cache.json"
+        data = {"https://example.com/a": {"etag": '"x"', "timestamp": 1.5}}
+        save_cache(data, cache_file)
+        assert (
+            cache_file.read_text()
+            == '{"https://example.com/a":{"etag":"\\"x\\"","timestamp":1.5}}'
+        )
+        assert load_cache(cache_file) == data
+
+    def test_loads_indented_cache(self, tmp_path):
+        """Caches written by earlier versions (indent=2) still load."""
+        cache_file = tmp_path / "cache.json"
+        cache_file.write_text('{\n  "key": {\n    "hash": "1234"\n  }\n}')
+        assert load_cache(cache_file) == {"key": {"hash": "1234"}}
+
     def test_atomic_write_no_temp_files_left(self, tmp_path):
         """No temporary files should remain after save."""
         cache_file = tmp_path / "cache.json"
@@ -492,6 +652,81 @@ class TestCacheIO:
         assert files[0].name == "cache.json"
 
 
+class TestCrawlCache:
+    def test_entry_round_trip(self, tmp_path):
+        cache = _CrawlCache(tmp_path / "cache.json")
+        entry = {
+            "etag": '"abc"',
+            "last_modified": None,
+            "hash": "1234",
+            "timestamp": 1.0,
+            "links": ["https://example.com/b"],
+        }
+        assert cache.get("https://example.com/a") is None
+        assert "https://example.com/a" not in cache
+        cache["https://example.com/a"] = entry
+        assert "https://example.com/a" in cache
+        assert cache.get("https://example.com/a") == entry
+        cache.close()
+
+    def test_entry_visible_before_close(self, tmp_path):
+        """Entries are committed as they are written, not when the crawl ends."""
+        writer = _CrawlCache(tmp_path / "cache.json")
+        writer["https://example.com/a"] = {"hash": "1234", "timestamp": 1.0}
+        reader = _CrawlCache(tmp_path / "cache.json")
+        assert reader.get("https://example.com/a")["hash"] == "1234"
+        reader.close()
+        writer.close()
+
+    def test_imports_and_removes_legacy_json(self, tmp_path):
+        legacy = tmp_path / "cache.json"
+        save_cache(
+            {"https://example.com/a": {"etag": '"x"', "hash": "1", "timestamp": 2.0}}, legacy
+        )
+        cache = _CrawlCache(legacy)
+        assert not legacy.exists()
+        assert cache.get("https://example.com/a") == {
+            "etag": '"x"',
+            "last_modified": None,
+            "hash": "1",
+            "timestamp": 2.0,
+            "links": None,
+        }
+        cache.close()
+
+    def test_adds_links_column_to_existing_database(self, tmp_path):
+        conn = sqlite3.connect(tmp_path / "cache.db")
+        conn.execute(
+            "CREATE TABLE cache ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, hash TEXT, timestamp REAL)"
+        )
+        conn.execute("INSERT INTO cache VALUES ('https://example.com/a', '\"x\"', NULL, '1', 2.0)")
+        conn.commit()
+        conn.close()
+
+        cache = _CrawlCache(tmp_path / "cache.json")
+        assert cache.get("https://example.com/a")["links"] is None
+        cache["https://example.com/a"] = {"etag": '"y"', "links": []}
+        assert cache.get("https://example.com/a")["links"] == []
+        cache.close()
+
+    def test_database_permissions(self, tmp_path):
+        _CrawlCache(tmp_path / "cache.json").close()
+        mode = stat.S_IMODE(os.stat(tmp_path / "cache.db").st_mode)
+        assert mode == 0o600
+
+    def test_wal_files_permissions(self, tmp_path):
+        # A cache (and a WAL left behind) from an older, world-readable version.
+        for name in ("cache.db", "cache.db-wal"):
+            (tmp_path / name).touch()
+            os.chmod(tmp_path / name, 0o644)
+        cache = _CrawlCache(tmp_path / "cache.json")
+        cache["https://example.com/a"] = {"hash": "1"}
+        for name in ("cache.db", "cache.db-wal", "cache.db-shm"):
+            assert stat.S_IMODE(os.stat(tmp_path / name).st_mode) == 0o600, name
+        cache.close()
+
+
 # ===========================================================================
 # CrawlResult / CrawlConfig
 # ===========================================================================
@@ -582,7 +817,7 @@ class TestFetchPage:
         }
 
         client = AsyncMock()
-        client.get.return_value = mock_response
+        client.stream = _stream_from(AsyncMock(return_value=mock_response))
 
         result = await fetch_page(client, "https://example.com/page", {})
         assert result is not None
@@ -598,7 +833,7 @@ class TestFetchPage:
         mock_response.raise_for_status = MagicMock()
 
         client = AsyncMock()
-        client.get.return_value = mock_response
+        client.stream = _stream_from(AsyncMock(return_value=mock_response))
 
         cache = {"https://example.com/page": {"etag": '"old"'}}
         result = await fetch_page(client, "https://example.com/page", cache)
@@ -613,14 +848,14 @@ class TestFetchPage:
         mock_response.raise_for_status = MagicMock()
 
         client = AsyncMock()
-        client.get.return_value = mock_response
+        client.stream = _stream_from(AsyncMock(return_value=mock_response))
 
         cache = {
             "https://example.com/page": {"etag": '"abc"', "last_modified": "Mon, 01 Jan 2024"}
         }
         await fetch_page(client, "https://example.com/page", cache)
 
-        call_kwargs = client.get.call_args
+        call_kwargs = client.stream.call_args
         headers = call_kwargs.kwargs.get("headers") or call_kwargs[1].get("headers", {})
         assert headers.get("If-None-Match") == '"abc"'
         assert headers.get("If-Modified-Since") == "Mon, 01 Jan 2024"
@@ -636,7 +871,7 @@ class TestFetchPage:
         mock_response.raise_for_status = MagicMock()
 
         client = AsyncMock()
-        client.get.return_value = mock_response
+        client.stream = _stream_from(AsyncMock(return_value=mock_response))
 
         result = await fetch_page(client, "https://example.com/doc.pdf", {})
         assert result is None
@@ -654,7 +889,7 @@ class TestFetchPage:
         mock_response.raise_for_status = MagicMock()
 
         client = AsyncMock()
-        client.get.return_value = mock_response
+        client.stream = _stream_from(AsyncMock(return_value=mock_response))
 
         result = await fetch_page(client, "https://example.com/llms-full.txt", {})
         assert result is not None
@@ -674,7 +909,7 @@ class TestFetchPage:
         mock_response.raise_for_status = MagicMock()
 
         client = AsyncMock()
-        client.get.return_value = mock_response
+        client.stream = _stream_from(AsyncMock(return_value=mock_response))
 
         result = await fetch_page(client, "https://example.com/README.md", {})
         assert result is not None
@@ -692,14 +927,14 @@ class TestFetchPage:
         mock_response.raise_for_status = MagicMock()
 
         client = AsyncMock()
-        client.get.return_value = mock_response
+        client.stream = _stream_from(AsyncMock(return_value=mock_response))
 
         cache = {"https://example.com/page": {"etag": '"old"'}}
         result = await fetch_page(client, "https://example.com/page", cache, force=True)
         assert result is not None
 
         # Should NOT send conditional headers when force=True
-        call_kwargs = client.get.call_args
+        call_kwargs = client.stream.call_args
         headers = call_kwargs.kwargs.get("headers") or call_kwargs[1].get("headers", {})
         assert "If-None-Match" not in headers
 
@@ -715,7 +950,7 @@ class TestFetchPage:
         mock_response.raise_for_status = MagicMock()
 
         client = AsyncMock()
-        client.get.return_value = mock_response
+        client.stream = _stream_from(AsyncMock(return_value=mock_response))
 
         result = await fetch_page(client, "https://example.com/redirect", {})
         assert result is None
@@ -735,11 +970,65 @@ class TestFetchPage:
         mock_response.raise_for_status = MagicMock()
 
         client = AsyncMock()
-        client.get.return_value = mock_response
+        client.stream = _stream_from(AsyncMock(return_value=mock_response))
 
         result = await fetch_page(client, "https://example.com/big", {})
         assert result is None
 
+    @pytest.mark.asyncio
+    async def test_stops_reading_past_cap_without_content_length(self, monkeypatch):
+        """No Content-Length: the cap is enforced on the bytes as they stream in."""
+        from gnosis_mcp import crawl
+
+        monkeypatch.setattr(crawl, "_MAX_RESPONSE_SIZE", 10)
+        pulled = []
+
+        async def aiter_bytes():
+            for chunk in (b"<html>", b"<body>", b"never read"):
+                pulled.append(chunk)
+                yield chunk
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.url = "https://example.com/endless"
+        mock_response.headers = {"content-type": "text/html"}
+        mock_response.aiter_bytes = aiter_bytes
+
+        @asynccontextmanager
+        async def stream(method, url, **kwargs):
+            yield mock_response
+
+        client = MagicMock()
+        client.stream = stream
+
+        assert await crawl.fetch_page(client, "https://example.com/endless", {}) is None
+        assert pulled == [b"<html>", b"<body>"]
+
+    @pytest.mark.asyncio
+    async def test_decodes_declared_charset(self):
+        from gnosis_mcp.crawl import fetch_page
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.url = "https://example.com/latin"
+        mock_response.headers = {"content-type": "text/html; charset=latin-1"}
+
+        async def aiter_bytes():
+            yield "<p>café</p>".encode("latin-1")
+
+        mock_response.aiter_bytes = aiter_bytes
+        mock_response.encoding = "latin-1"
+
+        @asynccontextmanager
+        async def stream(method, url, **kwargs):
+            yield mock_response
+
+        client = MagicMock()
+        client.stream = stream
+
+        result = await fetch_page(client, "https://example.com/latin", {})
+        assert result.html == "<p>café</p>"
+
 
 # ===========================================================================
 # extract_content (async)
@@ -767,6 +1056,120 @@ class TestExtractContent:
         except ImportError:
             pytest.skip("trafilatura not installed")
 
+    @pytest.mark.asyncio
+    async def test_runs_in_given_executor(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        from gnosis_mcp.crawl import extract_content
+
+        markdown = "# Guide\n\n" + "Enough extracted text to keep. " * 3
+        with (
+            ThreadPoolExecutor(max_workers=1) as pool,
+            patch.object(pool, "submit", wraps=pool.submit) as submit,
+            patch("gnosis_mcp.crawl._extract_sync", return_value=markdown) as extract,
+        ):
+            result = await extract_content("<html></html>", "https://example.com/", executor=pool)
+        assert result == markdown
+        submit.assert_called_once()
+        extract.assert_called_once_with("<html></html>", "https://example.com/")
+
+    def test_extract_pool_runs_in_worker_processes(self):
+        from gnosis_mcp.crawl import _ExtractPool
+
+        pool = _ExtractPool(concurrency=1)
+        try:
+            assert pool.submit(os.getpid).result(timeout=60) != os.getpid()
+        finally:
+            pool.shutdown()
+
+    def test_extract_pool_restart_kills_stuck_worker(self):
+        import time
+        from concurrent.futures.process import BrokenProcessPool
+
+        from gnosis_mcp.crawl import _ExtractPool
+
+        pool = _ExtractPool(concurrency=1)
+        try:
+            pool.submit(os.getpid).result(timeout=60)  # worker is up
+            stuck = pool.current
+            hung = pool.submit(time.sleep, 600)
+            time.sleep(0.2)
+            pool.restart(stuck)
+            with pytest.raises(BrokenProcessPool):
+                hung.result(timeout=30)
+            assert pool.current is not stuck
+            # A stale restart (the pool was already replaced) is a no-op
+            fresh = pool.current
+            pool.restart(stuck)
+            assert pool.current is fresh
+            assert pool.submit(os.getpid).result(timeout=60) != os.getpid()
+        finally:
+            pool.shutdown()
+
+    def test_extract_pool_restart_without_process_map(self):
+        from concurrent.futures import Executor
+
+        from gnosis_mcp.crawl import _ExtractPool
+
+        stuck, fresh = MagicMock(spec=Executor), MagicMock(spec=Executor)
+        with patch.object(_ExtractPool, "_start", side_effect=[stuck, fresh]):
+            pool = _ExtractPool(concurrency=1)
+            pool.restart(stuck)
+        assert pool.current is fresh
+        stuck.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+
+    @pytest.mark.asyncio
+    async def test_timeout_restarts_extract_pool(self):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        from gnosis_mcp.crawl import _ExtractPool, extract_content
+
+        class _ThreadExtractPool(_ExtractPool):
+            def _start(self):
+                return ThreadPoolExecutor(max_workers=1)
+
+        release = threading.Event()
+        pool = _ThreadExtractPool(concurrency=1)
+        first = pool.current
+        try:
+            with patch("gnosis_mcp.crawl._extract_sync", side_effect=lambda *a: release.wait(30)):
+                result = await extract_content(
+                    "<html></html>", "https://example.com/", timeout_s=0.1, executor=pool
+                )
+            assert result is None
+            # The hung call's executor was swapped out, so its slot is not lost
+            assert pool.current is not first
+        finally:
+            release.set()
+            pool.shutdown()
+            first.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_retries_extraction_killed_with_another_page(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+
+        from gnosis_mcp.crawl import _ExtractPool, extract_content
+
+        class _ThreadExtractPool(_ExtractPool):
+            def _start(self):
+                return ThreadPoolExecutor(max_workers=1)
+
+        markdown = "# Title\n\n" + "Body text. " * 10
+        pool = _ThreadExtractPool(concurrency=1)
+        try:
+            with patch(
+                "gnosis_mcp.crawl._extract_sync", side_effect=[BrokenProcessPool(), markdown]
+            ) as extract:
+                result = await extract_content(
+                    "<html></html>", "https://example.com/", executor=pool
+                )
+            assert result == markdown
+            assert extract.call_count == 2
+        finally:
+            pool.shutdown()
+
     @pytest.mark.asyncio
     async def test_returns_none_for_empty(self):
         from gnosis_mcp.crawl import extract_content
@@ -796,6 +1199,7 @@ class TestDiscoverUrls:
 
         client = AsyncMock()
         client.get.return_value = mock_response
+        client.stream = _stream_from(client.get)
 
         config = CrawlConfig(depth=1, delay=0)
         urls = await discover_urls(client, "https://example.com/", config)
@@ -813,6 +1217,7 @@ class TestDiscoverUrls:
 
         client = AsyncMock()
         client.get.return_value = mock_response
+        client.stream = _stream_from(client.get)
 
         config = CrawlConfig(depth=0, delay=0)
         urls = await discover_urls(client, "https://example.com/", config)
@@ -834,11 +1239,224 @@ class TestDiscoverUrls:
 
         client = AsyncMock()
         client.get.return_value = mock_response
+        client.stream = _stream_from(client.get)
 
         config = CrawlConfig(depth=2, delay=0, max_urls=5)
         urls = await discover_urls(client, "https://example.com/", config)
         assert len(urls) <= 5
 
+    @pytest.mark.asyncio
+    async def test_bfs_queues_each_url_once(self):
+        """Links repeated across pages don't take queue slots from unseen ones."""
+        from gnosis_mcp.crawl import discover_urls
+
+        site = {
+            "/": ["/a", "/b", "/c"],
+            "/a": ["/b", "/c", "/d"],
+            "/b": ["/c", "/d", "/e"],
+            "/c": ["/d", "/e"],
+        }
+
+        async def get(url, **kwargs):
+            path = url.removeprefix("https://example.com") or "/"
+            resp = MagicMock()
+            resp.status_code = 200
+            resp.headers = {"content-type": "text/html"}
+            resp.text = "".join(f'<a href="{link}">x</a>' for link in site.get(path, []))
+            return resp
+
+        client = AsyncMock()
+        client.get.side_effect = get
+        client.stream = _stream_from(client.get)
+
+        config = CrawlConfig(depth=3, delay=0, max_urls=6)
+        urls = await discover_urls(client, "https://example.com/", config)
+        assert urls == [
+            "https://example.com/",
+            "https://example.com/a",
+            "https://example.com/b",
+            "https://example.com/c",
+            "https://example.com/d",
+            "https://example.com/e",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_bfs_stops_fetching_once_max_urls_known(self):
+        from gnosis_mcp.crawl import discover_urls
+
+        resp = MagicMock()
+        resp.status_code = 200
+        resp.text = '<a href="/a">a</a><a href="/b">b</a><a href="/c">c</a>'
+        resp.headers = {"content-type": "text/html"}
+        client = AsyncMock()
+        client.get.return_value = resp
+        client.stream = _stream_from(client.get)
+
+        config = CrawlConfig(depth=3, delay=0, max_urls=3)
+        urls = await discover_urls(client, "https://example.com/", config)
+        assert urls == ["https://example.com/", "https://example.com/a", "https://example.com/b"]
+        # /a and /b fill max_urls from the base page alone; their links could not be used
+        client.get.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_bfs_disallowed_links_take_no_slot(self):
+        from gnosis_mcp.crawl import discover_urls
+
+        resp = MagicMock()
+        resp.status_code = 200
+        resp.text = '<a href="/private/x">x</a><a href="/a">a</a>'
+        resp.headers = {"content-type": "text/html"}
+        client = AsyncMock()
+        client.get.return_value = resp
+        client.stream = _stream_from(client.get)
+
+        config = CrawlConfig(depth=1, delay=0, max_urls=2)
+        urls = await discover_urls(
+            client, "https://example.com/", config, "User-agent: *\nDisallow: /private/"
+        )
+        assert urls == ["https://example.com/", "https://example.com/a"]
+
+    @pytest.mark.asyncio
+    async def test_bfs_caps_page_body(self, monkeypatch):
+        import gnosis_mcp.crawl as crawl_mod
+        from gnosis_mcp.crawl import discover_urls
+
+        monkeypatch.setattr(crawl_mod, "_MAX_RESPONSE_SIZE", 64)
+        resp = MagicMock()
+        resp.status_code = 200
+        resp.text = '<a href="/page1">1</a>' + " " * 100
+        resp.headers = {"content-type": "text/html"}
+        client = AsyncMock()
+        client.get.return_value = resp
+        client.stream = _stream_from(client.get)
+
+        page_links: dict[str, list[str]] = {}
+        config = CrawlConfig(depth=1, delay=0)
+        urls = await discover_urls(client, "https://example.com/", config, page_links=page_links)
+        # The oversized page is listed, but its body is dropped unparsed
+        assert urls == ["https://example.com/"]
+        assert page_links == {}
+        assert client.stream.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_bfs_records_page_links(self):
+        from gnosis_mcp.crawl import discover_urls
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.text = '<a href="/page1">1</a><a href="/page2">2</a>'
+        mock_response.headers = {"content-type": "text/html"}
+        client = AsyncMock()
+        client.get.return_value = mock_response
+        client.stream = _stream_from(client.get)
+
+        page_links: dict[str, list[str]] = {}
+        config = CrawlConfig(depth=1, delay=0)
+        await discover_urls(client, "https://example.com/", config, page_links=page_links)
+        # Only the base page is fetched at depth 1; its children are leaves
+        assert page_links == {
+            "https://example.com/": ["https://example.com/page1", "https://example.com/page2"]
+        }
+
+    @pytest.mark.asyncio
+    async def test_bfs_reuses_cached_links_on_304(self):
+        from gnosis_mcp.crawl import discover_urls
+
+        resp = MagicMock()
+        resp.status_code = 304
+        resp.headers = {}
+        client = AsyncMock()
+        client.get.return_value = resp
+        client.stream = _stream_from(client.get)
+
+        cache = {
+            "https://example.com/": {
+                "etag": '"v1"',
+                "last_modified": None,
+                "links": ["https://example.com/page1"],
+            }
+        }
+        page_links: dict[str, list[str]] = {}
+        config = CrawlConfig(depth=1, delay=0)
+        urls = await discover_urls(
+            client, "https://example.com/", config, page_links=page_links, cache=cache
+        )
+        assert urls == ["https://example.com/", "https://example.com/page1"]
+        assert page_links == {"https://example.com/": ["https://example.com/page1"]}
+        # Only the non-leaf base page is requested, and conditionally
+        client.get.assert_called_once()
+        assert client.get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+    @pytest.mark.asyncio
+    async def test_bfs_unconditional_without_cached_links(self):
+        from gnosis_mcp.crawl import discover_urls
+
+        resp = MagicMock()
+        resp.status_code = 200
+        resp.text = '<a href="/page1">1</a>'
+        resp.headers = {"content-type": "text/html"}
+        client = AsyncMock()
+        client.get.return_value = resp
+        client.stream = _stream_from(client.get)
+
+        # An entry written before links were cached, and one under --force
+        cache = {"https://example.com/": {"etag": '"v1"', "links": None}}
+        urls = await discover_urls(
+            client, "https://example.com/", CrawlConfig(depth=1, delay=0), cache=cache
+        )
+        assert urls == ["https://example.com/", "https://example.com/page1"]
+        assert client.get.call_args.kwargs["headers"] == {}
+
+        cache["https://example.com/"]["links"] = []
+        await discover_urls(
+            client, "https://example.com/", CrawlConfig(depth=1, delay=0, force=True), cache=cache
+        )
+        assert client.get.call_args.kwargs["headers"] == {}
+
+    @pytest.mark.asyncio
+    async def test_sitemap_dedupes_nested_and_pages(self):
+        from gnosis_mcp.crawl import discover_urls
+
+        def urlset(*locs):
+            return "<urlset>" + "".join(f"<url><loc>{u}</loc></url>" for u in locs) + "</urlset>"
+
+        docs = {
+            "https://example.com/sitemap.xml": (
+                "<sitemapindex>"
+                "<sitemap><loc>https://example.com/s1.xml</loc></sitemap>"
+                "<sitemap><loc>https://example.com/s2.xml</loc></sitemap>"
+                "<sitemap><loc>https://example.com/s1.xml</loc></sitemap>"
+                "</sitemapindex>"
+            ),
+            "https://example.com/s1.xml": urlset(
+                "https://example.com/a", "https://example.com/b/"
+            ),
+            "https://example.com/s2.xml": urlset(
+                "https://example.com/b", "https://Example.com/a", "https://example.com/c"
+            ),
+        }
+        fetched = []
+
+        async def get(url, **kwargs):
+            fetched.append(url)
+            resp = MagicMock()
+            resp.status_code = 200
+            resp.text = docs[url]
+            resp.raise_for_status = MagicMock()
+            return resp
+
+        client = MagicMock()
+        client.stream = _stream_from(get)
+
+        config = CrawlConfig(sitemap=True, delay=0)
+        urls = await discover_urls(client, "https://example.com/", config)
+        assert urls == [
+            "https://example.com/a",
+            "https://example.com/b",
+            "https://example.com/c",
+        ]
+        assert fetched.count("https://example.com/s1.xml") == 1
+
 
 # ===========================================================================
 # crawl_url integration tests (with mock HTTP + real SQLite)
@@ -882,6 +1500,7 @@ class TestCrawlUrlIntegration:
 
         mock_client_instance = AsyncMock()
         mock_client_instance.get = mock_get
+        mock_client_instance.stream = _stream_from(mock_get)
         mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
         mock_client_instance.__aexit__ = AsyncMock(return_value=None)
 
@@ -901,6 +1520,41 @@ class TestCrawlUrlIntegration:
         assert all(r.action == "dry-run" for r in results)
         assert all(r.chunks == 0 for r in results)
 
+    @pytest.mark.asyncio
+    async def test_client_pool_sized_for_concurrency(self, tmp_path, monkeypatch):
+        """The crawl client keeps one keep-alive connection per concurrent fetch."""
+        monkeypatch.delenv("GNOSIS_MCP_DATABASE_URL", raising=False)
+        monkeypatch.delenv("DATABASE_URL", raising=False)
+
+        from gnosis_mcp.config import GnosisMcpConfig
+        from gnosis_mcp.crawl import crawl_url
+
+        resp = MagicMock()
+        resp.status_code = 404
+        resp.headers = {}
+        client = AsyncMock()
+        client.get.return_value = resp
+        client.__aenter__ = AsyncMock(return_value=client)
+        client.__aexit__ = AsyncMock(return_value=None)
+
+        with patch("gnosis_mcp.crawl._require_httpx") as mock_httpx:
+            mock_httpx.return_value.AsyncClient.return_value = client
+            await crawl_url(
+                GnosisMcpConfig.from_env(),
+                "https://docs.test.com/",
+                CrawlConfig(concurrency=3, timeout=5.0, depth=0, dry_run=True),
+                cache_path=tmp_path / "cache.json",
+            )
+
+        httpx_mod = mock_httpx.return_value
+        httpx_mod.Limits.assert_called_once_with(
+            max_connections=6, max_keepalive_connections=3, keepalive_expiry=300
+        )
+        httpx_mod.Timeout.assert_called_once_with(5.0, connect=5.0)
+        kwargs = httpx_mod.AsyncClient.call_args.kwargs
+        assert kwargs["limits"] is httpx_mod.Limits.return_value
+        assert kwargs["http2"] is (importlib.util.find_spec("h2") is not None)
+
     @pytest.mark.asyncio
     async def test_crawl_with_include_filter(self, tmp_path, monkeypatch):
         """Include filter should restrict which URLs are processed."""
@@ -937,6 +1591,7 @@ class TestCrawlUrlIntegration:
 
         mock_client_instance = AsyncMock()
         mock_client_instance.get = mock_get
+        mock_client_instance.stream = _stream_from(mock_get)
         mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
         mock_client_instance.__aexit__ = AsyncMock(return_value=None)
 
@@ -991,6 +1646,7 @@ class TestCrawlUrlIntegration:
 
         mock_client_instance = AsyncMock()
         mock_client_instance.get = mock_get
+        mock_client_instance.stream = _stream_from(mock_get)
         mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
         mock_client_instance.__aexit__ = AsyncMock(return_value=None)
 
@@ -1009,6 +1665,61 @@ class TestCrawlUrlIntegration:
         assert len(results) == 1
         assert "/api/" in results[0].url
 
+    @pytest.mark.asyncio
+    async def test_crawl_runs_concurrency_workers_in_order(self, tmp_path):
+        """At most `concurrency` pages are crawled at once; results keep discovery order."""
+        if not _has_httpx():
+            pytest.skip("httpx not installed")
+
+        from gnosis_mcp.config import GnosisMcpConfig
+        from gnosis_mcp.crawl import crawl_url
+
+        config = GnosisMcpConfig(database_url=str(tmp_path / "crawl.db"), backend="sqlite")
+        pages = [f"https://docs.test.com/p{i}" for i in range(12)]
+        entries = "".join(f"<url><loc>{u}</loc></url>" for u in pages)
+        sitemap_resp = MagicMock()
+        sitemap_resp.status_code = 200
+        sitemap_resp.text = f"<urlset>{entries}</urlset>"
+
+        async def mock_get(url, **kwargs):
+            return sitemap_resp
+
+        client = AsyncMock()
+        client.get = mock_get
+        client.stream = _stream_from(mock_get)
+        client.__aenter__ = AsyncMock(return_value=client)
+        client.__aexit__ = AsyncMock(return_value=None)
+
+        active = peak = 0
+
+        async def fake_crawl_single(*, url, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01 if url.endswith("0") else 0)
+            active -= 1
+            if url.endswith("p3"):
+                raise RuntimeError("boom")
+            return CrawlResult(url=url, chunks=1, action=CrawlAction.CRAWLED)
+
+        with (
+            patch("gnosis_mcp.crawl._require_httpx") as mock_httpx,
+            patch("gnosis_mcp.crawl._crawl_single", fake_crawl_single),
+        ):
+            mock_httpx.return_value.AsyncClient.return_value = client
+            results = await crawl_url(
+                config,
+                "https://docs.test.com/",
+                CrawlConfig(sitemap=True, concurrency=3, extract_processes=False),
+                cache_path=tmp_path / "cache.json",
+            )
+
+        assert peak == 3
+        assert [r.url for r in results] == pages
+        assert results[3].action == CrawlAction.ERROR
+        assert results[3].detail == "boom"
+        assert all(r.action == CrawlAction.CRAWLED for i, r in enumerate(results) if i != 3)
+
     @pytest.mark.asyncio
     async def test_private_url_blocked(self, tmp_path, monkeypatch):
         """Crawling a private URL should return blocked result."""
@@ -1075,7 +1786,7 @@ class TestCrawlSingle:
     async def test_blocked_by_robots(self):
         from gnosis_mcp.crawl import _crawl_single
 
-        robots = _parse_robots("User-agent: *\nDisallow: /")
+        robots = _CompiledRobots("User-agent: *\nDisallow: /", "gnosis-mcp")
         result = await _crawl_single(
             client=AsyncMock(),
             backend=AsyncMock(),
@@ -1090,12 +1801,77 @@ class TestCrawlSingle:
         assert result.action == "blocked"
         assert "robots.txt" in result.detail
 
+    @pytest.mark.asyncio
+    async def test_discovered_links_reused(self):
+        """Links already extracted during BFS are stored without re-parsing the page."""
+        from gnosis_mcp.crawl import _crawl_single, _FetchResult
+
+        fetched = _FetchResult(
+            url="https://example.com/page",
+            html="# Page\n\nEnough plain text to be worth ingesting as a chunk.",
+            is_plain_text=True,
+        )
+        backend = AsyncMock()
+        backend.ingest_file.return_value = 1
+        with (
+            patch("gnosis_mcp.crawl.fetch_page", AsyncMock(return_value=fetched)),
+            patch("gnosis_mcp.crawl.extract_links") as mock_extract,
+        ):
+            result = await _crawl_single(
+                client=AsyncMock(),
+                backend=backend,
+                url="https://example.com/page",
+                cache={},
+                config=CrawlConfig(delay=0),
+                category="example.com",
+                has_hash=False,
+                has_tags=False,
+                robots=None,
+                discovered_links=["https://example.com/other"],
+            )
+        assert result.action == "crawled"
+        mock_extract.assert_not_called()
+        backend.insert_links.assert_awaited_once_with(
+            "https://example.com/page", ["https://example.com/other"], relation_type="links_to"
+        )
+
+    @pytest.mark.asyncio
+    async def test_hash_match_keeps_cached_links(self):
+        """A sitemap page (no discovered links) whose content is unchanged keeps its cached links."""
+        from gnosis_mcp.crawl import _crawl_single, _FetchResult
+        from gnosis_mcp.ingest import content_hash
+
+        text = "# Page\n\nEnough plain text to be worth ingesting as a chunk."
+        fetched = _FetchResult(
+            url="https://example.com/page", html=text, etag='"v2"', is_plain_text=True
+        )
+        backend = AsyncMock()
+        backend.get_content_hash.return_value = content_hash(text)
+        cache = {
+            "https://example.com/page": {"etag": '"v1"', "links": ["https://example.com/other"]}
+        }
+        with patch("gnosis_mcp.crawl.fetch_page", AsyncMock(return_value=fetched)):
+            result = await _crawl_single(
+                client=AsyncMock(),
+                backend=backend,
+                url="https://example.com/page",
+                cache=cache,
+                config=CrawlConfig(delay=0),
+                category="example.com",
+                has_hash=True,
+                has_tags=False,
+                robots=None,
+            )
+        assert result.detail == "hash match"
+        assert cache["https://example.com/page"]["etag"] == '"v2"'
+        assert cache["https://example.com/page"]["links"] == ["https://example.com/other"]
+
     @pytest.mark.asyncio
     async def test_error_handling(self):
         from gnosis_mcp.crawl import _crawl_single
 
         client = AsyncMock()
-        client.get.side_effect = Exception("Connection failed")
+        client.stream = MagicMock(side_effect=Exception("Connection failed"))
 
         result = await _crawl_single(
             client=client,
@@ -1117,7 +1893,7 @@ class TestCrawlSingle:
         from gnosis_mcp.crawl import _crawl_single
 
         client = AsyncMock()
-        client.get.side_effect = asyncio.CancelledError()
+        client.stream = MagicMock(side_effect=asyncio.CancelledError())
 
         with pytest.raises(asyncio.CancelledError):
             await _crawl_single(
@@ -1138,7 +1914,7 @@ class TestCrawlSingle:
         from gnosis_mcp.crawl import _crawl_single
 
         client = AsyncMock()
-        client.get.side_effect = Exception("fetch error")
+        client.stream = MagicMock(side_effect=Exception("fetch error"))
 
         result = await _crawl_single(
             client=client,
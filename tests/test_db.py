@@ -6,7 +6,7 @@ import pytest
 
 from gnosis_mcp.backend import DocBackend
 from gnosis_mcp.config import GnosisMcpConfig
-from gnosis_mcp.db import AppContext, app_lifespan
+from gnosis_mcp.db import AppContext, app_lifespan, current_app_context
 from gnosis_mcp.sqlite_backend import SqliteBackend
 
 
@@ -22,6 +22,10 @@ class TestAppContext:
         assert ctx.backend is backend
         assert ctx.config is config
 
+    def test_uses_slots(self):
+        assert AppContext.__slots__ == ("backend", "config")
+        assert not hasattr(AppContext(backend=None, config=None), "__dict__")
+
 
 class TestAppLifespan:
     @pytest.mark.asyncio
@@ -35,6 +39,16 @@ class TestAppLifespan:
             assert isinstance(ctx.backend, DocBackend)
             assert ctx.config.backend == "sqlite"
 
+    @pytest.mark.asyncio
+    async def test_publishes_context_var(self, monkeypatch):
+        monkeypatch.delenv("GNOSIS_MCP_DATABASE_URL", raising=False)
+        monkeypatch.delenv("DATABASE_URL", raising=False)
+
+        assert current_app_context.get() is None
+        async with app_lifespan(None) as ctx:
+            assert current_app_context.get() is ctx
+        assert current_app_context.get() is None
+
     @pytest.mark.asyncio
     async def test_backend_operational_during_lifespan(self, monkeypatch):
         """Backend is started and usable inside the lifespan context."""
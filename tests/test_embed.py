@@ -350,6 +350,60 @@ class TestEmbedPending:
         assert result.errors == 0
         assert mock_backend.set_embedding.await_count == 2
 
+    @pytest.mark.asyncio
+    async def test_concurrent_batches_in_flight(self, monkeypatch):
+        """With concurrency=2, two batches reach the provider at the same time."""
+        import threading
+
+        mock_backend = AsyncMock()
+        mock_backend.count_pending_embeddings.return_value = 4
+        mock_backend.get_pending_embeddings.side_effect = [
+            [{"id": i, "content": "c", "title": None, "file_path": "f.md"} for i in range(4)],
+            [],
+        ]
+        monkeypatch.setattr("gnosis_mcp.backend.create_backend", lambda cfg: mock_backend)
+        both_in_flight = threading.Barrier(2, timeout=5)
+
+        def slow_embed(texts, provider, model, api_key, url, dim=None):
+            both_in_flight.wait()
+            return [[0.1]] * len(texts)
+
+        monkeypatch.setattr("gnosis_mcp.embed.embed_texts", slow_embed)
+
+        config = GnosisMcpConfig(database_url=":memory:", backend="sqlite")
+        result = await embed_pending(
+            config=config, provider="openai", model="test", batch_size=2, concurrency=2
+        )
+
+        assert result.embedded == 4
+        assert mock_backend.get_pending_embeddings.await_args_list[0].args == (4,)
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_keeps_successful_ones(self, monkeypatch):
+        """One failing batch is counted; the other batch's vectors are stored."""
+        mock_backend = AsyncMock()
+        mock_backend.count_pending_embeddings.return_value = 4
+        mock_backend.get_pending_embeddings.return_value = [
+            {"id": i, "content": str(i), "title": None, "file_path": "f.md"} for i in range(4)
+        ]
+        monkeypatch.setattr("gnosis_mcp.backend.create_backend", lambda cfg: mock_backend)
+
+        def flaky_embed(texts, provider, model, api_key, url, dim=None):
+            if texts[0].endswith("2"):
+                raise RuntimeError("API error")
+            return [[0.1]] * len(texts)
+
+        monkeypatch.setattr("gnosis_mcp.embed.embed_texts", flaky_embed)
+
+        config = GnosisMcpConfig(database_url=":memory:", backend="sqlite")
+        result = await embed_pending(
+            config=config, provider="openai", model="test", batch_size=2, concurrency=2
+        )
+
+        assert result.embedded == 2
+        assert result.errors == 2
+        mock_backend.get_pending_embeddings.assert_awaited_once()
+
     @pytest.mark.asyncio
     async def test_contextual_header_prepended_to_embed_text(self, monkeypatch):
         """Embedding text includes contextual header (Document + Section)."""
@@ -24,6 +24,7 @@ from gnosis_mcp.ingest import (
     extract_title,
     extract_typed_relations,
     ingest_path,
+    iter_ingest_path,
     parse_frontmatter,
     scan_files,
 )
@@ -953,6 +954,82 @@ class TestIngestPath:
         dry = [r for r in results if r.action == "dry-run"]
         assert len(dry) >= 2
 
+    async def test_dry_run_skips_what_ingest_skips(self, tmp_path):
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        (docs / "tiny.md").write_text("# Hi")
+        (docs / "blob.md").write_bytes(b"\x00\x01\x02" * 100)
+        (docs / "ok.md").write_text("# Guide\n\n" + "Real documentation content here. " * 3)
+        cfg = GnosisMcpConfig(database_url=str(tmp_path / "t.db"), backend="sqlite")
+
+        dry = await ingest_path(cfg, str(docs), dry_run=True)
+        real = await ingest_path(cfg, str(docs))
+
+        def skips(results):
+            return sorted((r.path, r.detail) for r in results if r.action == "skipped")
+
+        assert (
+            skips(dry)
+            == skips(real)
+            == [
+                ("blob.md", "Binary content"),
+                ("tiny.md", "Too small"),
+            ]
+        )
+        assert {r.path for r in dry if r.action == "dry-run"} == {"ok.md"}
+
+    async def test_iter_yields_before_walk_finishes(self, tmp_docs):
+        cfg = GnosisMcpConfig(database_url=":memory:", backend="sqlite")
+        it = iter_ingest_path(cfg, str(tmp_docs))
+        first = await anext(it)
+        assert first.action == "ingested"
+        rest = [r async for r in it]
+        assert sorted(r.path for r in [first, *rest]) == ["billing.md", "guide.md"]
+
+    async def test_iter_missing_path(self, tmp_path):
+        cfg = GnosisMcpConfig(database_url=":memory:", backend="sqlite")
+        results = [r async for r in iter_ingest_path(cfg, str(tmp_path / "nope"))]
+        assert [(r.action, r.detail) for r in results] == [("error", "Path does not exist")]
+
+    async def test_iter_reads_next_file_during_write(self, tmp_docs, monkeypatch):
+        import asyncio
+
+        import gnosis_mcp.ingest as ingest_mod
+        from gnosis_mcp.sqlite_backend import SqliteBackend
+
+        events: list[str] = []
+        read = ingest_mod._read_source
+        write = SqliteBackend.ingest_file
+
+        def _read(f, base):
+            events.append(f"read {f.name}")
+            return read(f, base)
+
+        async def _write(self, rel, *args, **kwargs):
+            events.append(f"write {rel}")
+            await asyncio.sleep(0.05)  # long enough for the read-ahead thread
+            events.append(f"wrote {rel}")
+            return await write(self, rel, *args, **kwargs)
+
+        monkeypatch.setattr(ingest_mod, "_read_source", _read)
+        monkeypatch.setattr(SqliteBackend, "ingest_file", _write)
+        cfg = GnosisMcpConfig(database_url=":memory:", backend="sqlite")
+        results = [r async for r in iter_ingest_path(cfg, str(tmp_docs))]
+
+        first, second = (r.path for r in results)
+        assert events.index(f"read {second}") < events.index(f"wrote {first}")
+
+    async def test_iter_unreadable_file_reported_as_error(self, tmp_docs, monkeypatch):
+        import gnosis_mcp.ingest as ingest_mod
+
+        def _read_text(self, *args, **kwargs):
+            raise PermissionError("denied")
+
+        monkeypatch.setattr(ingest_mod.Path, "read_text", _read_text)
+        cfg = GnosisMcpConfig(database_url=":memory:", backend="sqlite")
+        results = [r async for r in iter_ingest_path(cfg, str(tmp_docs))]
+        assert {(r.action, r.detail) for r in results} == {("error", "denied")}
+
 
 # ---------------------------------------------------------------------------
 # diff_path (async integration)
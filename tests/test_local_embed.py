@@ -1,5 +1,7 @@
 """Tests for local ONNX embedding engine (mocked — no model download needed)."""
 
+import sys
+import threading
 import urllib.request
 from pathlib import Path
 from unittest.mock import MagicMock
@@ -152,6 +154,72 @@ class TestGetEmbedder:
         e2 = get_embedder("model-b")
         assert e1 is not e2
 
+    def test_concurrent_callers_share_one_instance(self, monkeypatch):
+        """`embed --concurrency` calls in from several worker threads at once."""
+        import gnosis_mcp.local_embed as mod
+
+        mod._embedder = None
+        mod._embedder_model = None
+        barrier = threading.Barrier(8)
+        real_init = LocalEmbedder.__init__
+
+        def slow_init(self, *args, **kwargs):
+            real_init(self, *args, **kwargs)
+            threading.Event().wait(0.01)
+
+        monkeypatch.setattr(LocalEmbedder, "__init__", slow_init)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(get_embedder("test/model"))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(results) == 8
+        assert all(e is results[0] for e in results)
+
+
+class TestEnsureModel:
+    def test_concurrent_calls_load_once(self, tmp_path, monkeypatch):
+        import gnosis_mcp.local_embed as mod
+
+        downloads = []
+
+        def fake_download(model_id, cache_dir):
+            downloads.append(model_id)
+            threading.Event().wait(0.01)
+            return tmp_path, "onnx/model.onnx"
+
+        session = MagicMock()
+        session.get_inputs.return_value = [MagicMock()]
+        fake_ort = MagicMock()
+        fake_ort.InferenceSession.return_value = session
+        monkeypatch.setattr(mod, "_download_model", fake_download)
+        monkeypatch.setitem(sys.modules, "tokenizers", MagicMock())
+        monkeypatch.setitem(sys.modules, "onnxruntime", fake_ort)
+
+        embedder = LocalEmbedder(model_id="test/model", cache_dir=tmp_path)
+        barrier = threading.Barrier(8)
+
+        def worker():
+            barrier.wait()
+            embedder._ensure_model()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert downloads == ["test/model"]
+        assert embedder._session is session
+        assert len(embedder._input_names) == 1
+
 
 class TestGetCacheDir:
     def test_with_xdg_data_home(self, monkeypatch):
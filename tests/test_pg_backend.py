@@ -0,0 +1,659 @@
+"""Tests for PostgreSQL backend SQL construction (no database required)."""
+
+import pytest
+
+from gnosis_mcp.config import GnosisMcpConfig
+from gnosis_mcp.pg_backend import (
+    PostgresBackend,
+    _build_queries,
+    _search_rows,
+    _vector_literal,
+)
+
+
+def _pg_config(**kwargs) -> GnosisMcpConfig:
+    return GnosisMcpConfig(database_url="postgresql://localhost/test", **kwargs)
+
+
+class TestBuildQueries:
+    def test_single_table_has_no_union(self):
+        q = _build_queries(_pg_config())
+        assert "UNION ALL" not in q.search_keyword
+        assert "FROM public.documentation_chunks" in q.search_keyword
+        assert q.search_keyword.endswith("ORDER BY score DESC LIMIT $2")
+
+    def test_multi_table_unions_every_table(self):
+        q = _build_queries(_pg_config(chunks_table="docs_a,docs_b"))
+        assert "UNION ALL" in q.get_doc
+        assert "public.docs_a" in q.search_hybrid
+        assert "public.docs_b" in q.search_hybrid
+
+    def test_category_parameter_numbering(self):
+        q = _build_queries(_pg_config())
+        assert "($3::text IS NULL OR category = $3::text)" in q.search_keyword
+        # Hybrid binds the embedding as $3, so category moves to $4.
+        assert "($4::text IS NULL OR category = $4::text)" in q.search_hybrid
+        assert "$3::vector" in q.search_hybrid
+
+    def test_query_text_is_parsed_once(self):
+        q = _build_queries(_pg_config(chunks_table="docs_a,docs_b"))
+        for stmt in (q.search_keyword, q.search_hybrid):
+            assert stmt.startswith(
+                "WITH _q AS (SELECT websearch_to_tsquery('english', $1) AS tsq)"
+            )
+            assert stmt.count("websearch_to_tsquery") == 1
+            assert "FROM public.docs_a, _q" in stmt
+
+    def test_column_overrides_are_applied(self):
+        q = _build_queries(_pg_config(col_content="body", col_source_path="src"))
+        assert "body" in q.search_keyword
+        assert "src = $1" in q.related
+
+    def test_relation_type_variants(self):
+        q = _build_queries(_pg_config())
+        assert "$2" not in q.related
+        assert "relation_type = $2" in q.related_rt
+        assert "l.relation_type = $2" in q.related_titled_rt
+        assert "relation_type = $3" in q.related_graph_rt
+
+    def test_custom_function_statements(self):
+        q = _build_queries(_pg_config(search_function="myschema.search"))
+        assert q.search_custom.startswith("SELECT * FROM myschema.search(")
+        assert "NULL::vector" in q.search_custom
+        assert "$2::vector" in q.search_custom_embedding
+
+    def test_content_chars_limits_search_columns_only(self):
+        cfg = _pg_config(col_content="body")
+        q = _build_queries(cfg, content_chars=201)
+        assert "left(body, 201) AS body" in q.search_keyword
+        assert "left(body, 201) AS body" in q.search_hybrid
+        # ts_headline still sees the whole column.
+        assert "ts_headline('english', body, _q.tsq," in q.search_keyword
+        assert q.get_doc == _build_queries(cfg).get_doc
+        assert "left(" not in _build_queries(cfg).search_keyword
+
+    def test_get_doc_content_joins_in_sql(self):
+        q = _build_queries(_pg_config(chunks_table="docs_a,docs_b"))
+        assert q.get_doc_content.startswith("WITH _doc AS (SELECT * FROM (")
+        assert "string_agg(content, E'\\n\\n' ORDER BY chunk_index)" in q.get_doc_content
+        assert "LATERAL (SELECT title, category, audience, tags FROM _doc" in q.get_doc_content
+
+    def test_export_binds_nullable_category(self):
+        q = _build_queries(_pg_config(col_category="section"))
+        assert "($1::text IS NULL OR section = $1::text)" in q.export_docs
+        assert "chunk_index" not in q.export_docs.split(" FROM ")[0]
+
+    def test_backend_builds_queries_once(self):
+        backend = PostgresBackend(_pg_config())
+        assert backend._sql == _build_queries(backend._cfg)
+
+
+class _RecordingPool:
+    """Stands in for asyncpg.Pool; records which shortcut was used."""
+
+    def __init__(self, rows=()):
+        self.calls: list[tuple[str, str]] = []
+        self.rows = list(rows)
+
+    async def fetch(self, sql, *args):
+        self.calls.append(("fetch", sql))
+        return self.rows
+
+    async def fetchval(self, sql, *args):
+        self.calls.append(("fetchval", sql))
+
+    async def execute(self, sql, *args):
+        self.calls.append(("execute", sql))
+        return "UPDATE 0"
+
+    def acquire(self):
+        raise AssertionError("single-statement paths must not acquire explicitly")
+
+
+class TestVectorLiteral:
+    def test_plain_floats(self):
+        assert _vector_literal([0.1, -2.5, 3.0]) == "[0.1,-2.5,3.0]"
+
+    def test_numpy_values_render_as_numbers(self):
+        np = pytest.importorskip("numpy")
+        assert _vector_literal(np.array([0.5, 1.0], dtype=np.float32)) == "[0.5,1.0]"
+
+
+class TestPoolShortcuts:
+    async def test_single_statement_methods_use_pool_shortcuts(self):
+        backend = PostgresBackend(_pg_config())
+        pool = _RecordingPool()
+        backend._pool = pool
+
+        assert await backend.get_doc("a.md") == []
+        assert await backend.get_doc_content("a.md") is None
+        assert await backend.search("hello", category="guides") == []
+        assert await backend.get_content_hash("a.md") is None
+        assert await backend.update_metadata("a.md", title="T") == 0
+
+        assert [kind for kind, _ in pool.calls] == [
+            "fetch",
+            "fetch",
+            "fetch",
+            "fetchval",
+            "execute",
+        ]
+        assert pool.calls[0][1] == backend._sql.get_doc
+        assert pool.calls[1][1] == backend._sql.get_doc_content
+        assert pool.calls[2][1] == backend._sql.search_keyword
+
+    async def test_search_content_chars_uses_cached_variant(self):
+        backend = PostgresBackend(_pg_config())
+        pool = _RecordingPool()
+        backend._pool = pool
+
+        await backend.search("hello", content_chars=201)
+        await backend.search("hello", content_chars=201)
+
+        assert list(backend._preview_sql) == [201]
+        assert pool.calls[0][1] == pool.calls[1][1] == backend._preview_sql[201].search_keyword
+
+    async def test_repeat_searches_reuse_one_statement(self):
+        backend = PostgresBackend(_pg_config())
+        pool = _RecordingPool()
+        backend._pool = pool
+
+        await backend.search("hello")
+        await backend.search("world", category="guides")
+        await backend.search("hello", query_embedding=[0.1, 0.2])
+        await backend.search("world", category="guides", query_embedding=[0.3, 0.4])
+
+        # Same text per mode whatever the filter, so asyncpg's statement
+        # cache prepares each once per connection.
+        sent = [sql for _, sql in pool.calls]
+        assert sent[0] is sent[1] is backend._sql.search_keyword
+        assert sent[2] is sent[3] is backend._sql.search_hybrid
+
+
+class TestInitSchema:
+    async def test_ddl_runs_outside_command_timeout(self, monkeypatch):
+        import asyncpg
+
+        connects: list[dict] = []
+        executed: list[tuple[str, dict]] = []
+
+        class _Conn:
+            async def execute(self, sql, *args, **kwargs):
+                executed.append((sql, kwargs))
+                return "CREATE INDEX"
+
+            async def close(self):
+                connects[-1]["closed"] = True
+
+        async def _connect(*_args, **kwargs):
+            connects.append(dict(kwargs))
+            return _Conn()
+
+        monkeypatch.setattr(asyncpg, "connect", _connect)
+        backend = PostgresBackend(_pg_config(command_timeout=30))
+        pool = _RecordingPool()
+        backend._pool = pool
+        backend._links_exists = False
+
+        sql = await backend.init_schema()
+
+        # Not the pool (whose connections carry command_timeout), and no
+        # timeout on the dedicated connection or the statement itself
+        assert pool.calls == []
+        assert len(connects) == 1
+        assert "command_timeout" not in connects[0]
+        assert connects[0]["closed"]
+        assert executed == [(sql, {})]
+        assert backend._links_exists is None
+
+
+class TestPositionalRows:
+    """Row mapping reads Records by position, so plain tuples must work too."""
+
+    def test_search_rows(self):
+        rows = [("a.md", "A", "body", "guides", 0.5, "<mark>b</mark>")]
+        assert _search_rows(rows) == [
+            {
+                "file_path": "a.md",
+                "title": "A",
+                "content": "body",
+                "category": "guides",
+                "score": 0.5,
+                "highlight": "<mark>b</mark>",
+            }
+        ]
+
+    async def test_get_doc_with_renamed_columns(self):
+        backend = PostgresBackend(_pg_config(col_title="heading", col_content="body"))
+        backend._pool = _RecordingPool(rows=[("T", "text", "cat", "all", ["x"], 0)])
+
+        assert await backend.get_doc("a.md") == [
+            {
+                "title": "T",
+                "content": "text",
+                "category": "cat",
+                "audience": "all",
+                "tags": ["x"],
+                "chunk_index": 0,
+            }
+        ]
+
+
+class _ExistsConn:
+    def __init__(self, exists):
+        self.exists = exists
+        self.probes = 0
+
+    async def fetchval(self, sql, *args):
+        self.probes += 1
+        return self.exists
+
+
+class TestLinksTableCache:
+    async def test_probe_runs_once(self):
+        backend = PostgresBackend(_pg_config())
+        conn = _ExistsConn(True)
+        assert await backend._links_table_exists(conn) is True
+        assert await backend._links_table_exists(conn) is True
+        assert conn.probes == 1
+
+    async def test_missing_table_is_cached_too(self):
+        backend = PostgresBackend(_pg_config())
+        conn = _ExistsConn(False)
+        assert await backend._links_table_exists(conn) is False
+        assert await backend._links_table_exists(conn) is False
+        assert conn.probes == 1
+
+
+class _StartupPool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def acquire(self):
+        return self
+
+    async def __aenter__(self):
+        return self.conn
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class TestStartup:
+    async def test_pool_server_settings(self, monkeypatch):
+        import asyncpg
+
+        seen = {}
+
+        async def _create_pool(dsn, **kwargs):
+            seen.update(kwargs)
+            return _StartupPool(_ExistsConn(True))
+
+        monkeypatch.setattr(asyncpg, "create_pool", _create_pool)
+        backend = PostgresBackend(_pg_config())
+        await backend.startup()
+
+        # The search SQL names its text search config instead of relying on a
+        # startup parameter a pooler may refuse or drop.
+        assert "default_text_search_config" not in seen["server_settings"]
+        assert "websearch_to_tsquery('english', $1)" in backend._sql.search_keyword
+        assert seen["server_settings"]["jit"] == "off"
+        assert seen["server_settings"]["application_name"] == "gnosis-mcp"
+
+    async def test_standalone_connection_sends_same_settings(self, monkeypatch):
+        import asyncpg
+
+        from gnosis_mcp.pg_backend import _SERVER_SETTINGS
+
+        seen = {}
+
+        class _Conn:
+            async def close(self):
+                pass
+
+        async def _connect(dsn, **kwargs):
+            seen.update(kwargs)
+            return _Conn()
+
+        monkeypatch.setattr(asyncpg, "connect", _connect)
+        backend = PostgresBackend(_pg_config())
+        async with await backend._acquire():
+            pass
+
+        assert seen["server_settings"] is _SERVER_SETTINGS
+
+    async def test_pool_statement_cache_size_from_config(self, monkeypatch):
+        import asyncpg
+
+        seen = {}
+
+        async def _create_pool(dsn, **kwargs):
+            seen.update(kwargs)
+            return _StartupPool(_ExistsConn(True))
+
+        monkeypatch.setattr(asyncpg, "create_pool", _create_pool)
+        await PostgresBackend(_pg_config(statement_cache_size=0)).startup()
+
+        assert seen["statement_cache_size"] == 0
+
+    async def test_server_settings_off_sends_no_startup_parameters(self, monkeypatch):
+        import asyncpg
+
+        seen: list[dict] = []
+
+        class _Conn:
+            async def close(self):
+                pass
+
+        async def _create_pool(dsn, **kwargs):
+            seen.append(kwargs)
+            return _StartupPool(_ExistsConn(True))
+
+        async def _connect(dsn, **kwargs):
+            seen.append(kwargs)
+            return _Conn()
+
+        monkeypatch.setattr(asyncpg, "create_pool", _create_pool)
+        monkeypatch.setattr(asyncpg, "connect", _connect)
+        await PostgresBackend(_pg_config(server_settings=False)).startup()
+        async with await PostgresBackend(_pg_config(server_settings=False))._acquire():
+            pass
+
+        # PgBouncer rejects unknown startup parameters, pooled or standalone
+        assert [kw["server_settings"] for kw in seen] == [None, None]
+
+
+class _HealthConn:
+    """Answers check_health's two fetchrow calls and records the SQL."""
+
+    def __init__(self, *, chunks=True, links=True):
+        self.chunks = chunks
+        self.links = links
+        self.queries: list[tuple[str, tuple]] = []
+
+    async def fetchrow(self, sql, *args):
+        self.queries.append((sql, args))
+        if len(self.queries) == 1:
+            version = "PostgreSQL 17.2 on x86_64, compiled by gcc"
+            return (version, True, self.chunks, self.links, args[3] is not None)
+        return tuple(3 if "DISTINCT" in part else 7 for part in sql.split(", "))
+
+
+class TestCheckHealth:
+    async def test_two_round_trips_on_one_connection(self):
+        backend = PostgresBackend(_pg_config(search_function="public.search_docs"))
+        conn = _HealthConn()
+        backend._pool = _StartupPool(conn)
+
+        health = await backend.check_health()
+
+        assert len(conn.queries) == 2
+        assert conn.queries[0][1][3:] == ("public", "search_docs")
+        assert health == {
+            "backend": "postgres",
+            "version": "PostgreSQL 17.2 on x86_64",
+            "pgvector": True,
+            "chunks_table_exists": True,
+            "chunks_count": 7,
+            "docs_count": 3,
+            "links_table_exists": True,
+            "links_count": 7,
+            "search_function_exists": True,
+        }
+        assert backend._links_exists is True
+
+    async def test_missing_tables_skip_counts(self):
+        backend = PostgresBackend(_pg_config())
+        conn = _HealthConn(chunks=False, links=False)
+        backend._pool = _StartupPool(conn)
+
+        health = await backend.check_health()
+
+        assert len(conn.queries) == 1
+        assert conn.queries[0][1][3:] == (None, None)
+        assert "chunks_count" not in health
+        assert "links_count" not in health
+        assert "search_function_exists" not in health
+        assert backend._links_exists is False
+
+
+class _StatsConn:
+    """Answers stats()'s single fetchrow and records the SQL."""
+
+    def __init__(self):
+        self.queries: list[str] = []
+
+    async def fetchrow(self, sql, *args):
+        self.queries.append(sql)
+        return {
+            "chunks": 5,
+            "docs": 2,
+            "size": 120,
+            "embedded": 4,
+            "links": 3 if "(SELECT count(*) FROM public.documentation_links)" in sql else None,
+            "cats": '[{"cat": "guides", "docs": 2, "chunks": 5}]',
+        }
+
+
+class TestStats:
+    async def test_single_round_trip(self, monkeypatch):
+        backend = PostgresBackend(_pg_config())
+        backend._links_exists = True
+        conn = _StatsConn()
+        backend._pool = _StartupPool(conn)
+
+        async def _has_column(table, column):
+            return True
+
+        monkeypatch.setattr(backend, "has_column", _has_column)
+
+        stats = await backend.stats()
+
+        assert len(conn.queries) == 1
+        assert "json_agg" in conn.queries[0]
+        assert stats["chunks"] == 5
+        assert stats["docs"] == 2
+        assert stats["embedded_chunks"] == 4
+        assert stats["content_bytes"] == 120
+        assert stats["links"] == 3
+        assert stats["categories"] == [{"cat": "guides", "docs": 2, "chunks": 5}]
+
+    async def test_optional_columns_become_literals(self, monkeypatch):
+        backend = PostgresBackend(_pg_config())
+        backend._links_exists = False
+        conn = _StatsConn()
+        backend._pool = _StartupPool(conn)
+
+        async def _has_column(table, column):
+            return False
+
+        monkeypatch.setattr(backend, "has_column", _has_column)
+
+        stats = await backend.stats()
+
+        assert "0 AS embedded, NULL AS links" in conn.queries[0]
+        assert stats["links"] is None
+
+    async def test_statement_built_once_per_variant(self, monkeypatch):
+        backend = PostgresBackend(_pg_config())
+        backend._links_exists = True
+        conn = _StatsConn()
+        backend._pool = _StartupPool(conn)
+
+        async def _has_column(table, column):
+            return True
+
+        monkeypatch.setattr(backend, "has_column", _has_column)
+
+        await backend.stats()
+        await backend.stats()
+
+        assert conn.queries[0] is conn.queries[1]
+        assert list(backend._stats_sql) == [(True, True)]
+
+
+class _BatchConn:
+    """Connection stand-in that records execute/executemany calls."""
+
+    def __init__(self):
+        self.calls: list[tuple[str, str, object]] = []
+
+    def transaction(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql, *args):
+        self.calls.append(("execute", sql, args))
+        return "DELETE 0"
+
+    async def executemany(self, sql, rows):
+        self.calls.append(("executemany", sql, list(rows)))
+
+
+class _BatchPool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def acquire(self):
+        return self.conn
+
+
+class TestBatchedInserts:
+    def _backend(self):
+        backend = PostgresBackend(_pg_config())
+        conn = _BatchConn()
+        backend._pool = _BatchPool(conn)
+        return backend, conn
+
+    async def test_ingest_file_uses_one_executemany(self):
+        backend, conn = self._backend()
+        chunks = [{"title": "T", "content": f"c{i}"} for i in range(3)]
+
+        n = await backend.ingest_file(
+            "a.md", chunks, title="T", category="g", audience="all", tags=["x"]
+        )
+
+        assert n == 3
+        kinds = [c[0] for c in conn.calls]
+        assert kinds == ["execute", "executemany"]
+        _, sql, rows = conn.calls[1]
+        assert "VALUES ($1, $2, $3, $4, $5, $6, $7)" in sql
+        assert rows[2] == ("a.md", 2, "T", "c2", "g", "all", ["x"])
+
+    async def test_upsert_doc_splits_embedded_rows(self, monkeypatch):
+        backend, conn = self._backend()
+
+        async def _no_hash_col(*_args):
+            return False
+
+        monkeypatch.setattr(backend, "has_column", _no_hash_col)
+
+        await backend.upsert_doc("a.md", ["one", "two", "three"], embeddings=[[0.5, 1.0]])
+
+        inserts = [c for c in conn.calls if c[0] == "executemany"]
+        assert len(inserts) == 2
+        embedded_sql, embedded_rows = inserts[0][1], inserts[0][2]
+        assert "$8::vector" in embedded_sql
+        assert embedded_rows == [["a.md", 0, None, "one", None, "all", None, "[0.5,1.0]"]]
+        assert [r[1] for r in inserts[1][2]] == [1, 2]
+
+    async def test_insert_links_uses_one_executemany(self):
+        backend, conn = self._backend()
+
+        assert await backend.insert_links("a.md", ["b.md", "c.md"]) == 2
+        _, _, rows = conn.calls[-1]
+        assert rows == [("a.md", "b.md", "relates_to"), ("a.md", "c.md", "relates_to")]
+
+
+class _RelatedConn(_BatchConn):
+    def __init__(self, error=None):
+        super().__init__()
+        self.error = error
+
+    async def fetch(self, sql, *args):
+        self.calls.append(("fetch", sql, args))
+        if self.error:
+            raise self.error
+        return [("b.md", "relates_to", "outgoing")]
+
+    async def fetchval(self, sql, *args):
+        raise AssertionError("get_related must not probe for the links table")
+
+
+class TestGetRelated:
+    async def test_runs_query_without_probe(self):
+        backend = PostgresBackend(_pg_config())
+        conn = _RelatedConn()
+        backend._pool = _BatchPool(conn)
+
+        assert await backend.get_related("a.md") == [
+            {"related_path": "b.md", "relation_type": "relates_to", "direction": "outgoing"}
+        ]
+        assert [c[1] for c in conn.calls] == [backend._sql.related]
+
+    async def test_missing_links_table_returns_none(self):
+        import asyncpg
+
+        backend = PostgresBackend(_pg_config())
+        backend._pool = _BatchPool(_RelatedConn(asyncpg.UndefinedTableError("no links")))
+
+        assert await backend.get_related("a.md") is None
+
+
+class _CursorConn(_BatchConn):
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = rows
+
+    async def cursor(self, sql, *args, prefetch=None):
+        self.calls.append(("cursor", sql, args))
+        self.prefetch = prefetch
+        for r in self.rows:
+            yield r
+
+
+class TestExportDocs:
+    async def test_streams_documents_from_cursor(self):
+        backend = PostgresBackend(_pg_config())
+        conn = _CursorConn(
+            [
+                ("a.md", "A", "one", "g"),
+                ("a.md", "A", "two", "g"),
+                ("b.md", "B", "three", "g"),
+            ]
+        )
+        backend._pool = _BatchPool(conn)
+
+        docs = [d async for d in backend.iter_export_docs(category="g")]
+
+        assert docs == [
+            {
+                "file_path": "a.md",
+                "title": "A",
+                "category": "g",
+                "content": "one\n\ntwo",
+                "chunks": 2,
+            },
+            {"file_path": "b.md", "title": "B", "category": "g", "content": "three", "chunks": 1},
+        ]
+        assert conn.calls[0][1] is backend._sql.export_docs
+        assert conn.calls[0][2] == ("g",)
+        assert conn.prefetch == 1000
+        select_list = conn.calls[0][1].split(" FROM ")[0]
+        assert "chunk_index" not in select_list
+
+    async def test_empty_category_exports_everything(self):
+        backend = PostgresBackend(_pg_config())
+        conn = _CursorConn([("a.md", "A", "one", "g")])
+        backend._pool = _BatchPool(conn)
+
+        docs = [d async for d in backend.iter_export_docs(category="")]
+
+        # `export -c ""` is unfiltered, like the SQLite backend
+        assert [d["file_path"] for d in docs] == ["a.md"]
+        assert conn.calls[0][2] == (None,)
@@ -271,6 +271,34 @@ class TestSearchDocsTool:
         assert "score" in data[0]
         assert "content_preview" in data[0]
 
+    @pytest.mark.asyncio
+    async def test_response_is_compact_json(self, writable_ctx):
+        await writable_ctx.backend.upsert_doc(
+            "test.md", ["Compact output for search results"], title="Test", category="guides"
+        )
+        result = await search_docs("compact output")
+        assert "\n" not in result
+        assert '":' in result and '": ' not in result
+        assert json.loads(result)[0]["file_path"] == "test.md"
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_dumps_matches_stdlib_output(self, monkeypatch, use_orjson):
+        from datetime import UTC, datetime
+
+        if use_orjson:
+            pytest.importorskip("orjson")
+        else:
+            monkeypatch.setattr(server_mod, "orjson", None)
+        payload = {
+            "at": datetime(2026, 1, 2, tzinfo=UTC),
+            "n": [1, 2.5, None],
+            3: "x",
+            "t": "café ✓",
+        }
+        assert server_mod._dumps(payload) == (
+            '{"at":"2026-01-02 00:00:00+00:00","n":[1,2.5,null],"3":"x","t":"café ✓"}'
+        )
+
     @pytest.mark.asyncio
     async def test_search_stats_tracked(self, writable_ctx):
         """Search stats counters should track total/misses/mode."""
@@ -563,6 +591,16 @@ class TestListDocsResource:
         data = json.loads(result)
         assert len(data) >= 1
 
+    @pytest.mark.asyncio
+    async def test_backend_error_returns_json(self, writable_ctx, monkeypatch):
+        async def _boom():
+            raise RuntimeError("db gone")
+
+        monkeypatch.setattr(writable_ctx.backend, "list_docs", _boom)
+        data = json.loads(await list_docs())
+        assert data["error"] == "RuntimeError: db gone"
+        assert "gnosis-mcp check" in data["hint"]
+
 
 class TestReadDocResource:
     @pytest.mark.asyncio
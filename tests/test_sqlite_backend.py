@@ -106,6 +106,23 @@ class TestSqliteBackendLifecycle:
         assert health["fts_table_exists"] is True
         assert health["links_table_exists"] is True
 
+    async def test_check_health_two_statements(self, backend, monkeypatch):
+        await backend.upsert_doc("a.md", ["one", "two"], title="A")
+        sent = []
+        fetchall = backend._db.execute_fetchall
+
+        async def _recording(sql, *args):
+            sent.append(sql)
+            return await fetchall(sql, *args)
+
+        monkeypatch.setattr(backend._db, "execute_fetchall", _recording)
+        health = await backend.check_health()
+
+        assert len(sent) == 2
+        assert health["chunks_count"] == 2
+        assert health["docs_count"] == 1
+        assert health["links_count"] == 0
+
     async def test_savings_report_on_pre_v0_12_schema(self, tmp_path):
         """Regression: DB created before v0.12 lacks the token columns. Calling
         `savings_report` on it must not raise — either the startup migration
@@ -185,6 +202,19 @@ class TestSqliteBackendLifecycle:
         assert chunks[1]["content"] == "## Section\n\nSecond chunk"
         assert chunks[0]["category"] == "guides"
 
+    async def test_get_doc_content_joins_chunks(self, backend):
+        await backend.upsert_doc(
+            "guides/test.md",
+            ["# Test\n\nFirst chunk", "## Section\n\nSecond chunk"],
+            title="Test Doc",
+            category="guides",
+        )
+        doc = await backend.get_doc_content("guides/test.md")
+        assert doc["content"] == "# Test\n\nFirst chunk\n\n## Section\n\nSecond chunk"
+        assert doc["title"] == "Test Doc"
+        assert doc["chunks"] == 2
+        assert await backend.get_doc_content("missing.md") is None
+
     async def test_search(self, backend):
         await backend.upsert_doc(
             "guides/billing.md",
@@ -262,12 +292,54 @@ class TestSqliteBackendLifecycle:
         assert s["chunks"] == 1
         assert s["content_bytes"] > 0
 
+    async def test_stats_three_statements(self, backend, monkeypatch):
+        await backend.upsert_doc("a.md", ["one", "two"], title="A", category="guides")
+        await backend.upsert_doc("b.md", ["three"], title="B")
+        sent = []
+        fetchall = backend._db.execute_fetchall
+
+        async def _recording(sql, *args):
+            sent.append(sql)
+            return await fetchall(sql, *args)
+
+        monkeypatch.setattr(backend._db, "execute_fetchall", _recording)
+        s = await backend.stats()
+
+        assert len(sent) == 3
+        assert (s["docs"], s["chunks"], s["embedded_chunks"], s["links"]) == (2, 3, 0, 0)
+        assert s["content_bytes"] == len("onetwothree")
+        assert {"cat": "guides", "docs": 1, "chunks": 2} in s["categories"]
+
     async def test_export_docs(self, backend):
         await backend.upsert_doc("a.md", ["Chunk 1", "Chunk 2"], title="A", category="guides")
         docs = await backend.export_docs()
         assert len(docs) == 1
-        assert "Chunk 1" in docs[0]["content"]
-        assert "Chunk 2" in docs[0]["content"]
+        assert docs[0]["content"] == "Chunk 1\n\nChunk 2"
+        assert docs[0]["chunks"] == 2
+
+    async def test_iter_export_docs_across_fetch_batches(self, backend, monkeypatch):
+        import gnosis_mcp.sqlite_backend as sqlite_mod
+
+        monkeypatch.setattr(sqlite_mod, "_EXPORT_FETCH", 2)
+        await backend.upsert_doc("a.md", ["A1", "A2", "A3"], title="A")
+        await backend.upsert_doc("b.md", ["B1"], title="B")
+
+        docs = [d async for d in backend.iter_export_docs()]
+        assert [(d["file_path"], d["content"], d["chunks"]) for d in docs] == [
+            ("a.md", "A1\n\nA2\n\nA3", 3),
+            ("b.md", "B1", 1),
+        ]
+
+    async def test_export_many_chunk_doc_joins_in_order(self, backend):
+        # Chunks are collected in a list and joined once when the document ends.
+        parts = [f"Part {i}" for i in range(500)]
+        parts[-1] += "\n\n"
+        await backend.upsert_doc("big.md", parts, title="Big")
+
+        [doc] = await backend.export_docs()
+        assert doc["chunks"] == 500
+        assert doc["content"] == "\n\n".join(parts).rstrip()
+        assert doc["content"].startswith("Part 0\n\nPart 1\n\n")
 
     async def test_export_with_category_filter(self, backend):
         await backend.upsert_doc("a.md", ["A"], title="A", category="guides")
@@ -329,6 +401,25 @@ class TestSqliteBackendLifecycle:
         results = await backend.search("pandas web")
         assert len(results) == 2
 
+    async def test_insert_links_one_executemany(self, backend, monkeypatch):
+        sent = []
+        execute = backend._db.execute
+
+        async def _recording(sql, *args):
+            sent.append(sql)
+            return await execute(sql, *args)
+
+        monkeypatch.setattr(backend._db, "execute", _recording)
+        inserted = await backend.insert_links("a.md", ["b.md", "c.md", "b.md"])
+
+        assert inserted == 3
+        assert len(sent) == 1  # the DELETE; the rows go through executemany
+        rows = await backend._db.execute_fetchall(
+            "SELECT target_path FROM documentation_links WHERE source_path = 'a.md' "
+            "ORDER BY target_path"
+        )
+        assert [r[0] for r in rows] == ["b.md", "c.md"]
+
     async def test_insert_links_and_get_related(self, backend):
         """insert_links + get_related returns bidirectional links."""
         await backend.upsert_doc("a.md", ["A content"], title="A", category="test")
@@ -358,6 +449,20 @@ class TestSqliteBackendLifecycle:
         assert len(results) >= 1
         assert results[0].get("highlight") is not None
 
+    async def test_search_content_chars_truncates_in_sql(self, backend):
+        body = "Installation guide for gnosis-mcp. " + "x" * 500
+        await backend.upsert_doc("a.md", [body], title="Install", category="test")
+
+        full = await backend.search("installation")
+        preview = await backend.search("installation", content_chars=20)
+        assert full[0]["content"] == body
+        assert preview[0]["content"] == body[:20]
+        # The FTS snippet still comes from the full indexed text.
+        assert preview[0]["highlight"] == full[0]["highlight"]
+
+        by_path = await backend.search("a.md", content_chars=10)
+        assert by_path[0]["content"] == body[:10]
+
     async def test_update_metadata_with_tags(self, backend):
         """Tags JSON roundtrip: update_metadata stores JSON, get_doc returns list."""
         await backend.upsert_doc("a.md", ["Content"], title="A", category="test")